@@ -0,0 +1,81 @@
+"""Dataclass Converter Benchmark.
+
+Compare ``from_dict`` and ``to_dict`` cost of the generic field inspecting
+converters and the per-class generated converters of
+:class:`~cai.utils.dataclass.JsonableDataclass`.
+
+Usage:
+    python benchmarks/bench_dataclass.py
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import timeit
+from typing import Any, Callable
+
+from cai.client import Group, Client, GroupMember
+from cai.settings.device import DeviceInfo, get_device
+from cai.utils.dataclass import JsonableDataclass, _asdict, _fromdict
+
+
+def generic_json_dict(obj: JsonableDataclass):
+    kvs = _asdict(obj)
+    return {k: v for k, v in kvs.items() if k in obj.__json_fields__}
+
+
+def normalize(value: Any) -> Any:
+    if isinstance(value, JsonableDataclass):
+        return value.to_dict(True)
+    return value
+
+
+def bench(name: str, generic: Callable[[], Any], compiled: Callable[[], Any]):
+    assert normalize(generic()) == normalize(compiled())
+    number = 20000
+    old = min(timeit.repeat(generic, number=number, repeat=5)) / number
+    new = min(timeit.repeat(compiled, number=number, repeat=5)) / number
+    print(f"{name:<28}{old * 1e6:8.2f} us{new * 1e6:8.2f} us{old / new:6.1f}x")
+
+
+def main():
+    client = Client(10000, bytes(16), snapshot=False, session=False)
+    group = Group(1, 1, "group", "", 0, 0, 1, 0, 0, 200, client)
+    member = GroupMember(
+        10001,
+        *(0, 0, "nick", "", "", "", "", "", 1, 0, 0, 0, False, False, "", 0),
+        0,
+        client,
+        group,
+    )
+    member_dict = {**member.to_dict(True), "_client": client, "_group": group}
+    device = get_device()
+    device_dict = device.to_dict(True)
+
+    print(f"{'':<28}{'generic':>11}{'compiled':>11}")
+    bench(
+        "GroupMember.from_dict",
+        lambda: _fromdict(GroupMember, member_dict),
+        lambda: GroupMember.from_dict(member_dict),
+    )
+    bench(
+        "GroupMember.to_dict(True)",
+        lambda: generic_json_dict(member),
+        lambda: member.to_dict(True),
+    )
+    bench(
+        "DeviceInfo.from_dict",
+        lambda: _fromdict(DeviceInfo, device_dict),
+        lambda: DeviceInfo.from_dict(device_dict),
+    )
+    bench(
+        "DeviceInfo.to_dict(True)",
+        lambda: generic_json_dict(device),
+        lambda: device.to_dict(True),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""In-flight Request Table Benchmark.
+
+Compare time of 20k concurrent requests answered in random order, waited by
+:class:`~cai.utils.future.FutureStore` with :func:`asyncio.wait_for` and by
+:class:`~cai.utils.future.InFlightTable` with the shared timer wheel.
+
+Usage:
+    python benchmarks/bench_inflight.py
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import time
+import random
+import asyncio
+from typing import Any
+
+from cai.utils.future import FutureStore, InFlightTable
+
+REQUESTS = 20000
+
+
+async def measure(name: str, store: Any) -> None:
+    seqs = list(range(REQUESTS))
+    start = time.perf_counter()
+    for seq in seqs:
+        store.store_seq(seq)
+    waiters = [asyncio.ensure_future(store.fetch(seq, 10)) for seq in seqs]
+    await asyncio.sleep(0)
+    random.shuffle(seqs)
+    for seq in seqs:
+        store.store_result(seq, seq)
+    await asyncio.gather(*waiters)
+    spent = time.perf_counter() - start
+    print(
+        f"{name:<16}{spent * 1000:8.1f} ms{spent / REQUESTS * 1e6:8.2f} us/req"
+    )
+
+
+async def main():
+    await measure("FutureStore", FutureStore())
+    await measure("InFlightTable", InFlightTable())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""Group Member Memory Benchmark.
+
+Compare retained memory and build time of 100k group members stored as
+slotted :class:`~cai.client.models.GroupMember` built by
+:meth:`~cai.client.models.GroupMember.from_struct`, and as plain dataclass
+instances with ``__dict__`` built by ``from_dict``.
+
+Usage:
+    python benchmarks/bench_models_memory.py
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import time
+import tracemalloc
+from typing import Any, List, Callable
+from dataclasses import fields, dataclass
+
+from cai.client import Group, Client, GroupMember
+from cai.utils.dataclass import JsonableDataclass
+from cai.client.friendlist.jce import StTroopMemberInfo
+
+MEMBERS = 100000
+
+# same fields as GroupMember, without __slots__
+DictMember = dataclass(
+    type(
+        "DictMember",
+        (JsonableDataclass,),
+        {"__annotations__": {f.name: Any for f in fields(GroupMember)}},
+    )
+)
+
+
+def build_infos() -> List[StTroopMemberInfo]:
+    return [
+        StTroopMemberInfo(
+            member_uin=10000 + i,
+            face_id=0,
+            age=20,
+            gender=0,
+            nick=f"member {i}",
+            status=bytes(1),
+            show_name=f"card {i}",
+        )
+        for i in range(MEMBERS)
+    ]
+
+
+def measure(name: str, build: Callable[[List[Any]], List[Any]]) -> None:
+    infos = build_infos()
+    start = time.perf_counter()
+    build(infos)
+    spent = time.perf_counter() - start
+
+    # decoded structs are dropped after building, as in the client
+    tracemalloc.start()
+    infos = build_infos()
+    members = build(infos)
+    del infos
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<28}{size / 2 ** 20:8.1f} MiB"
+        f"{size / len(members):8.0f} B/member"
+        f"{spent * 1000:8.0f} ms"
+    )
+
+
+def main():
+    client = Client(10000, bytes(16), snapshot=False, session=False)
+    group = Group(1, 1, "group", "", 0, 0, MEMBERS, 0, 0, MEMBERS, client)
+
+    measure(
+        "dict dataclass, from_dict",
+        lambda infos: [
+            DictMember.from_dict(
+                {**x.dict(), "_client": client, "_group": group}
+            )
+            for x in infos
+        ],
+    )
+    measure(
+        "slots, from_dict",
+        lambda infos: [
+            GroupMember.from_dict(
+                {**x.dict(), "_client": client, "_group": group}
+            )
+            for x in infos
+        ],
+    )
+    measure(
+        "slots, from_struct",
+        lambda infos: [
+            GroupMember.from_struct(x, client, group) for x in infos
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
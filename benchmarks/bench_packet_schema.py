@@ -0,0 +1,95 @@
+"""Packet Query Benchmark.
+
+Compare per-frame header parsing cost of the :class:`~cai.utils.binary.Packet`
+query chain and the compiled :class:`~cai.utils.binary.PacketSchema`.
+
+Usage:
+    python benchmarks/bench_packet_schema.py
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import struct
+import timeit
+
+from cai.utils.binary import Packet, PacketSchema
+
+FRAME_HEAD = PacketSchema().uint32().uint8().uint8().string(4, 4).remain()
+SSO_HEAD = (
+    PacketSchema()
+    .uint32()
+    .uint32()
+    .int32()
+    .bytes_with_length(4, 4)
+    .string(4, 4)
+    .bytes_with_length(4, 4)
+    .int32()
+)
+SSO_BODY = PacketSchema().bytes_with_length(4, 4)
+
+
+def build_frame() -> bytes:
+    command = b"OnlinePush.PbPushGroupMsg"
+    extra = bytes(8)
+    session_id = b"\x02\xb0\x5b\x8b"
+    head = (
+        struct.pack(">Ii", 1234, 0)
+        + struct.pack(">I", len(extra) + 4)
+        + extra
+        + struct.pack(">I", len(command) + 4)
+        + command
+        + struct.pack(">I", len(session_id) + 4)
+        + session_id
+        + struct.pack(">i", 0)
+    )
+    body = bytes(512)
+    sso = (
+        struct.pack(">I", len(head) + 4)
+        + head
+        + struct.pack(">I", len(body) + 4)
+        + body
+    )
+    uin = b"1234567890"
+    return struct.pack(">IBBI", 0xB, 0, 0, len(uin) + 4) + uin + sso
+
+
+def parse_chain(frame: bytes):
+    packet = Packet(frame)
+    _, _, _, uin, sso = (
+        packet.start().uint32().uint8().uint8().string(4, 4).remain().execute()
+    )
+    head = (
+        sso.start()
+        .uint32()
+        .uint32()
+        .int32()
+        .bytes_with_length(4, 4)
+        .string(4, 4)
+        .bytes_with_length(4, 4)
+        .int32()
+        .execute()
+    )
+    data = sso.start().offset(head[0]).remain().execute()[0]
+    return data.start().bytes_with_length(4, 4).execute()[0]
+
+
+def parse_schema(frame: bytes):
+    _, _, _, uin, sso = FRAME_HEAD.unpack(frame)
+    head = SSO_HEAD.unpack(sso)
+    return SSO_BODY.unpack(sso[head[0] :])[0]
+
+
+def main(number: int = 100000):
+    frame = build_frame()
+    assert parse_chain(frame) == parse_schema(frame)
+
+    for name, func in (("Packet", parse_chain), ("PacketSchema", parse_schema)):
+        best = min(timeit.repeat(lambda: func(frame), number=number, repeat=5))
+        print(f"{name:>12}: {best / number * 1e6:.2f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
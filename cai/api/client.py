@@ -8,10 +8,10 @@
 """
 
 import asyncio
-from typing import Union, Optional
+from typing import Dict, Union, Optional
 
-from cai.client import Client, OnlineStatus
 from cai.exceptions import ClientNotAvailable
+from cai.client import Client, ClientStats, OnlineStatus
 
 from . import _clients
 
@@ -95,4 +95,38 @@ async def set_status(
     )
 
 
-__all__ = ["get_client", "close", "close_all", "set_status"]
+def get_stats(uin: Optional[int] = None) -> ClientStats:
+    """Get resource usage of a client.
+
+    Args:
+        uin (Optional[int], optional): Account of the client. Defaults to None.
+
+    Returns:
+        ClientStats: Counters of the client.
+    """
+    return get_client(uin).stats
+
+
+def get_all_stats() -> Dict[int, ClientStats]:
+    """Get resource usage of all existing clients.
+
+    Example:
+        Find the account using most CPU time.
+
+        >>> stats = get_all_stats()
+        >>> max(stats.values(), key=lambda s: s.cpu_time)
+
+    Returns:
+        Dict[int, ClientStats]: Counters of each client, keyed by uin.
+    """
+    return {uin: client.stats for uin, client in _clients.items()}
+
+
+__all__ = [
+    "get_client",
+    "close",
+    "close_all",
+    "set_status",
+    "get_stats",
+    "get_all_stats",
+]
@@ -7,7 +7,7 @@
     https://github.com/cscs181/CAI/blob/master/LICENSE
 """
 
-from typing import Callable, Optional, Awaitable
+from typing import Union, Callable, Iterable, Optional, Awaitable
 
 from cai.log import logger
 from cai.client import HANDLERS, Event, Client, Command, IncomingPacket
@@ -16,8 +16,13 @@ from .client import get_client
 
 
 def add_event_listener(
-    listener: Callable[[Client, Event], Awaitable[None]],
+    listener: Callable[[Client, Event], Union[Awaitable[None], None]],
     uin: Optional[int] = None,
+    *,
+    event_type: Union[None, str, Iterable[str]] = None,
+    group_id: Union[None, int, Iterable[int]] = None,
+    from_uin: Union[None, int, Iterable[int]] = None,
+    sync: bool = False,
 ):
     """Add event listener.
 
@@ -27,12 +32,22 @@ def add_event_listener(
         listener (Callable[[Client, Event], Awaitable[None]]): Event listener.
         uin (Optional[int], optional): Account of the client want to listen.
             Defaults to None.
+        event_type (Union[None, str, Iterable[str]], optional): Only
+            receive events of these :attr:`Event.type`. Defaults to None.
+        group_id (Union[None, int, Iterable[int]], optional): Only
+            receive events from these groups. Defaults to None.
+        from_uin (Union[None, int, Iterable[int]], optional): Only
+            receive events from these accounts. Defaults to None.
+        sync (bool, optional): Listener is a plain function called inline
+            without creating a task. Defaults to False.
     """
     if uin:
         client = get_client(uin)
-        client.add_event_listener(listener)
+        client.add_event_listener(
+            listener, event_type, group_id, from_uin, sync
+        )
     else:
-        Client.LISTENERS.add(listener)
+        Client.LISTENERS.add(listener, event_type, group_id, from_uin, sync)
 
 
 def register_packet_handler(
@@ -7,9 +7,9 @@
     https://github.com/cscs181/CAI/blob/master/LICENSE
 """
 
-from typing import List, Union, Optional
+from typing import Any, List, Union, Callable, Iterable, Optional
 
-from cai.client import Group, GroupMember
+from cai.client import Group, GroupMember, MemberPrefetch
 
 from .client import get_client
 
@@ -93,4 +93,77 @@ async def get_group_member_list(
     return await client.get_group_member_list(group, cache)
 
 
-__all__ = ["get_group", "get_group_list", "get_group_member_list"]
+async def get_group_member(
+    group: Union[int, Group],
+    member_uin: int,
+    cache: bool = True,
+    uin: Optional[int] = None,
+) -> Optional[GroupMember]:
+    """Get account group member.
+
+    This function wraps the :meth:`~cai.client.client.Client.get_group_member`
+    method of the client.
+
+    Args:
+        group (Union[int, Group]): Group id or group object.
+        member_uin (int): Member uin.
+        cache (bool, optional): Use cached group member list. Defaults to True.
+        uin (Optional[int], optional): Account of the client want to use.
+            Defaults to None.
+
+    Returns:
+        GroupMember: Group member object.
+        None: Group or member not exists.
+
+    Raises:
+        RuntimeError: Error response type got. This should not happen.
+        ApiResponseError: Get group list failed.
+        GroupMemberListException: Get group member list returned non-zero ret code.
+    """
+    client = get_client(uin)
+    return await client.get_group_member(group, member_uin, cache)
+
+
+async def prefetch_group_members(
+    groups: Optional[Iterable[Union[int, Group]]] = None,
+    concurrency: int = 4,
+    rate: Optional[float] = 10.0,
+    callback: Optional[Callable[[MemberPrefetch], Any]] = None,
+    cache: bool = True,
+    uin: Optional[int] = None,
+) -> List[MemberPrefetch]:
+    """Prefetch member lists of many groups.
+
+    This function wraps the :meth:`~cai.client.client.Client.prefetch_group_members`
+    method of the client.
+
+    Args:
+        groups (Optional[Iterable[Union[int, Group]]], optional): Group ids
+            or group objects. Defaults to all groups.
+        concurrency (int, optional): Max number of groups fetched at the same
+            time. Defaults to 4.
+        rate (Optional[float], optional): Max number of member list requests
+            per second, ``None`` for no limit. Defaults to 10.
+        callback (Optional[Callable[[MemberPrefetch], Any]], optional): Called
+            with the result once a group is finished. Defaults to None.
+        cache (bool, optional): Skip groups with unexpired cached member list.
+            Defaults to True.
+        uin (Optional[int], optional): Account of the client want to use.
+            Defaults to None.
+
+    Returns:
+        List[MemberPrefetch]: Result of each group fetched.
+    """
+    client = get_client(uin)
+    return await client.prefetch_group_members(
+        groups, concurrency, rate, callback, cache
+    )
+
+
+__all__ = [
+    "get_group",
+    "get_group_list",
+    "get_group_member_list",
+    "get_group_member",
+    "prefetch_group_members",
+]
@@ -19,7 +19,9 @@ from .client import get_client
 async def login(uin: int, password_md5: Optional[bytes] = None) -> Client:
     """Create a new client (or use an existing one) and login.
 
-    Password md5 should be provided when login a new account.
+    Password md5 should be provided when login a new account. Saved session
+    of the account is tried first, see
+    :meth:`~cai.client.client.Client.fast_login`.
 
     This function wraps the :meth:`~cai.client.client.Client.login` method of the client.
 
@@ -46,7 +48,8 @@ async def login(uin: int, password_md5: Optional[bytes] = None) -> Client:
 
     await client.reconnect()
     try:
-        await client.login()
+        if not await client.fast_login():
+            await client.login()
     except LoginException:
         raise
     except Exception:
@@ -11,8 +11,10 @@ This module is main entry point for the application.
 
 from .event import Event
 from .command import Command
+from .stats import ClientStats
+from .cache import MemberPrefetch
 from .packet import IncomingPacket
 from .client import HANDLERS, Client
 from .status_service import OnlineStatus, RegPushReason
-from .message_service import GroupMessage, PrivateMessage
+from .message_service import GroupMessage, MessageEvent, PrivateMessage
 from .models import Group, Friend, FriendGroup, GroupMember, GroupMemberRole
@@ -0,0 +1,257 @@
+"""Client Cache.
+
+This module is used to manage cached group member lists.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import time
+import random
+import asyncio
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Any, Dict, List, Callable, Optional, Awaitable
+
+from cai.log import logger
+
+from .models import Group, GroupMember
+
+
+@dataclass
+class _Entry:
+    group: Group
+    size: int
+    expires_at: float
+
+
+@dataclass
+class MemberPrefetch:
+    """Result of prefetching member list of a group.
+
+    Attributes:
+        group_id (int): Group id.
+        members (int): Number of members fetched.
+        latency (float): Seconds spent fetching the member list.
+        error (Optional[Exception]): Exception raised while fetching.
+        done (int): Number of groups finished, including this one.
+        total (int): Number of groups to prefetch.
+    """
+
+    group_id: int
+    members: int
+    latency: float
+    error: Optional[Exception]
+    done: int
+    total: int
+
+
+class GroupMemberCache:
+    """Expiry and eviction of cached group member lists.
+
+    Member lists are stored on :class:`~cai.client.models.Group` objects,
+    this class tracks when each list expires and how many members are cached
+    in total.
+
+    * Expired lists are still returned while a refresh runs in background
+      (stale-while-revalidate).
+    * Each list gets a TTL with random jitter, so groups fetched together do
+      not expire together. Background refreshes run with bounded concurrency.
+    * Concurrent refreshes of the same group share one request.
+    * When more than ``max_members`` members are cached, member lists of the
+      least recently used groups are dropped.
+
+    Args:
+        refresh (Callable[..., Awaitable[None]]): Fetch member list and
+            store it on the group, called with the group object.
+        ttl (float, optional): Seconds before a member list expires.
+            Defaults to 3600.
+        max_members (int, optional): Max number of cached members of all
+            groups. Defaults to 500000.
+        jitter (float, optional): TTL jitter ratio. Defaults to 0.1.
+        concurrency (int, optional): Max number of background refreshes at
+            the same time. Defaults to 2.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[..., Awaitable[None]],
+        ttl: float = 3600.0,
+        max_members: int = 500000,
+        jitter: float = 0.1,
+        concurrency: int = 2,
+    ):
+        self.ttl = ttl
+        self.max_members = max_members
+        self.jitter = jitter
+        self.concurrency = concurrency
+
+        self._refresh = refresh
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._total: int = 0
+        self._tasks: Dict[int, "asyncio.Task[None]"] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.hits: int = 0
+        self.stale_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    @property
+    def total_members(self) -> int:
+        """:obj:`int`: Number of cached members of all groups."""
+        return self._total
+
+    def __contains__(self, group_id: int) -> bool:
+        return group_id in self._entries
+
+    def _get_entry(self, group: Group) -> Optional[_Entry]:
+        entry = self._entries.get(group.group_id)
+        # group list refreshed, cached members belong to an old group object
+        if entry and entry.group is not group:
+            return None
+        return entry
+
+    async def get(self, group: Group, cache: bool = True) -> List[GroupMember]:
+        """Get member list of the group.
+
+        Args:
+            group (Group): Group object.
+            cache (bool, optional): Use cached member list, even if expired.
+                Defaults to True.
+
+        Returns:
+            List[GroupMember]: Group member list.
+        """
+        entry = self._get_entry(group)
+        if cache and not entry and group._cached_member_list:
+            # members set elsewhere, start tracking them
+            entry = self.put(group)
+        if not cache or not entry:
+            self.misses += 1
+            await self.refresh(group)
+            return group._cached_member_list
+
+        if time.monotonic() >= entry.expires_at:
+            self.stale_hits += 1
+            self.refresh_later(group)
+        else:
+            self.hits += 1
+        self._entries.move_to_end(group.group_id)
+        return group._cached_member_list
+
+    def is_fresh(self, group: Group) -> bool:
+        """Whether member list of the group is cached and not expired."""
+        entry = self._get_entry(group)
+        return bool(entry) and time.monotonic() < entry.expires_at  # type: ignore
+
+    async def refresh(self, group: Group, *args: Any) -> None:
+        """Refresh member list of the group and wait for it.
+
+        Args:
+            group (Group): Group object.
+            *args (Any): Extra arguments passed to ``refresh`` function, if
+                no refresh of the group is running.
+        """
+        task = self._tasks.get(group.group_id)
+        if not task:
+            task = self._start_refresh(group, False, *args)
+        # one caller cancelled should not cancel the shared refresh
+        await asyncio.shield(task)
+
+    def refresh_later(self, group: Group) -> None:
+        """Refresh member list of the group in background."""
+        if group.group_id not in self._tasks:
+            self._start_refresh(group, True)
+
+    def _start_refresh(
+        self, group: Group, background: bool, *args: Any
+    ) -> "asyncio.Task[None]":
+        task = asyncio.create_task(self._run_refresh(group, background, *args))
+        self._tasks[group.group_id] = task
+        return task
+
+    async def _run_refresh(
+        self, group: Group, background: bool, *args: Any
+    ) -> None:
+        try:
+            if background:
+                if not self._semaphore:
+                    self._semaphore = asyncio.Semaphore(self.concurrency)
+                async with self._semaphore:
+                    await self._refresh(group)
+            else:
+                await self._refresh(group, *args)
+            self.put(group)
+        except Exception:
+            if not background:
+                raise
+            logger.exception(f"Refresh group {group.group_id} members failed")
+        finally:
+            self._tasks.pop(group.group_id, None)
+
+    def put(self, group: Group, expired: bool = False) -> _Entry:
+        """Track member list already set on the group.
+
+        Args:
+            group (Group): Group object with members set.
+            expired (bool, optional): Refresh the list on next read, e.g. the
+                list is loaded from disk. Defaults to False.
+        """
+        old = self._entries.pop(group.group_id, None)
+        if old:
+            self._total -= old.size
+
+        size = len(group._cached_member_list)
+        ttl = self.ttl * (1 + random.uniform(-self.jitter, self.jitter))
+        entry = _Entry(group, size, 0 if expired else time.monotonic() + ttl)
+        self._entries[group.group_id] = entry
+        self._total += size
+        self._evict()
+        return entry
+
+    def rebind(self, group: Group) -> None:
+        """Move tracked member list to a new object of the same group."""
+        entry = self._entries.get(group.group_id)
+        if entry and entry.group is not group:
+            group._set_members(entry.group._cached_member_list)
+            for member in group._cached_member_list:
+                member._group = group
+            entry.group = group
+
+    def _evict(self) -> None:
+        # keep the most recently stored group even if it is too large
+        while self._total > self.max_members and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._total -= entry.size
+            entry.group._set_members([])
+            self.evictions += 1
+
+    def discard(self, group_id: int) -> None:
+        """Drop member list of the group."""
+        entry = self._entries.pop(group_id, None)
+        if entry:
+            self._total -= entry.size
+            entry.group._set_members([])
+
+    def invalidate(self, group_id: int) -> None:
+        """Mark member list of the group expired."""
+        entry = self._entries.get(group_id)
+        if entry:
+            entry.expires_at = 0
+
+    def cancel(self) -> None:
+        """Cancel all running refreshes."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def clear(self) -> None:
+        """Drop all cached member lists and cancel running refreshes."""
+        self.cancel()
+        for entry in self._entries.values():
+            entry.group._set_members([])
+        self._entries.clear()
+        self._total = 0
@@ -9,29 +9,44 @@ This module is used to control client actions (low-level api).
     https://github.com/cscs181/CAI/blob/master/LICENSE
 """
 import time
-import struct
+import random
 import asyncio
 import secrets
+from collections import deque
+from dataclasses import replace
+from concurrent.futures import Executor
 from typing import (
     Any,
     Set,
     Dict,
     List,
+    Deque,
+    Tuple,
     Union,
     Callable,
+    Iterable,
     Optional,
     Awaitable,
     overload,
 )
 
-from cachetools import TTLCache
-
 from cai.log import logger
+from cai.utils.batch import Batcher
 from cai.utils.binary import Packet
-from cai.utils.future import FutureStore
+from cai.utils.dedup import DedupIndex
 from cai.settings.device import get_device
+from cai.utils.future import InFlightTable
+from cai.pb.msf.msg.svc import PbDeleteMsgReq
 from cai.connection import Connection, connect
 from cai.settings.protocol import get_protocol
+from cai.utils.coroutine import CPUTimer, RateLimiter, bounded_map
+from cai.utils.dispatcher import (
+    PRIORITY_LOW,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    Dispatcher,
+    DispatchStats,
+)
 from cai.exceptions import (
     LoginException,
     ApiResponseError,
@@ -43,24 +58,38 @@ from cai.exceptions import (
     LoginCaptchaNeeded,
     FriendListException,
     LoginSMSRequestError,
+    BaseFriendListException,
     GroupMemberListException,
 )
 
 from .event import Event
+from .stats import ClientStats
 from .packet import IncomingPacket
+from .snapshot import SnapshotStore
+from .listener import ListenerRegistry
+from .session import Session, SessionStore
 from .command import Command, _packet_to_command
-from .sso_server import SsoServer, get_sso_server
+from .cache import MemberPrefetch, GroupMemberCache
 from .online_push import handle_c2c_sync, handle_push_msg
 from .heartbeat import Heartbeat, encode_heartbeat, handle_heartbeat
 from .models import Group, Friend, SigInfo, FriendGroup, GroupMember
 from .config_push import FileServerPushList, handle_config_push_request
+from .sso_server import (
+    SsoServer,
+    get_sso_server,
+    get_sso_servers,
+    demote_sso_server,
+)
 from .message_service import (
     SyncFlag,
+    MessageEvent,
+    FragmentBuffer,
     GetMessageCommand,
     encode_get_message,
     handle_get_message,
     handle_push_notify,
     handle_force_offline,
+    encode_delete_message,
 )
 from .status_service import (
     OnlineStatus,
@@ -111,6 +140,7 @@ from .wtlogin import (
 
 HT = Callable[["Client", IncomingPacket], Awaitable[Command]]
 LT = Callable[["Client", Event], Awaitable[None]]
+SLT = Callable[["Client", Event], None]
 
 DEVICE = get_device()
 APK_INFO = get_protocol()
@@ -134,12 +164,115 @@ HANDLERS: Dict[str, HT] = {
     "OnlinePush.PbPushC2CMsg": handle_push_msg,
     # "OnlinePush.PbPushBindUinGroupMsg": handle_push_msg,  # sub account
 }
+COMMAND_PRIORITY: Dict[str, int] = {
+    "wtlogin.login": PRIORITY_HIGH,
+    "wtlogin.exchange_emp": PRIORITY_HIGH,
+    "StatSvc.register": PRIORITY_HIGH,
+    "StatSvc.SetStatusFromClient": PRIORITY_HIGH,
+    "StatSvc.ReqMSFOffline": PRIORITY_HIGH,
+    "ConfigPushSvc.PushReq": PRIORITY_HIGH,
+    "Heartbeat.Alive": PRIORITY_HIGH,
+    "MessageSvc.PushForceOffline": PRIORITY_HIGH,
+    "OnlinePush.PbPushGroupMsg": PRIORITY_LOW,
+    "OnlinePush.PbPushDisMsg": PRIORITY_LOW,
+}
 
 
 class Client:
-    LISTENERS: Set[LT] = set()
-
-    def __init__(self, uin: int, password_md5: bytes):
+    """Client for one account.
+
+    Args:
+        uin (int): QQ number.
+        password_md5 (bytes): MD5 of the password.
+        dispatch_workers (int, optional): Number of workers handling incoming
+            packets and events. Defaults to 8.
+        dispatch_queue_size (int, optional): Max number of queued incoming
+            packets and events. Defaults to 4096.
+        decode_executor (Optional[Executor], optional): Executor decrypting
+            and parsing incoming frames out of the event loop, e.g. a
+            :class:`~concurrent.futures.ProcessPoolExecutor` shared by clients.
+            Packets are still handled in receive order. Defaults to None.
+        decode_queue_size (int, optional): Max number of frames being decoded
+            in executor before reading is paused. Defaults to 256.
+        member_cache_ttl (float, optional): Seconds before a cached group
+            member list is refreshed in background. Defaults to 3600.
+        max_cached_members (int, optional): Max number of cached group
+            members of all groups. Defaults to 500000.
+        snapshot (bool, optional): Save friend, group and group member lists
+            to an unencrypted :attr:`Storage.snapshot_file`. Saved lists are
+            served right after login and refreshed in background.
+            Defaults to False.
+        session (bool, optional): Save login session to an encrypted file
+            under :attr:`Storage.app_dir` for :meth:`fast_login`.
+            Defaults to True.
+        friend_list_window (int, optional): Max number of friend list pages
+            requested at the same time. Defaults to 4.
+        drop_raw_message (bool, optional): Drop raw protobuf ``_msg`` of
+            message events once their elements are decoded.
+            Defaults to False.
+        fragment_timeout (float, optional): Seconds to wait for missing
+            fragments of a long message. Defaults to 60.
+        max_fragment_bytes (int, optional): Max size of buffered long
+            message fragments. Defaults to 4 MiB.
+        message_dedup_ttl (float, optional): Seconds to remember received
+            messages for deduplication. Defaults to 3600.
+        message_dedup_capacity (int, optional): Max number of remembered
+            messages. Defaults to 65536.
+        delete_batch_size (int, optional): Max number of read messages
+            acknowledged in one ``MessageSvc.PbDeleteMsg``. Defaults to 100.
+        delete_batch_delay (float, optional): Max seconds a read message
+            waits for its acknowledgement. Defaults to 1.
+        write_flush_delay (float, optional): Seconds to collect outgoing
+            packets into one write. ``0`` writes packets sent in the same
+            loop iteration together. Defaults to 0.
+        write_high_water (int, optional): Buffered outgoing bytes before
+            :meth:`send` waits. Defaults to 256 KiB.
+        heartbeat_interval (float, optional): Seconds without received
+            packets before a heartbeat is sent. Defaults to 300.
+        heartbeat_min_interval (float, optional): Min seconds between
+            heartbeats after missed responses. Defaults to 30.
+        heartbeat_max_misses (int, optional): Missed heartbeats in a row
+            before the connection is closed. Defaults to 3.
+        auto_reconnect (bool, optional): Reconnect and register again when
+            the connection of a registered client is lost. Defaults to True.
+        reconnect_delay (float, optional): Seconds to wait after the first
+            failed reconnect, doubled after each failure. Defaults to 1.
+        reconnect_max_delay (float, optional): Max seconds to wait between
+            reconnects. Defaults to 60.
+    """
+
+    LISTENERS: ListenerRegistry = ListenerRegistry()
+
+    def __init__(
+        self,
+        uin: int,
+        password_md5: bytes,
+        *,
+        dispatch_workers: int = 8,
+        dispatch_queue_size: int = 4096,
+        decode_executor: Optional[Executor] = None,
+        decode_queue_size: int = 256,
+        member_cache_ttl: float = 3600.0,
+        max_cached_members: int = 500000,
+        snapshot: bool = False,
+        session: bool = True,
+        friend_list_window: int = 4,
+        drop_raw_message: bool = False,
+        fragment_timeout: float = 60.0,
+        max_fragment_bytes: int = 4 * 2 ** 20,
+        message_dedup_ttl: float = 3600.0,
+        message_dedup_capacity: int = 65536,
+        delete_batch_size: int = 100,
+        delete_batch_delay: float = 1.0,
+        write_flush_delay: float = 0.0,
+        write_high_water: int = 256 * 1024,
+        heartbeat_interval: float = 300.0,
+        heartbeat_min_interval: float = 30.0,
+        heartbeat_max_misses: int = 3,
+        auto_reconnect: bool = True,
+        reconnect_delay: float = 1.0,
+        reconnect_max_delay: float = 60.0,
+    ):
         # account info
         self._uin: int = uin
         self._password_md5: bytes = password_md5
@@ -150,6 +283,9 @@ class Client:
         self._friend_list: List[Friend] = []
         self._friend_group_list: List[FriendGroup] = []
         self._group_list: List[Group] = []
+        self._friend_index: Dict[int, Friend] = {}
+        self._friend_group_index: Dict[int, FriendGroup] = {}
+        self._group_index: Dict[int, Group] = {}
         self._other_clients: List[Any] = []
 
         # server info
@@ -158,9 +294,22 @@ class Client:
         self._key: bytes = secrets.token_bytes(16)
         self._session_id: bytes = bytes([0x02, 0xB0, 0x5B, 0x8B])
         self._connection: Optional[Connection] = None
-        self._heartbeat_interval: int = 300
+        self._heartbeat_interval: float = heartbeat_interval
+        self._heartbeat_min_interval: float = heartbeat_min_interval
+        self._heartbeat_max_misses: int = heartbeat_max_misses
         self._heartbeat_enabled: bool = False
+        self._heartbeat_misses: int = 0
+        self._heartbeat_timer: Optional[asyncio.TimerHandle] = None
+        self._heartbeat_stopped: Optional["asyncio.Future[None]"] = None
+        self._last_receive_time: float = time.monotonic()
         self._file_storage_info: Optional[FileServerPushList] = None
+        self._write_flush_delay: float = write_flush_delay
+        self._write_high_water: int = write_high_water
+        self._auto_reconnect: bool = auto_reconnect
+        self._reconnect_delay: float = reconnect_delay
+        self._reconnect_max_delay: float = reconnect_max_delay
+        self._supervised: bool = False
+        self._recover_task: Optional["asyncio.Task[None]"] = None
 
         self._ip_address: bytes = bytes()
         self._ksid: bytes = f"|{DEVICE.imei}|A8.2.7.27f6ea96".encode()
@@ -176,12 +325,41 @@ class Client:
         self._t530: bytes = bytes()
 
         self._init_flag: bool = False
-        self._listeners: Set[LT] = set()
+        self._listeners: ListenerRegistry = ListenerRegistry()
         self._siginfo: SigInfo = SigInfo()
         self._sync_cookie: bytes = bytes()
         self._pubaccount_cookie: bytes = bytes()
-        self._msg_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
-        self._receive_store: FutureStore[int, Command] = FutureStore()
+        self._msg_dedup: DedupIndex = DedupIndex(
+            message_dedup_ttl, message_dedup_capacity
+        )
+        self._drop_raw_message: bool = drop_raw_message
+        self._delete_batcher: Batcher[PbDeleteMsgReq.MsgItem] = Batcher(
+            self._delete_messages, delete_batch_size, delete_batch_delay
+        )
+        self._fragments: FragmentBuffer = FragmentBuffer(
+            fragment_timeout, max_fragment_bytes
+        )
+        self._receive_store: InFlightTable[Command] = InFlightTable()
+        self._dispatcher: Dispatcher = Dispatcher(
+            dispatch_workers, dispatch_queue_size
+        )
+        self._decode_executor: Optional[Executor] = decode_executor
+        self._decode_queue_size: int = decode_queue_size
+        self._decode_queue: Deque["asyncio.Future[IncomingPacket]"] = deque()
+        self._decode_task: Optional["asyncio.Task[None]"] = None
+        self._stats: ClientStats = ClientStats(uin)
+        self._member_cache: GroupMemberCache = GroupMemberCache(
+            self._refresh_group_member_list,
+            ttl=member_cache_ttl,
+            max_members=max_cached_members,
+        )
+        self._snapshot: Optional[SnapshotStore] = (
+            SnapshotStore(uin) if snapshot else None
+        )
+        self._snapshot_tasks: Set["asyncio.Task[None]"] = set()
+        self._reconcile_task: Optional["asyncio.Task[None]"] = None
+        self._session_enabled: bool = session
+        self._friend_list_window: int = friend_list_window
 
     def __str__(self) -> str:
         return f"<cai client object for {self.uin}>"
@@ -231,6 +409,37 @@ class Client:
         """
         return self._status
 
+    @property
+    def stats(self) -> ClientStats:
+        """Resource usage of the client.
+
+        Returns:
+            ClientStats: Snapshot of the counters.
+        """
+        return replace(
+            self._stats,
+            pending_futures=len(self._receive_store),
+            in_flight=self._receive_store.stats,
+            write=self._connection.write_stats if self._connection else None,
+            cached_friends=len(self._friend_list),
+            cached_groups=len(self._group_list),
+            cached_group_members=self._member_cache.total_members,
+            cached_messages=len(self._msg_dedup),
+            dispatch=self._dispatcher.stats,
+            fragments=self._fragments.stats,
+            dedup=self._msg_dedup.stats,
+            delete_batch=self._delete_batcher.stats,
+        )
+
+    @property
+    def dispatch_stats(self) -> DispatchStats:
+        """Counters of incoming packet and event dispatching.
+
+        Returns:
+            DispatchStats: Queue depth, drop counters and so on.
+        """
+        return self._dispatcher.stats
+
     @property
     def connection(self) -> Connection:
         """
@@ -273,7 +482,12 @@ class Client:
         logger.info(f"Connecting to server: {_server.host}:{_server.port}")
         try:
             self._connection = await connect(
-                _server.host, _server.port, ssl=False, timeout=3.0
+                _server.host,
+                _server.port,
+                ssl=False,
+                timeout=3.0,
+                flush_delay=self._write_flush_delay,
+                write_high_water=self._write_high_water,
             )
             asyncio.create_task(self.receive())
         except ConnectionError as e:
@@ -285,9 +499,20 @@ class Client:
             )
 
     async def disconnect(self) -> None:
-        """Disconnect if already connected to the server."""
+        """Disconnect if already connected to the server.
+
+        Requests waiting for response raise :exc:`ConnectionError`. The
+        connection will not be recovered automatically.
+        """
+        self._supervised = False
+        if self.connected:
+            await self._delete_batcher.flush()
+        await self._close_connection()
+
+    async def _close_connection(self) -> None:
         if self._connection:
             await self._connection.close()
+        self._receive_store.cancel_all(ConnectionError("Connection closed"))
 
     async def reconnect(
         self, change_server: bool = False, server: Optional[SsoServer] = None
@@ -295,6 +520,8 @@ class Client:
         """Reconnect to the server.
 
         The ``server`` arg only take effect if ``change_server`` is True.
+        Without ``server``, the best server in the sso server catalogue is
+        used, see :func:`~cai.client.sso_server.get_sso_server`.
 
         Args:
             change_server (bool, optional): True if you want to change the server. Defaults to False.
@@ -309,9 +536,8 @@ class Client:
             if change_server and self._connection
             else []
         )
-        _server = server or await get_sso_server(
-            cache=False, cache_server_list=True, exclude=exclude
-        )
+        # next best server in the catalogue, tested again in background
+        _server = server or await get_sso_server(exclude=exclude)
         await self.disconnect()
         await self.connect(_server)
 
@@ -323,8 +549,22 @@ class Client:
             and self.status != OnlineStatus.Offline
         ):
             await self.register(OnlineStatus.Offline)
+        self._stop_heartbeat()
         self._receive_store.cancel_all()
         await self.disconnect()
+        if self._recover_task:
+            self._recover_task.cancel()
+        if self._decode_task:
+            self._decode_task.cancel()
+        self._decode_queue.clear()
+        self._delete_batcher.cancel()
+        self._fragments.clear()
+        self._member_cache.cancel()
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        if self._snapshot:
+            self._snapshot.close()
+        await self._dispatcher.close()
 
     @property
     def seq(self) -> int:
@@ -337,10 +577,12 @@ class Client:
     def next_seq(self) -> int:
         """Get next packet sequence number.
 
+        Sequences of requests still waiting for response are skipped.
+
         Returns:
             int: next sequence number.
         """
-        self._seq = (self._seq + 1) % 0x7FFF
+        self._seq = self._receive_store.next_seq(self._seq, 0x7FFF)
         return self._seq
 
     async def send(
@@ -357,7 +599,21 @@ class Client:
             None.
         """
         logger.debug(f"--> {seq}: {command_name}")
-        await self.connection.awrite(packet)
+        self._stats.frames_out += 1
+        self._stats.bytes_out += len(packet)
+        # login and keepalive packets skip queued packets
+        await self.connection.awrite(
+            packet, COMMAND_PRIORITY.get(command_name) == PRIORITY_HIGH
+        )
+
+    async def _delete_messages(
+        self, items: List[PbDeleteMsgReq.MsgItem]
+    ) -> None:
+        seq = self.next_seq()
+        packet = encode_delete_message(
+            seq, self._session_id, self.uin, self._siginfo.d2key, items
+        )
+        await self.send(seq, "MessageSvc.PbDeleteMsg", packet)
 
     async def send_and_wait(
         self,
@@ -377,13 +633,22 @@ class Client:
         Returns:
             Command: Response.
         """
-        await self.send(seq, command_name, packet)
+        # registered before sending, response may arrive during the write
+        if seq not in self._receive_store:
+            self._receive_store.store_seq(seq)
+        try:
+            await self.send(seq, command_name, packet)
+        except BaseException:
+            self._receive_store.discard(seq)
+            raise
         return await self._receive_store.fetch(seq, timeout)
 
     async def _handle_incoming_packet(self, in_packet: IncomingPacket) -> None:
         try:
             handler = HANDLERS.get(in_packet.command_name, _packet_to_command)
-            packet = await handler(self, in_packet)
+            packet = await CPUTimer(
+                handler(self, in_packet), self._add_handler_time
+            )
             self._receive_store.store_result(packet.seq, packet)
         except Exception as e:
             # TODO: handle exception
@@ -395,51 +660,297 @@ class Client:
         Note:
             Source: com.tencent.mobileqq.msf.core.auth.n.a
         """
+        connection = self._connection
         while self.connected:
             try:
-                length: int = (
-                    struct.unpack(">i", await self.connection.read_bytes(4))[0]
-                    - 4
+                await self.connection.read_frames(self._receive_frame)
+            except ConnectionAbortedError:
+                logger.debug(f"Client {self.uin} connection closed")
+            except Exception as e:
+                logger.exception(e)
+        # connection is not replaced by a new one
+        if self._connection is connection and not self.connected:
+            self._connection_lost("connection closed")
+
+    def _connection_lost(self, reason: str) -> bool:
+        """Start recovering the connection if the client should be online.
+
+        Returns:
+            bool: True if the connection is being recovered.
+        """
+        if self._recover_task:
+            return True
+        if not self._auto_reconnect or not self._supervised:
+            return False
+        self._recover_task = asyncio.create_task(self._recover(reason))
+        return True
+
+    async def _recover(self, reason: str) -> None:
+        """Reconnect to the next best server until registered again.
+
+        The first reconnect is done immediately, later ones back off
+        exponentially with jitter. Servers failed to connect are moved to the
+        end of the ranking, latency is tested again after all of them failed.
+        Recovery stops if the session is rejected.
+        """
+        start = time.monotonic()
+        self._stats.connection_losses += 1
+        logger.warning(
+            f"Client {self.uin} connection lost ({reason}), reconnecting"
+        )
+        self._pause_heartbeat()
+        if self._connection:
+            demote_sso_server(self._connection.host)
+        await self._close_connection()
+
+        status = (
+            self._status
+            if self._status and self._status != OnlineStatus.Offline
+            else OnlineStatus.Online
+        )
+        tried: Set[str] = set()
+        attempt = 0
+        try:
+            while self._supervised:
+                if attempt:
+                    delay = min(
+                        self._reconnect_max_delay,
+                        self._reconnect_delay * 2 ** (attempt - 1),
+                    )
+                    # spread reconnects of clients lost at the same time
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+                self._stats.reconnect_attempts += 1
+                server: Optional[SsoServer] = None
+                try:
+                    servers = await get_sso_servers()
+                    if servers[0].host in tried:
+                        tried.clear()
+                        servers = await get_sso_servers(refresh=True)
+                    server = servers[0]
+                    tried.add(server.host)
+                    await self.connect(server)
+                    await self._resume(status)
+                except (
+                    LoginException,
+                    RegisterException,
+                    ApiResponseError,
+                ) as e:
+                    # session rejected, other servers will reject it too
+                    logger.error(f"Client {self.uin} failed to recover: {e!r}")
+                    self._stop_heartbeat()
+                    await self.disconnect()
+                    return
+                except Exception as e:
+                    logger.warning(
+                        f"Client {self.uin} reconnect attempt {attempt} "
+                        f"failed: {e!r}"
+                    )
+                    if server and isinstance(
+                        e, (OSError, asyncio.TimeoutError)
+                    ):
+                        demote_sso_server(server.host)
+                    await self._close_connection()
+                    continue
+
+                spent = time.monotonic() - start
+                self._stats.reconnects += 1
+                self._stats.recovery_time += spent
+                self._stats.last_recovery_time = spent
+                logger.info(
+                    f"Client {self.uin} recovered in {spent:.3f}s "
+                    f"after {attempt} attempt(s)"
                 )
-                # FIXME: length < 0 ?
-                data = await self.connection.read_bytes(length)
-                packet = IncomingPacket.parse(
-                    data,
+                return
+        finally:
+            self._recover_task = None
+
+    async def _resume(self, status: OnlineStatus) -> None:
+        try:
+            await self.register(status, RegPushReason.MsfByNetChange)
+        except RegisterException:
+            # tickets expired while offline
+            await self.refresh_siginfo()
+            await self.register(status, RegPushReason.MsfByNetChange)
+        # fetch messages received while offline
+        if self._sync_cookie:
+            await self._get_message(1, sync_cookie=self._sync_cookie)
+        else:
+            await self._get_message(0, online_sync_flag=1)
+
+    def _add_handler_time(self, spent: float) -> None:
+        self._stats.handler_time += spent
+
+    def _add_listener_time(self, spent: float) -> None:
+        self._stats.listener_time += spent
+
+    def _receive_frame(self, data: memoryview) -> None:
+        self._last_receive_time = time.monotonic()
+        self._stats.frames_in += 1
+        self._stats.bytes_in += len(data) + 4
+
+        # frames encrypted by ECDH (type 2) need the share key of this
+        # process, only d2key (type 1) frames can be decoded elsewhere
+        if self._decode_executor and len(data) > 4 and data[4] == 1:
+            self._decode_queue.append(
+                asyncio.get_running_loop().run_in_executor(
+                    self._decode_executor,
+                    IncomingPacket.parse,
+                    bytes(data),
                     self._key,
                     self._siginfo.d2key,
                     self._siginfo.wt_session_ticket_key,
                 )
-                logger.debug(
-                    f"<-- {packet.seq} ({packet.ret_code}): {packet.command_name}"
-                )
-                # do not block receive
-                asyncio.create_task(self._handle_incoming_packet(packet))
-            except ConnectionAbortedError:
-                logger.debug(f"Client {self.uin} connection closed")
-            except Exception as e:
-                logger.exception(e)
+            )
+            if len(self._decode_queue) >= self._decode_queue_size:
+                self.connection.pause_reading()
+            if not self._decode_task:
+                self._decode_task = asyncio.create_task(self._receive_decoded())
+            return
+
+        start = time.perf_counter()
+        try:
+            packet = IncomingPacket.parse(
+                data,
+                self._key,
+                self._siginfo.d2key,
+                self._siginfo.wt_session_ticket_key,
+            )
+        except Exception as e:
+            logger.exception(e)
+            return
+        finally:
+            self._stats.parse_time += time.perf_counter() - start
+
+        if self._decode_queue:
+            # keep order with frames being decoded in executor
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(packet)
+            self._decode_queue.append(future)
+        else:
+            self._dispatch_packet(packet)
+
+    async def _receive_decoded(self) -> None:
+        queue = self._decode_queue
+        try:
+            while queue:
+                try:
+                    packet = await queue[0]
+                except Exception as e:
+                    logger.exception(e)
+                    continue
+                else:
+                    self._dispatch_packet(packet)
+                finally:
+                    queue.popleft()
+                    if len(queue) == self._decode_queue_size // 2:
+                        if self.connected:
+                            self.connection.resume_reading()
+        finally:
+            self._decode_task = None
+
+    def _dispatch_packet(self, packet: IncomingPacket) -> None:
+        logger.debug(
+            f"<-- {packet.seq} ({packet.ret_code}): {packet.command_name}"
+        )
+        # do not block receive
+        if packet.seq in self._receive_store:
+            # replies to pending requests skip the queue, otherwise
+            # workers waiting for them may deadlock
+            asyncio.create_task(self._handle_incoming_packet(packet))
+        elif not self._dispatcher.submit(
+            COMMAND_PRIORITY.get(packet.command_name, PRIORITY_NORMAL),
+            self._handle_incoming_packet,
+            packet,
+        ):
+            logger.warning(
+                f"Dispatch queue full, packet dropped: "
+                f"{packet.seq} {packet.command_name}"
+            )
 
     @property
-    def listeners(self) -> Set[LT]:
-        return self._listeners | self.LISTENERS
+    def listeners(self) -> Set[Union[LT, SLT]]:
+        return set(self._listeners) | set(self.LISTENERS)
 
     async def _run_listener(self, listener: LT, event: Event) -> None:
         try:
-            await listener(self, event)
+            await CPUTimer(listener(self, event), self._add_listener_time)
+        except Exception as e:
+            logger.exception(e)
+
+    def _run_sync_listener(self, listener: SLT, event: Event) -> None:
+        start = time.perf_counter()
+        try:
+            listener(self, event)
         except Exception as e:
             logger.exception(e)
+        finally:
+            self._add_listener_time(time.perf_counter() - start)
 
     def dispatch_event(self, event: Event) -> None:
-        for listener in self.listeners:
-            asyncio.create_task(self._run_listener(listener, event))
+        self._stats.events_dispatched += 1
+        if self._drop_raw_message and isinstance(event, MessageEvent):
+            event.drop_raw_message()
+
+        listeners = self._listeners.match(event)
+        global_listeners = self.LISTENERS.match(event)
+        if listeners and global_listeners:
+            # listener added to both only runs once
+            callbacks = {listener.callback for listener in listeners}
+            listeners += [
+                listener
+                for listener in global_listeners
+                if listener.callback not in callbacks
+            ]
+        else:
+            listeners = listeners or global_listeners
 
-    def add_event_listener(self, listener: LT) -> None:
+        self._stats.listener_calls += len(listeners)
+        for listener in listeners:
+            if listener.sync:
+                self._run_sync_listener(listener.callback, event)
+            else:
+                self._dispatcher.submit(
+                    PRIORITY_NORMAL,
+                    self._run_listener,
+                    listener.callback,
+                    event,
+                )
+
+    def add_event_listener(
+        self,
+        listener: Union[LT, SLT],
+        event_type: Union[None, str, Iterable[str]] = None,
+        group_id: Union[None, int, Iterable[int]] = None,
+        from_uin: Union[None, int, Iterable[int]] = None,
+        sync: bool = False,
+    ) -> None:
         """Add event listener for this client.
 
+        Filters are indexed, listeners are only called with matched events.
+        Events without ``group_id`` or ``from_uin`` never match the filter.
+
         Args:
             listener (Callable[[Client, Event], Awaitable[None]]): Event listener.
+            event_type (Union[None, str, Iterable[str]], optional): Only
+                receive events of these :attr:`Event.type`. Defaults to None.
+            group_id (Union[None, int, Iterable[int]], optional): Only
+                receive events from these groups. Defaults to None.
+            from_uin (Union[None, int, Iterable[int]], optional): Only
+                receive events from these accounts. Defaults to None.
+            sync (bool, optional): Listener is a plain function called
+                inline when the event is dispatched, without creating a
+                task. It should be cheap and never block. Defaults to False.
+        """
+        self._listeners.add(listener, event_type, group_id, from_uin, sync)
+
+    def remove_event_listener(self, listener: Union[LT, SLT]) -> None:
+        """Remove event listener of this client.
+
+        Args:
+            listener (Callable[[Client, Event], Any]): Event listener.
         """
-        self._listeners.add(listener)
+        self._listeners.discard(listener)
 
     async def _handle_login_response(
         self, response: Command, try_times: int = 1
@@ -457,6 +968,7 @@ class Client:
 
         if isinstance(response, LoginSuccess):
             logger.info(f"{self.nick}({self.uin}) 登录成功！")
+            self._save_session()
             await self._init()
             return response
         elif isinstance(response, NeedCaptcha):
@@ -541,14 +1053,182 @@ class Client:
         self._init_flag = True
         # register client online status
         await self.register()
-        # force refresh group list
-        await self._refresh_group_list()
-        # force refresh friend list
-        await self._refresh_friend_list()
+        if await self._load_snapshot():
+            # serve saved lists and refresh them in background
+            self._reconcile_task = asyncio.create_task(
+                self._reconcile_snapshot()
+            )
+        else:
+            # force refresh group list
+            await self._refresh_group_list()
+            # force refresh friend list
+            await self._refresh_friend_list()
         # force refresh session message
         await self._get_message(0, online_sync_flag=1)
         self._init_flag = False
 
+    async def _load_snapshot(self) -> bool:
+        if not self._snapshot:
+            return False
+        loop = asyncio.get_running_loop()
+        try:
+            friends, friend_groups, groups = await loop.run_in_executor(
+                None, self._snapshot.load, self
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load snapshot: {e!r}")
+            return False
+        if not friends and not groups:
+            return False
+        self._set_friend_list(friends, friend_groups)
+        self._set_group_list(groups)
+        logger.debug(
+            f"Loaded {len(friends)} friends and {len(groups)} groups "
+            "from snapshot"
+        )
+        return True
+
+    async def _reconcile_snapshot(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            groups = self._group_list
+            members = await loop.run_in_executor(
+                None, self._snapshot.load_members, groups  # type: ignore
+            )
+            for group in groups:
+                # skip groups refreshed in the meantime
+                if group.group_code in members and not (
+                    group._cached_member_list
+                ):
+                    group._set_members(members[group.group_code])
+                    self._member_cache.put(group, expired=True)
+
+            await self._refresh_group_list()
+            await self._refresh_friend_list()
+        except Exception:
+            logger.exception("Failed to refresh lists loaded from snapshot")
+        finally:
+            self._reconcile_task = None
+
+    def _save_snapshot(self, func: Callable[..., None], *args: Any) -> None:
+        async def save():
+            try:
+                # one writer keeps saves in order
+                await asyncio.get_running_loop().run_in_executor(
+                    self._snapshot.writer, func, *args  # type: ignore
+                )
+            except Exception as e:
+                logger.warning(f"Failed to save snapshot: {e!r}")
+
+        task = asyncio.create_task(save())
+        self._snapshot_tasks.add(task)
+        task.add_done_callback(self._snapshot_tasks.discard)
+
+    def _get_session_store(self) -> Optional[SessionStore]:
+        # key depends on password, which may be changed before login
+        if not self._session_enabled:
+            return None
+        return SessionStore(self.uin, self._password_md5, DEVICE.guid)
+
+    def _save_session(self) -> None:
+        store = self._get_session_store()
+        if not store:
+            return
+        try:
+            store.save(self._dump_session())
+        except OSError as e:
+            logger.warning(f"Failed to save session: {e!r}")
+
+    def _dump_session(self) -> Session:
+        return Session(
+            self.uin,
+            self._siginfo,
+            ksid=self._ksid,
+            pwd_flag=self._pwd_flag,
+            rollback_sig=self._rollback_sig,
+            time_diff=self._time_diff,
+            ip_address=self._ip_address,
+            t104=self._t104,
+            t150=self._t150,
+            t174=self._t174,
+            t402=self._t402,
+            t528=self._t528,
+            t530=self._t530,
+            nick=self._nick,
+            age=self._age,
+            gender=self._gender,
+        )
+
+    def _restore_session(self, session: Session) -> None:
+        self._siginfo = session.siginfo
+        self._ksid = session.ksid
+        self._pwd_flag = session.pwd_flag
+        self._rollback_sig = session.rollback_sig
+        self._time_diff = session.time_diff
+        self._ip_address = session.ip_address
+        self._t104 = session.t104
+        self._t150 = session.t150
+        self._t174 = session.t174
+        self._t402 = session.t402
+        self._t528 = session.t528
+        self._t530 = session.t530
+        self._nick = session.nick
+        self._age = session.age
+        self._gender = session.gender
+
+    async def fast_login(self) -> bool:
+        """Go online with saved session instead of password login.
+
+        The client registers with saved tickets directly. If they expired,
+        tickets are refreshed with :meth:`refresh_siginfo` first. Client
+        should be connected before calling this method.
+
+        Returns:
+            bool: ``False`` if there is no usable session, :meth:`login`
+            should be used instead.
+        """
+        store = self._get_session_store()
+        session = store and store.load()
+        if not session:
+            return False
+
+        # tickets in memory are kept if the saved ones are rejected
+        previous = self._dump_session()
+        self._restore_session(session)
+        # server may drop the connection on stale tickets
+        dropped = (ConnectionError, RuntimeError)
+        try:
+            await self._init()
+        except (RegisterException, ApiResponseError, asyncio.TimeoutError):
+            logger.debug("Saved tickets expired, refreshing siginfo")
+            try:
+                await self.refresh_siginfo()
+                await self._init()
+            except (
+                LoginException,
+                RegisterException,
+                ApiResponseError,
+                asyncio.TimeoutError,
+                *dropped,
+            ) as e:
+                await self._abort_fast_login(store, previous, e)  # type: ignore
+                return False
+        except dropped as e:
+            await self._abort_fast_login(store, previous, e)  # type: ignore
+            return False
+        logger.info(f"{self.nick}({self.uin}) 快速登录成功！")
+        return True
+
+    async def _abort_fast_login(
+        self, store: SessionStore, previous: Session, error: Exception
+    ) -> None:
+        logger.info(f"Fast login failed: {error!r}")
+        store.clear()
+        self._restore_session(previous)
+        self._init_flag = False
+        if not self.connected:
+            await self.reconnect()
+
     async def login(self) -> LoginSuccess:
         """Login the account of the client.
 
@@ -798,7 +1478,9 @@ class Client:
         )
         response = await self.send_and_wait(seq, "wtlogin.exchange_emp", packet)
 
-        return await self._handle_refresh_response(response)
+        response = await self._handle_refresh_response(response)
+        self._save_session()
+        return response
 
     async def register(
         self,
@@ -844,7 +1526,8 @@ class Client:
                 response.uin, response.ret_code, response.message or ""
             )
         elif isinstance(response, RegisterSuccess):
-            asyncio.create_task(self.heartbeat())
+            self._supervised = status != OnlineStatus.Offline
+            self._start_heartbeat()
             return response
 
         raise ApiResponseError(
@@ -907,11 +1590,17 @@ class Client:
         )
 
     async def heartbeat(self) -> None:
-        """Do heartbeat.
+        """Do heartbeat until it stops.
 
         Calling this method more than once takes no effect.
 
-        Heartbeat will be down when an error occurred.
+        Heartbeats are scheduled on the timer wheel shared by all clients of
+        the loop. ``Heartbeat.Alive`` is only sent after
+        ``heartbeat_interval`` seconds without any received packet. A missed
+        response halves the interval down to ``heartbeat_min_interval``;
+        after ``heartbeat_max_misses`` misses in a row the connection is
+        considered dead and closed, or recovered if ``auto_reconnect`` is
+        enabled. Heartbeat will be down when other error occurred.
 
         Example:
             Create a heartbeat task using ``asyncio``.
@@ -919,82 +1608,232 @@ class Client:
             >>> import asyncio
             >>> asyncio.create_task(client.heartbeat())
         """
+        self._start_heartbeat()
+        if self._heartbeat_stopped:
+            await asyncio.shield(self._heartbeat_stopped)
+
+    def _start_heartbeat(self) -> None:
         if self._heartbeat_enabled:
             return
 
         self._heartbeat_enabled = True
+        self._heartbeat_misses = 0
+        if not self._heartbeat_stopped or self._heartbeat_stopped.done():
+            self._heartbeat_stopped = asyncio.get_running_loop().create_future()
+        self._schedule_heartbeat(self._heartbeat_interval)
+
+    def _stop_heartbeat(self) -> None:
+        self._pause_heartbeat()
+        if self._heartbeat_stopped and not self._heartbeat_stopped.done():
+            self._heartbeat_stopped.set_result(None)
+
+    def _pause_heartbeat(self) -> None:
+        # :meth:`heartbeat` keeps waiting until it is started again
+        self._heartbeat_enabled = False
+        if self._heartbeat_timer:
+            self._heartbeat_timer.cancel()
+            self._heartbeat_timer = None
+
+    def _schedule_heartbeat(self, delay: float) -> None:
+        # a single long timer, the timer wheel would tick all the time
+        self._heartbeat_timer = asyncio.get_running_loop().call_later(
+            delay, self._on_heartbeat_timer
+        )
 
-        while self._heartbeat_enabled and self.connected:
-            seq = self.next_seq()
-            packet = encode_heartbeat(
-                seq, self._session_id, self._ksid, self.uin
+    def _on_heartbeat_timer(self) -> None:
+        self._heartbeat_timer = None
+        if not self._heartbeat_enabled or not self.connected:
+            self._stop_heartbeat()
+            return
+
+        # received packets prove the connection alive
+        idle = time.monotonic() - self._last_receive_time
+        if not self._heartbeat_misses and idle < self._heartbeat_interval:
+            self._stats.heartbeats_skipped += 1
+            self._schedule_heartbeat(self._heartbeat_interval - idle)
+            return
+        asyncio.create_task(self._send_heartbeat())
+
+    async def _send_heartbeat(self) -> None:
+        seq = self.next_seq()
+        packet = encode_heartbeat(seq, self._session_id, self._ksid, self.uin)
+        # wait a few round trips, but not longer than a normal request
+        rtt = self._stats.heartbeat_rtt
+        timeout = min(10.0, max(2.0, rtt * 4)) if rtt else 10.0
+        start = time.perf_counter()
+        self._stats.heartbeats_sent += 1
+        try:
+            response = await self.send_and_wait(
+                seq, "Heartbeat.Alive", packet, timeout
             )
-            try:
-                response = await self.send_and_wait(
-                    seq, "Heartbeat.Alive", packet
+            if not isinstance(response, Heartbeat):
+                raise RuntimeError("Invalid heartbeat response type!")
+        except asyncio.TimeoutError:
+            self._heartbeat_misses += 1
+            self._stats.heartbeats_missed += 1
+            if self._heartbeat_misses >= self._heartbeat_max_misses:
+                logger.error(
+                    f"Heartbeat.Alive: {self._heartbeat_misses} missed, "
+                    "connection is dead"
+                )
+                if not self._connection_lost("heartbeat timeout"):
+                    self._stop_heartbeat()
+                    await self.disconnect()
+                return
+            self._schedule_heartbeat(
+                max(
+                    self._heartbeat_min_interval,
+                    self._heartbeat_interval / 2 ** self._heartbeat_misses,
                 )
-                if not isinstance(response, Heartbeat):
-                    raise RuntimeError("Invalid heartbeat response type!")
-            except Exception:
-                logger.exception("Heartbeat.Alive: Failed")
-                break
-            await asyncio.sleep(self._heartbeat_interval)
+            )
+            return
+        except Exception:
+            logger.exception("Heartbeat.Alive: Failed")
+            self._stop_heartbeat()
+            return
 
-        self._heartbeat_enabled = False
+        # smoothed like TCP SRTT
+        rtt = time.perf_counter() - start
+        self._stats.heartbeat_rtt = (
+            rtt
+            if self._stats.heartbeat_rtt is None
+            else 0.875 * self._stats.heartbeat_rtt + 0.125 * rtt
+        )
+        self._heartbeat_misses = 0
+        if self._heartbeat_enabled:
+            self._schedule_heartbeat(self._heartbeat_interval)
+
+    async def _get_friend_list_page(
+        self,
+        friend_index: int,
+        friend_count: int,
+        group_index: int,
+        group_count: int,
+    ) -> FriendListSuccess:
+        seq = self.next_seq()
+        packet = encode_get_friend_list(
+            seq,
+            self._session_id,
+            self.uin,
+            self._siginfo.d2key,
+            friend_index,
+            friend_count,
+            group_index,
+            group_count,
+        )
+        response = await self.send_and_wait(
+            seq, "friendlist.GetFriendListReq", packet
+        )
+
+        if not isinstance(response, FriendListCommand):
+            raise RuntimeError("Invalid get friend list response type!")
+        if isinstance(response, FriendListSuccess):
+            return response
+        elif isinstance(response, FriendListFail):
+            raise FriendListException(
+                response.uin, response.result, response.message
+            )
+        raise ApiResponseError(
+            response.uin,
+            response.seq,
+            response.ret_code,
+            response.command_name,
+        )
 
     async def _refresh_friend_list(self):
+        first = await self._get_friend_list_page(0, 200, 0, 100)
+        friend_count = first.response.total_friend_count
+        group_count = first.response.total_group_count
+        # offsets of remaining pages are known from the total counts
+        pages = [
+            (
+                index * 200,
+                200 if index * 200 < friend_count else 0,
+                index * 100,
+                100 if index * 100 < group_count else 0,
+            )
+            for index in range(
+                1,
+                max(-(-friend_count // 200), -(-group_count // 100)),
+            )
+        ]
+
+        friend_list: List[Friend] = []
+        group_list: List[FriendGroup] = []
+        try:
+            responses = [first] + await bounded_map(
+                lambda page: self._get_friend_list_page(*page),
+                pages,
+                self._friend_list_window,
+            )
+            for response in responses:
+                self._extend_friend_list(response, friend_list, group_list)
+            if len(friend_list) < friend_count or len(group_list) < group_count:
+                raise ValueError("Incomplete friend list pages")
+        except (
+            ValueError,
+            ApiResponseError,
+            BaseFriendListException,
+            asyncio.TimeoutError,
+        ) as e:
+            logger.debug(f"Fetch friend list concurrently failed: {e!r}")
+            friend_list, group_list = await self._fetch_friend_list()
+
+        self._set_friend_list(friend_list, group_list)
+        if self._snapshot:
+            self._save_snapshot(
+                self._snapshot.save_friend_list, friend_list, group_list
+            )
+
+    def _extend_friend_list(
+        self,
+        response: FriendListSuccess,
+        friend_list: List[Friend],
+        group_list: List[FriendGroup],
+    ) -> None:
+        friend_list.extend(
+            map(
+                lambda x: Friend.from_struct(x, self),
+                response.response.friend_info,
+            )
+        )
+        group_list.extend(
+            map(
+                lambda x: FriendGroup.from_struct(x, self),
+                response.response.group_info,
+            )
+        )
+
+    async def _fetch_friend_list(
+        self,
+    ) -> Tuple[List[Friend], List[FriendGroup]]:
+        # sequential pagination, next offsets follow received items
         friend_count = 0xFFFFFFFF_FFFFFFFF
         group_count = 0xFFFFFFFF_FFFFFFFF
         friend_list: List[Friend] = []
         group_list: List[FriendGroup] = []
         while len(friend_list) < friend_count or len(group_list) < group_count:
-            seq = self.next_seq()
-            packet = encode_get_friend_list(
-                seq,
-                self._session_id,
-                self.uin,
-                self._siginfo.d2key,
+            response = await self._get_friend_list_page(
                 len(friend_list),
                 200 if len(friend_list) < friend_count else 0,
                 len(group_list),
                 100 if len(group_list) < group_count else 0,
             )
-            response = await self.send_and_wait(
-                seq, "friendlist.GetFriendListReq", packet
-            )
+            self._extend_friend_list(response, friend_list, group_list)
+            friend_count = response.response.total_friend_count
+            group_count = response.response.total_group_count
+        return friend_list, group_list
 
-            if not isinstance(response, FriendListCommand):
-                raise RuntimeError("Invalid get friend list response type!")
-            if isinstance(response, FriendListSuccess):
-                friend_list.extend(
-                    map(
-                        lambda x: Friend.from_dict(
-                            {**x.dict(), "_client": self}
-                        ),
-                        response.response.friend_info,
-                    )
-                )
-                group_list.extend(
-                    map(
-                        lambda x: FriendGroup.from_dict(
-                            {**x.dict(), "_client": self}
-                        ),
-                        response.response.group_info,
-                    )
-                )
-                friend_count = response.response.total_friend_count
-                group_count = response.response.total_group_count
-                continue
-            elif isinstance(response, FriendListFail):
-                raise FriendListException(
-                    response.uin, response.result, response.message
-                )
-            raise ApiResponseError(
-                response.uin,
-                response.seq,
-                response.ret_code,
-                response.command_name,
-            )
+    def _set_friend_list(
+        self, friend_list: List[Friend], group_list: List[FriendGroup]
+    ) -> None:
+        # lists and indexes are replaced together
+        self._friend_index = {
+            friend.friend_uin: friend for friend in friend_list
+        }
+        self._friend_group_index = {
+            group.group_id: group for group in group_list
+        }
         self._friend_list = friend_list
         self._friend_group_list = group_list
 
@@ -1021,9 +1860,7 @@ class Client:
         if not cache:
             await self._refresh_friend_list()
 
-        return next(
-            filter(lambda x: x.friend_uin == uin, self._friend_list), None
-        )
+        return self._friend_index.get(uin)
 
     async def get_friend_list(self, cache: bool = True) -> List[Friend]:
         """Get Friend List.
@@ -1070,10 +1907,7 @@ class Client:
         if not cache:
             await self._refresh_friend_list()
 
-        return next(
-            filter(lambda x: x.group_id == group_id, self._friend_group_list),
-            None,
-        )
+        return self._friend_group_index.get(group_id)
 
     async def get_friend_group_list(
         self, cache: bool = True
@@ -1114,7 +1948,7 @@ class Client:
         if isinstance(response, TroopListSuccess):
             group_list.extend(
                 map(
-                    lambda x: Group.from_dict({**x.dict(), "_client": self}),
+                    lambda x: Group.from_struct(x, self),
                     response.response.troop_list,
                 )
             )
@@ -1135,7 +1969,6 @@ class Client:
                         response, try_times - 1
                     )
                 )
-            self._group_list = group_list
             return group_list
         elif isinstance(response, TroopListFail):
             raise GroupListException(
@@ -1158,6 +1991,19 @@ class Client:
             seq, "friendlist.GetTroopListReqV2", packet
         )
         group_list = await self._handle_group_list_response(response)
+        self._set_group_list(group_list)
+        if self._snapshot:
+            self._save_snapshot(self._snapshot.save_group_list, group_list)
+
+    def _set_group_list(self, group_list: List[Group]) -> None:
+        # keep cached members of groups still joined
+        for group in group_list:
+            self._member_cache.rebind(group)
+        left = self._group_index.keys() - {g.group_id for g in group_list}
+        for group_id in left:
+            self._member_cache.discard(group_id)
+        # list and index are replaced together
+        self._group_index = {group.group_id: group for group in group_list}
         self._group_list = group_list
 
     async def get_group(
@@ -1182,9 +2028,7 @@ class Client:
         if not cache:
             await self._refresh_group_list()
 
-        return next(
-            filter(lambda x: x.group_id == group_id, self._group_list), None
-        )
+        return self._group_index.get(group_id)
 
     async def get_group_list(self, cache: bool = True) -> List[Group]:
         """Get Group List.
@@ -1208,7 +2052,9 @@ class Client:
         await self._refresh_group_list()
         return self._group_list
 
-    async def _refresh_group_member_list(self, group: Group):
+    async def _refresh_group_member_list(
+        self, group: Group, limiter: Optional[RateLimiter] = None
+    ):
         """Handle Group Member List Response.
 
         Note:
@@ -1220,6 +2066,8 @@ class Client:
         group_list: List[GroupMember] = []
 
         while has_next:
+            if limiter:
+                await limiter.acquire()
             seq = self.next_seq()
             packet = encode_get_troop_member_list(
                 seq,
@@ -1241,9 +2089,7 @@ class Client:
             if isinstance(response, TroopMemberListSuccess):
                 group_list.extend(
                     map(
-                        lambda x: GroupMember.from_dict(
-                            {**x.dict(), "_client": self, "_group": group}
-                        ),
+                        lambda x: GroupMember.from_struct(x, self, group),
                         response.response.troop_member,
                     )
                 )
@@ -1261,7 +2107,9 @@ class Client:
                 response.ret_code,
                 response.command_name,
             )
-        group._cached_member_list = group_list
+        group._set_members(group_list)
+        if self._snapshot:
+            self._save_snapshot(self._snapshot.save_members, group, group_list)
 
     @overload
     async def get_group_member_list(
@@ -1280,7 +2128,8 @@ class Client:
     ) -> Optional[List[GroupMember]]:
         """Get Group Member List.
 
-        Return cached group member list if cache is ``True``.
+        Return cached group member list if cache is ``True``. Expired member
+        list is returned as well and refreshed in background.
 
         Args:
             group (Union[int, Group]): Group id or group object want to get members.
@@ -1303,10 +2152,123 @@ class Client:
         else:
             group_ = group
 
-        if not cache or not group_._cached_member_list:
-            await self._refresh_group_member_list(group_)
+        return await self._member_cache.get(group_, cache)
 
-        return group_._cached_member_list
+    @overload
+    async def get_group_member(
+        self, group: int, uin: int, cache: bool = True
+    ) -> Optional[GroupMember]:
+        ...
+
+    @overload
+    async def get_group_member(
+        self, group: Group, uin: int, cache: bool = True
+    ) -> Optional[GroupMember]:
+        ...
+
+    async def get_group_member(
+        self, group: Union[int, Group], uin: int, cache: bool = True
+    ) -> Optional[GroupMember]:
+        """Get Group Member.
+
+        Return cached group member if cache is ``True``. Expired member
+        list is used as well and refreshed in background.
+
+        Args:
+            group (Union[int, Group]): Group id or group object.
+            uin (int): Member uin.
+            cache (bool, optional): Use cached group member list. Defaults to True.
+
+        Returns:
+            GroupMember: Group member object.
+            None: Group or member not exists.
+
+        Raises:
+            RuntimeError: Error response type got. This should not happen.
+            ApiResponseError: Get group list failed.
+            GroupMemberListException: Get group member list returned non-zero ret code.
+        """
+        if isinstance(group, int):
+            group_ = await self.get_group(group, cache=True)
+
+            if not group_:
+                return
+        else:
+            group_ = group
+
+        await self._member_cache.get(group_, cache)
+        return group_._cached_member_index.get(uin)
+
+    async def prefetch_group_members(
+        self,
+        groups: Optional[Iterable[Union[int, Group]]] = None,
+        concurrency: int = 4,
+        rate: Optional[float] = 10.0,
+        callback: Optional[Callable[[MemberPrefetch], Any]] = None,
+        cache: bool = True,
+    ) -> List[MemberPrefetch]:
+        """Prefetch member lists of many groups.
+
+        Member lists of up to ``concurrency`` groups are fetched at the same
+        time, and member list requests of all groups are limited to ``rate``
+        per second. Groups failed to fetch are reported in the results instead
+        of raising.
+
+        Args:
+            groups (Optional[Iterable[Union[int, Group]]], optional): Group
+                ids or group objects. Defaults to all groups.
+            concurrency (int, optional): Max number of groups fetched at the
+                same time. Defaults to 4.
+            rate (Optional[float], optional): Max number of member list
+                requests per second, ``None`` for no limit. Defaults to 10.
+            callback (Optional[Callable[[MemberPrefetch], Any]], optional):
+                Called with the result once a group is finished.
+                Defaults to None.
+            cache (bool, optional): Skip groups with unexpired cached member
+                list. Defaults to True.
+
+        Returns:
+            List[MemberPrefetch]: Result of each group fetched, in the order
+            of ``groups``.
+        """
+        targets: List[Group] = []
+        for group in self._group_list if groups is None else groups:
+            if isinstance(group, int):
+                group_ = await self.get_group(group, cache=True)
+                if not group_:
+                    continue
+                group = group_
+            if not (cache and self._member_cache.is_fresh(group)):
+                targets.append(group)
+
+        limiter = RateLimiter(rate, concurrency) if rate else None
+        done = 0
+
+        async def fetch(group: Group) -> MemberPrefetch:
+            nonlocal done
+            start = time.perf_counter()
+            error: Optional[Exception] = None
+            try:
+                await self._member_cache.refresh(group, limiter)
+            except Exception as e:
+                error = e
+            done += 1
+            result = MemberPrefetch(
+                group.group_id,
+                len(group._cached_member_list),
+                time.perf_counter() - start,
+                error,
+                done,
+                len(targets),
+            )
+            if callback:
+                try:
+                    callback(result)
+                except Exception as e:
+                    logger.exception(e)
+            return result
+
+        return await bounded_map(fetch, targets, concurrency)
 
     async def _get_message(
         self,
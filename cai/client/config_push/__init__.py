@@ -16,6 +16,7 @@ from jce import types
 from cai.log import logger
 from cai.utils.binary import Packet
 from cai.utils.jce import RequestPacketVersion3
+from cai.client.sso_server import add_sso_servers
 from cai.client.packet import UniPacket, IncomingPacket
 
 from .jce import PushResp, FileServerPushList
@@ -85,7 +86,10 @@ async def handle_config_push_request(
         packet.data,
     )
     if isinstance(command, SsoServerPushCommand):
-        logger.debug(f"ConfigPush: Got new server addresses.")
+        added = add_sso_servers(
+            [*command.list.socket_v4_mobile, *command.list.socket_v4_wifi]
+        )
+        logger.debug(f"ConfigPush: Got {added} new server addresses.")
     elif isinstance(command, FileServerPushCommand):
         client._file_storage_info = command.list
 
@@ -0,0 +1,184 @@
+"""Event Listener Registry.
+
+This module is used to index event listeners by their filters.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+from itertools import count, product
+from collections.abc import MutableSet
+from dataclasses import field, dataclass
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+)
+
+from .event import Event
+
+Key = Tuple[Optional[str], Optional[int], Optional[int]]
+Filter = Union[None, str, int, Iterable[Any]]
+
+_counter = count()
+
+
+@dataclass
+class Listener:
+    """Registered event listener.
+
+    Attributes:
+        callback (Callable): Listener called with client and event.
+        sync (bool): Listener is a plain function called inline when the
+            event is dispatched, instead of a coroutine function run in
+            a dispatcher worker.
+        keys (Tuple[Key, ...]): Index keys of the listener filters.
+    """
+
+    callback: Callable[..., Any]
+    sync: bool = False
+    keys: Tuple[Key, ...] = ()
+    order: int = field(default_factory=lambda: next(_counter))
+
+
+def _values(value: Filter) -> Tuple[Any, ...]:
+    if value is None or isinstance(value, (str, int)):
+        return (value,)
+    return tuple(dict.fromkeys(value))
+
+
+class ListenerRegistry(MutableSet):
+    """Event listeners indexed by event type, ``group_id`` and ``from_uin``.
+
+    Each listener is stored under every combination of its filter values,
+    a filter of ``None`` matches any value. Dispatching an event looks up
+    only the combinations used by registered listeners instead of calling
+    every listener.
+
+    The registry is a mutable set of listener callbacks, so code using
+    :attr:`Client.LISTENERS` as a :obj:`set` keeps working. Set operators
+    like ``|`` return a plain :obj:`set` of callbacks.
+    """
+
+    def __init__(self):
+        self._listeners: Dict[Callable[..., Any], Listener] = {}
+        self._index: Dict[Key, List[Listener]] = {}
+        # which of the three filters are set, as (type, group, uin) flags
+        self._shapes: Dict[Tuple[bool, bool, bool], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._listeners)
+
+    def __iter__(self) -> Iterator[Callable[..., Any]]:
+        return iter(self._listeners)
+
+    def __contains__(self, callback: Any) -> bool:
+        return callback in self._listeners
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self._listeners)!r})"
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[Any]) -> set:
+        return set(it)
+
+    def add(
+        self,
+        callback: Callable[..., Any],
+        event_type: Filter = None,
+        group_id: Filter = None,
+        from_uin: Filter = None,
+        sync: bool = False,
+    ) -> Listener:
+        """Add or replace a listener.
+
+        Args:
+            callback (Callable): Listener called with client and event.
+            event_type (Union[None, str, Iterable[str]], optional): Only
+                receive events of these :attr:`Event.type`.
+                Defaults to None.
+            group_id (Union[None, int, Iterable[int]], optional): Only
+                receive events with these ``group_id``. Defaults to None.
+            from_uin (Union[None, int, Iterable[int]], optional): Only
+                receive events with these ``from_uin``. Defaults to None.
+            sync (bool, optional): Listener is a plain function called
+                inline. Defaults to False.
+
+        Returns:
+            Listener: The registered listener.
+        """
+        self.discard(callback)
+        keys = tuple(
+            product(_values(event_type), _values(group_id), _values(from_uin))
+        )
+        listener = Listener(callback, sync, keys)
+        self._listeners[callback] = listener
+        for key in keys:
+            self._index.setdefault(key, []).append(listener)
+            shape = (key[0] is not None, key[1] is not None, key[2] is not None)
+            self._shapes[shape] = self._shapes.get(shape, 0) + 1
+        return listener
+
+    def discard(self, callback: Callable[..., Any]) -> None:  # type: ignore
+        """Remove a listener if registered."""
+        listener = self._listeners.pop(callback, None)
+        if not listener:
+            return
+        for key in listener.keys:
+            listeners = self._index[key]
+            listeners.remove(listener)
+            if not listeners:
+                del self._index[key]
+            shape = (key[0] is not None, key[1] is not None, key[2] is not None)
+            self._shapes[shape] -= 1
+            if not self._shapes[shape]:
+                del self._shapes[shape]
+
+    def clear(self) -> None:
+        self._listeners.clear()
+        self._index.clear()
+        self._shapes.clear()
+
+    def match(self, event: Event) -> List[Listener]:
+        """Get listeners whose filters match the event.
+
+        Args:
+            event (Event): Event to dispatch.
+
+        Returns:
+            List[Listener]: Matched listeners in registration order.
+        """
+        if not self._listeners:
+            return []
+
+        event_type = event.type
+        group_id = getattr(event, "group_id", None)
+        from_uin = getattr(event, "from_uin", None)
+        matched: List[Listener] = []
+        for has_type, has_group, has_uin in self._shapes:
+            # event without the attribute never matches the filter
+            if (has_group and group_id is None) or (
+                has_uin and from_uin is None
+            ):
+                continue
+            key = (
+                event_type if has_type else None,
+                group_id if has_group else None,
+                from_uin if has_uin else None,
+            )
+            matched.extend(self._index.get(key, ()))
+
+        if len(self._shapes) > 1:
+            matched.sort(key=lambda listener: listener.order)
+        return matched
+
+
+__all__ = ["Listener", "ListenerRegistry"]
@@ -13,13 +13,15 @@ from enum import IntEnum
 from typing import TYPE_CHECKING, List, Union, Optional
 
 from cai.log import logger
+from cai.pb.msf.msg.comm import Msg
 from cai.utils.binary import Packet
 from cai.client.status_service import OnlineStatus
 from cai.client.packet import UniPacket, IncomingPacket
 from cai.pb.msf.msg.svc import PbGetMsgReq, PbDeleteMsgReq
 
 from .decoders import MESSAGE_DECODERS
-from .models import GroupMessage, PrivateMessage
+from .fragment import FragmentStats, FragmentBuffer
+from .models import GroupMessage, MessageEvent, PrivateMessage
 from .command import (
     PushNotify,
     GetMessageFail,
@@ -101,6 +103,29 @@ def encode_get_message(
     return packet
 
 
+def get_message_key(message: Msg) -> int:
+    """Get the key identifying a message for deduplication.
+
+    Sender, sequence, time and random of the message are packed into one
+    integer, as the same message may be received from both ``PbGetMsg`` and
+    online push.
+
+    Args:
+        message (Msg): Message protobuf.
+
+    Returns:
+        int: Packed message key.
+    """
+    head = message.head
+    random = message.body.rich_text.attr.random or head.uid
+    return (
+        (head.from_uin & 0xFFFFFFFFFFFFFFFF) << 96
+        | (head.seq & 0xFFFFFFFF) << 64
+        | (head.time & 0xFFFFFFFF) << 32
+        | random & 0xFFFFFFFF
+    )
+
+
 async def handle_get_message(
     client: "Client", packet: IncomingPacket
 ) -> "GetMessageCommand":
@@ -153,14 +178,8 @@ async def handle_get_message(
                 if message.head.time < last_read_time:
                     continue
 
-                key = (
-                    f"{message.head.from_uin}"
-                    f"{message.head.type}"
-                    f"{message.head.time}"
-                )
-                if key in client._msg_cache:
+                if client._msg_dedup.seen(get_message_key(message)):
                     continue
-                client._msg_cache[key] = None
 
                 # drop messages when init
                 if client._init_flag:
@@ -174,20 +193,12 @@ async def handle_get_message(
                         f"Received unknown message type {msg_type}."
                     )
                     continue
-                decoded_message = Decoder(message)
+                decoded_message = Decoder(message, client._fragments)
                 if decoded_message:
                     client.dispatch_event(decoded_message)
 
-        if delete_msgs:
-            seq = client.next_seq()
-            del_packet = encode_delete_message(
-                seq,
-                client._session_id,
-                client.uin,
-                client._siginfo.d2key,
-                delete_msgs,
-            )
-            await client.send(seq, "MessageSvc.PbDeleteMsg", del_packet)
+        # coalesced with other sync pages, see Client._delete_messages
+        client._delete_batcher.add(delete_msgs)
 
         if resp.response.sync_flag < SyncFlag.STOP:
             seq = client.next_seq()
@@ -307,7 +318,8 @@ async def handle_force_offline(
     client: "Client", packet: IncomingPacket
 ) -> PushForceOfflineCommand:
     client._status = OnlineStatus.Offline
-    await client.close()
+    if not client._connection_lost("force offline"):
+        await client.close()
     request = PushForceOfflineCommand.decode_response(
         packet.uin,
         packet.seq,
@@ -325,6 +337,9 @@ async def handle_force_offline(
 
 __all__ = [
     "MESSAGE_DECODERS",
+    "get_message_key",
+    "FragmentBuffer",
+    "FragmentStats",
     "SyncFlag",
     "encode_get_message",
     "handle_get_message",
@@ -339,6 +354,7 @@ __all__ = [
     "PushForceOfflineCommand",
     "PushForceOffline",
     "PushForceOfflineError",
+    "MessageEvent",
     "PrivateMessage",
     "GroupMessage",
 ]
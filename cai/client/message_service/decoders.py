@@ -21,6 +21,7 @@ from cai.pb.im.msg.service.comm_elem import (
     MsgElemInfo_servtype33,
 )
 
+from .fragment import FragmentBuffer
 from .models import (
     Element,
     FaceElement,
@@ -28,6 +29,7 @@ from .models import (
     TextElement,
     GroupMessage,
     ImageElement,
+    LazyElements,
     ReplyElement,
     PrivateMessage,
     SmallEmojiElement,
@@ -181,7 +183,9 @@ def parse_elements(elems: Sequence[Elem]) -> List[Element]:
 
 class BuddyMessageDecoder:
     @classmethod
-    def decode(cls, message: Msg) -> Optional[Event]:
+    def decode(
+        cls, message: Msg, fragments: Optional[FragmentBuffer] = None
+    ) -> Optional[Event]:
         """Buddy Message Decoder.
 
         Note:
@@ -243,15 +247,25 @@ class BuddyMessageDecoder:
             from_uin,
             from_nick,
             to_uin,
-            parse_elements(elems),
+            LazyElements(elems, parse_elements),
         )
 
 
 class TroopMessageDecoder:
-    long_msg_fragment_store: Dict[int, List[Msg]] = {}
-
     @classmethod
-    def decode(cls, message: Msg) -> Optional[Event]:
+    def decode(
+        cls, message: Msg, fragments: Optional[FragmentBuffer] = None
+    ) -> Optional[Event]:
+        """Troop Message Decoder.
+
+        Args:
+            message (Msg): Message protobuf.
+            fragments (Optional[FragmentBuffer], optional): Buffer collecting
+                long message fragments of the client. Defaults to None.
+
+        Raises:
+            ValueError: Long message fragment got without a buffer.
+        """
         if not message.head.HasField("group_info"):
             return
 
@@ -264,21 +278,18 @@ class TroopMessageDecoder:
 
         # long msg fragment
         if content_head.pkg_num > 1:
-            fragments = cls.long_msg_fragment_store.setdefault(
-                content_head.div_seq, []
+            if fragments is None:
+                raise ValueError(
+                    "FragmentBuffer is required to decode long messages"
+                )
+            parts = fragments.add(
+                (troop.group_code, from_uin, content_head.div_seq), message
             )
-            fragments.append(message)
-            if len(fragments) < content_head.pkg_num:
+            if parts is None:
                 return
 
-            cls.long_msg_fragment_store.pop(content_head.div_seq)
             elems = list(
-                chain.from_iterable(
-                    msg.body.rich_text.elems
-                    for msg in sorted(
-                        fragments, key=lambda f: f.content_head.pkg_index
-                    )
-                )
+                chain.from_iterable(msg.body.rich_text.elems for msg in parts)
             )
 
         return GroupMessage(
@@ -290,18 +301,22 @@ class TroopMessageDecoder:
             troop.group_level,
             from_uin,
             troop.group_card.decode("utf-8"),
-            parse_elements(elems),
+            LazyElements(elems, parse_elements),
         )
 
 
 class TempSessionDecoder:
     @classmethod
-    def decode(cls, message: Msg) -> Optional[Event]:
+    def decode(
+        cls, message: Msg, fragments: Optional[FragmentBuffer] = None
+    ) -> Optional[Event]:
         # TODO
         ...
 
 
-MESSAGE_DECODERS: Dict[int, Callable[[Msg], Optional[Event]]] = {
+MESSAGE_DECODERS: Dict[
+    int, Callable[[Msg, Optional[FragmentBuffer]], Optional[Event]]
+] = {
     9: BuddyMessageDecoder.decode,
     10: BuddyMessageDecoder.decode,
     31: BuddyMessageDecoder.decode,
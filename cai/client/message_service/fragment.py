@@ -0,0 +1,172 @@
+"""MessageSvc long message fragment buffer.
+
+This module is used to reassemble long messages sent in fragments.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import time
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import List, Tuple, Optional
+
+from cai.log import logger
+from cai.pb.msf.msg.comm import Msg
+
+FragmentKey = Tuple[int, int, int]
+
+
+@dataclass
+class FragmentStats:
+    """Fragment buffer counters snapshot.
+
+    Attributes:
+        pending (int): Number of incomplete messages being buffered.
+        pending_bytes (int): Size of buffered fragments.
+        completed (int): Number of reassembled messages.
+        expired (int): Number of incomplete messages dropped after timeout.
+        evicted (int): Number of incomplete messages dropped to keep the
+            buffer under ``max_bytes``.
+        duplicates (int): Number of fragments received twice.
+        invalid (int): Number of fragments with invalid index.
+    """
+
+    pending: int
+    pending_bytes: int
+    completed: int
+    expired: int
+    evicted: int
+    duplicates: int
+    invalid: int
+
+
+class _Pending:
+    __slots__ = ("fragments", "received", "size", "expires_at")
+
+    def __init__(self, total: int, expires_at: float):
+        # slot of each pkg_index, so completed message needs no sorting
+        self.fragments: List[Optional[Msg]] = [None] * total
+        self.received: int = 0
+        self.size: int = 0
+        self.expires_at: float = expires_at
+
+
+class FragmentBuffer:
+    """Reassembly buffer of long message fragments.
+
+    Messages are keyed by ``(group, from_uin, div_seq)``. Incomplete messages
+    are dropped ``timeout`` seconds after their first fragment arrives, or
+    oldest first when buffered fragments exceed ``max_bytes``.
+
+    Args:
+        timeout (float, optional): Seconds to wait for missing fragments.
+            Defaults to 60.
+        max_bytes (int, optional): Max size of buffered fragments.
+            Defaults to 4 MiB.
+    """
+
+    def __init__(self, timeout: float = 60.0, max_bytes: int = 4 * 2 ** 20):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        # first fragment order, also expiring order
+        self._pending: "OrderedDict[FragmentKey, _Pending]" = OrderedDict()
+        self._size: int = 0
+        self._completed: int = 0
+        self._expired: int = 0
+        self._evicted: int = 0
+        self._duplicates: int = 0
+        self._invalid: int = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def stats(self) -> FragmentStats:
+        return FragmentStats(
+            len(self._pending),
+            self._size,
+            self._completed,
+            self._expired,
+            self._evicted,
+            self._duplicates,
+            self._invalid,
+        )
+
+    def add(self, key: FragmentKey, message: Msg) -> Optional[List[Msg]]:
+        """Add a fragment.
+
+        Args:
+            key (FragmentKey): ``(group, from_uin, div_seq)`` of the message.
+            message (Msg): Fragment with ``content_head``.
+
+        Returns:
+            Optional[List[Msg]]: All fragments in ``pkg_index`` order if the
+            message is complete, else ``None``.
+        """
+        now = time.monotonic()
+        self.expire(now)
+
+        total = message.content_head.pkg_num
+        index = message.content_head.pkg_index
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending(total, now + self.timeout)
+
+        if not 0 <= index < len(pending.fragments):
+            self._invalid += 1
+            logger.debug(f"Invalid long message fragment {index} of {key}")
+            if not pending.received:
+                del self._pending[key]
+            return None
+        if pending.fragments[index] is not None:
+            self._duplicates += 1
+            return None
+
+        size = message.ByteSize()
+        pending.fragments[index] = message
+        pending.received += 1
+        pending.size += size
+        self._size += size
+
+        if pending.received == len(pending.fragments):
+            del self._pending[key]
+            self._size -= pending.size
+            self._completed += 1
+            return pending.fragments  # type: ignore
+
+        while self._size > self.max_bytes and self._pending:
+            _, dropped = self._pending.popitem(last=False)
+            self._size -= dropped.size
+            self._evicted += 1
+        return None
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop incomplete messages waited longer than ``timeout``.
+
+        Args:
+            now (Optional[float], optional): Current :func:`time.monotonic`.
+
+        Returns:
+            int: Number of dropped messages.
+        """
+        now = time.monotonic() if now is None else now
+        dropped = 0
+        while self._pending:
+            key, pending = next(iter(self._pending.items()))
+            if pending.expires_at > now:
+                break
+            del self._pending[key]
+            self._size -= pending.size
+            dropped += 1
+        self._expired += dropped
+        return dropped
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._size = 0
+
+
+__all__ = ["FragmentBuffer", "FragmentStats"]
@@ -11,22 +11,81 @@ This module is used to define message models.
 
 import abc
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Callable, Optional, Sequence
 
 from cai.client.event import Event
 from cai.pb.msf.msg.comm import Msg
+from cai.pb.im.msg.msg_body import Elem
+
+
+class LazyElements:
+    """Raw rich text elements of a message event, decoded on first access.
+
+    Args:
+        elems (Sequence[Elem]): Raw rich text elements.
+        parse (Callable[[Sequence[Elem]], List[Element]]): Element decoder.
+    """
+
+    __slots__ = ("elems", "parse")
+
+    def __init__(
+        self,
+        elems: Sequence[Elem],
+        parse: Callable[[Sequence[Elem]], List["Element"]],
+    ):
+        self.elems = elems
+        self.parse = parse
+
+
+class _MessageElements:
+    # data descriptor of ``message``, decodes and caches LazyElements
+    def __get__(self, obj: Any, objtype: Any = None) -> Any:
+        if obj is None:
+            # dataclass default, empty message
+            return self
+        value = obj.__dict__["message"]
+        if type(value) is LazyElements:
+            value = obj.__dict__["message"] = value.parse(value.elems)
+            if obj._drop_raw:
+                obj._msg = None
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        obj.__dict__["message"] = [] if value is self else value
+
+
+class MessageEvent(Event):
+    """Base of message events.
+
+    Message elements are decoded when :attr:`message` is first accessed, so
+    listeners only checking sender or group do not decode them.
+    """
+
+    _drop_raw: bool = False
+
+    def drop_raw_message(self) -> None:
+        """Drop raw message ``_msg`` once :attr:`message` is decoded."""
+        if type(self.__dict__.get("message")) is LazyElements:
+            self._drop_raw = True
+        else:
+            self._msg = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # raw elements are not picklable
+        self.message
+        return self.__dict__
 
 
 @dataclass
-class PrivateMessage(Event):
-    _msg: Msg
+class PrivateMessage(MessageEvent):
+    _msg: Optional[Msg]
     seq: int
     time: int
     auto_reply: bool
     from_uin: int
     from_nick: str
     to_uin: int
-    message: List["Element"]
+    message: List["Element"] = _MessageElements()  # type: ignore
 
     @property
     def type(self) -> str:
@@ -34,8 +93,8 @@ class PrivateMessage(Event):
 
 
 @dataclass
-class GroupMessage(Event):
-    _msg: Msg
+class GroupMessage(MessageEvent):
+    _msg: Optional[Msg]
     seq: int
     time: int
     group_id: int
@@ -43,7 +102,7 @@ class GroupMessage(Event):
     group_level: int
     from_uin: int
     from_group_card: str
-    message: List["Element"]
+    message: List["Element"] = _MessageElements()  # type: ignore
 
     @property
     def type(self) -> str:
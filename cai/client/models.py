@@ -10,14 +10,69 @@ This module is used to define account info data models.
 """
 import time
 from enum import Enum
-from dataclasses import field, dataclass
-from typing import TYPE_CHECKING, Dict, List
+from functools import lru_cache
+from operator import attrgetter
+from dataclasses import field, fields, dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Type,
+    TypeVar,
+    Callable,
+    Optional,
+)
 
 from cai.utils.dataclass import JsonableDataclass
 
 if TYPE_CHECKING:
     from cai.client import Client
 
+T = TypeVar("T")
+
+
+def _slots(cls: Type[T]) -> Type[T]:
+    """Recreate a dataclass with ``__slots__`` of its fields.
+
+    Same as ``dataclass(slots=True)`` of python 3.10+. Instances have no
+    ``__dict__``, which saves memory of the large number of cached models.
+    """
+    names = tuple(f.name for f in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    for name in names:
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    cls_dict["__slots__"] = names
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+
+    # zero-argument super() in methods refers to the class being replaced
+    for value in cls_dict.values():
+        if isinstance(value, (classmethod, staticmethod)):
+            value = value.__func__
+        elif isinstance(value, property):
+            value = value.fget
+        for cell in getattr(value, "__closure__", None) or ():
+            if cell.cell_contents is cls:
+                cell.cell_contents = new_cls
+    return new_cls
+
+
+@lru_cache(maxsize=None)
+def _struct_reader(cls: type) -> Callable[[Any], List[Any]]:
+    # public fields are the leading positional arguments of the model
+    public = [f for f in fields(cls) if not f.name.startswith("_")]
+    getter = attrgetter(*(f.name for f in public))
+    types = tuple(f.type for f in public)
+
+    def read(info: Any) -> List[Any]:
+        # jce values are subclasses of builtin types, convert them back
+        return [type_(value) for type_, value in zip(types, getter(info))]
+
+    return read
+
 
 @dataclass
 class SigInfo:
@@ -58,6 +113,7 @@ class SigInfo:
         self.s_key_expire_time = int(time.time()) + 21600
 
 
+@_slots
 @dataclass
 class Friend(JsonableDataclass):
     __json_fields__ = (
@@ -99,6 +155,11 @@ class Friend(JsonableDataclass):
             return o.friend_uin == self.friend_uin
         return super().__eq__(o)
 
+    @classmethod
+    def from_struct(cls, info: Any, client: "Client") -> "Friend":
+        """Build friend from decoded ``FriendInfo`` struct."""
+        return cls(*_struct_reader(cls)(info), client)
+
     @property
     def uin(self) -> int:
         return self.friend_uin
@@ -113,6 +174,7 @@ class Friend(JsonableDataclass):
         return group
 
 
+@_slots
 @dataclass
 class FriendGroup(JsonableDataclass):
     __json_fields__ = (
@@ -137,7 +199,13 @@ class FriendGroup(JsonableDataclass):
             )
         return super().__eq__(o)
 
+    @classmethod
+    def from_struct(cls, info: Any, client: "Client") -> "FriendGroup":
+        """Build friend group from decoded ``GroupInfo`` struct."""
+        return cls(*_struct_reader(cls)(info), client)
 
+
+@_slots
 @dataclass
 class Group(JsonableDataclass):
     __json_fields__ = (
@@ -167,12 +235,20 @@ class Group(JsonableDataclass):
     _cached_member_list: List["GroupMember"] = field(
         default_factory=list, repr=False, compare=False
     )
+    _cached_member_index: Dict[int, "GroupMember"] = field(
+        default_factory=dict, repr=False, compare=False
+    )
 
     def __eq__(self, o: object) -> bool:
         if isinstance(o, Group):
             return o.group_id == self.group_id
         return super().__eq__(o)
 
+    @classmethod
+    def from_struct(cls, info: Any, client: "Client") -> "Group":
+        """Build group from decoded ``StTroopNum`` struct."""
+        return cls(*_struct_reader(cls)(info), client)
+
     @property
     def group_id(self) -> int:
         """:obj:`int`: Group ID.
@@ -201,9 +277,21 @@ class Group(JsonableDataclass):
         """:obj:`int`: Group join time. Same as :obj:`~.Group.cmd_uin_join_time`."""
         return self.cmd_uin_join_time
 
+    def _set_members(self, members: List["GroupMember"]) -> None:
+        # list and index are replaced together
+        self._cached_member_index = {
+            member.member_uin: member for member in members
+        }
+        self._cached_member_list = members
+
     async def get_members(self, cache: bool = True) -> List["GroupMember"]:
         return await self._client.get_group_member_list(self, cache)
 
+    async def get_member(
+        self, uin: int, cache: bool = True
+    ) -> Optional["GroupMember"]:
+        return await self._client.get_group_member(self, uin, cache)
+
 
 class GroupMemberRole(str, Enum):
     owner = "owner"
@@ -211,6 +299,7 @@ class GroupMemberRole(str, Enum):
     member = "member"
 
 
+@_slots
 @dataclass
 class GroupMember(JsonableDataclass):
     __json_fields__ = (
@@ -260,6 +349,13 @@ class GroupMember(JsonableDataclass):
             return o.member_uin == self.member_uin and o._group == self._group
         return super().__eq__(o)
 
+    @classmethod
+    def from_struct(
+        cls, info: Any, client: "Client", group: Group
+    ) -> "GroupMember":
+        """Build group member from decoded ``StTroopMemberInfo`` struct."""
+        return cls(*_struct_reader(cls)(info), client, group)
+
     @property
     def uin(self) -> int:
         return self.member_uin
@@ -17,8 +17,8 @@ from cai.log import logger
 from cai.utils.binary import Packet
 from cai.settings.device import get_device
 from cai.utils.jce import RequestPacketVersion3
-from cai.client.message_service import MESSAGE_DECODERS
 from cai.client.packet import UniPacket, IncomingPacket
+from cai.client.message_service import MESSAGE_DECODERS, get_message_key
 
 from .jce import DelMsgInfo, DeviceInfo, SvcRespPushMsg
 from .command import PushMsg, PushMsgError, PushMsgCommand
@@ -122,6 +122,9 @@ async def handle_c2c_sync(
         )
         await client.send(push.seq, "OnlinePush.RespPush", resp_packet)
 
+        if client._msg_dedup.seen(get_message_key(message)):
+            return push
+
         Decoder = MESSAGE_DECODERS.get(msg_type, None)
         if not Decoder:
             logger.debug(
@@ -129,7 +132,7 @@ async def handle_c2c_sync(
                 f"Received unknown message type {msg_type}."
             )
             return push
-        decoded_message = Decoder(message)
+        decoded_message = Decoder(message, client._fragments)
         if decoded_message:
             client.dispatch_event(decoded_message)
 
@@ -201,6 +204,9 @@ async def handle_push_msg(
             # discussion 1001
             pass
 
+        if client._msg_dedup.seen(get_message_key(message)):
+            return push
+
         Decoder = MESSAGE_DECODERS.get(msg_type, None)
         if not Decoder:
             logger.debug(
@@ -208,7 +214,7 @@ async def handle_push_msg(
                 f"Received unknown message type {msg_type}."
             )
             return push
-        decoded_message = Decoder(message)
+        decoded_message = Decoder(message, client._fragments)
         if decoded_message:
             client.dispatch_event(decoded_message)
 
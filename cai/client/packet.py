@@ -10,13 +10,90 @@ This module is used to packet data into outgoing format.
 """
 import zlib
 import struct
+from functools import lru_cache
 from dataclasses import dataclass
 from typing import Union, Optional
 
 from rtea import qqtea_decrypt, qqtea_encrypt
 
 from cai.utils.crypto import ECDH
-from cai.utils.binary import Packet
+from cai.utils.binary import Packet, PacketSchema
+
+_FRAME_HEAD = PacketSchema().uint32().uint8().uint8().string(4, 4).remain()
+_SSO_HEAD = (
+    PacketSchema()
+    .uint32()
+    .uint32()
+    .int32()
+    .bytes_with_length(4, 4)
+    .string(4, 4)
+    .bytes_with_length(4, 4)
+    .int32()
+)
+_SSO_BODY = PacketSchema().bytes_with_length(4, 4)
+_OICQ_HEAD = PacketSchema().uint8().offset(12).uint16().offset(1).remain()
+
+
+def _with_length(data: bytes) -> bytes:
+    return struct.pack(">I", len(data) + 4) + data
+
+
+@lru_cache(maxsize=256)
+def _sso_body_prefix(
+    unknown_bytes: bytes,
+    extra_data: bytes,
+    command_name: str,
+    session_id: bytes,
+    imei: str,
+    ksid: bytes,
+) -> bytes:
+    """Constant part of CSSOReqHead after seq and sub app id."""
+    return b"".join(
+        (
+            unknown_bytes,
+            _with_length(extra_data),
+            _with_length(command_name.encode()),
+            _with_length(session_id),
+            _with_length(imei.encode()),
+            struct.pack(">IH", 4, len(ksid) + 2),
+            ksid,
+            struct.pack(">I", 4),
+        )
+    )
+
+
+@lru_cache(maxsize=256)
+def _sso_data_prefix(
+    uin: int, ksso_version: int, body_type: int, extra_data: bytes
+) -> bytes:
+    """Constant part of CSSOHead before the body."""
+    return b"".join(
+        (
+            struct.pack(">IB", ksso_version, body_type),
+            _with_length(extra_data),
+            bytes([0]),
+            _with_length(str(uin).encode()),
+        )
+    )
+
+
+@lru_cache(maxsize=256)
+def _uni_head(command_name: str, session_id: bytes, extra_data: bytes) -> bytes:
+    """Uni packet head, including its own length."""
+    return _with_length(
+        b"".join(
+            (
+                _with_length(command_name.encode()),
+                _with_length(session_id),
+                _with_length(extra_data),
+            )
+        )
+    )
+
+
+@lru_cache(maxsize=256)
+def _uin_string(uin: int) -> bytes:
+    return _with_length(str(uin).encode())
 
 
 class CSsoBodyPacket(Packet):
@@ -64,23 +141,23 @@ class CSsoBodyPacket(Packet):
         Note:
             Source: `CSSOReqHead::serialize_verFull`
         """
-        packet = cls().write_with_length(
-            struct.pack(">III", seq, sub_app_id, sub_app_id),
+        prefix = _sso_body_prefix(
             unknown_bytes,
-            struct.pack(">I", len(extra_data) + 4),
-            extra_data,
-            struct.pack(">I", len(command_name) + 4),
-            command_name.encode(),
-            struct.pack(">I", len(session_id) + 4),
-            session_id,
-            struct.pack(">I", len(imei) + 4),
-            imei.encode(),
-            struct.pack(">IH", 4, len(ksid) + 2),
-            ksid,
-            struct.pack(">I", 4),
-            offset=4,
+            bytes(extra_data),
+            command_name,
+            bytes(session_id),
+            imei,
+            bytes(ksid),
+        )
+        head_length = 16 + len(prefix)
+        packet = cls(head_length + 4 + len(body))
+        struct.pack_into(
+            ">IIII", packet, 0, head_length, seq, sub_app_id, sub_app_id
         )
-        return packet.write_with_length(body, offset=4)
+        packet[16:head_length] = prefix
+        struct.pack_into(">I", packet, head_length, len(body) + 4)
+        packet[head_length + 4 :] = body
+        return packet
 
 
 class CSsoDataPacket(Packet):
@@ -114,18 +191,16 @@ class CSsoDataPacket(Packet):
         Note:
             Source: `CSSOHead::serialize_verFull`
         """
-        return cls().write_with_length(
-            Packet.build(
-                struct.pack(">IB", ksso_version, body_type),
-                struct.pack(">I", len(extra_data) + 4),
-                extra_data,
-                bytes([0]),
-                struct.pack(">I", len(str(uin)) + 4),
-                str(uin).encode(),
-                qqtea_encrypt(bytes(body), key) if key else body,
-            ),
-            offset=4,
+        prefix = _sso_data_prefix(
+            uin, ksso_version, body_type, bytes(extra_data)
         )
+        data = qqtea_encrypt(bytes(body), key) if key else body
+        offset = 4 + len(prefix)
+        packet = cls(offset + len(data))
+        struct.pack_into(">I", packet, 0, len(packet))
+        packet[4:offset] = prefix
+        packet[offset:] = data
+        return packet
 
 
 class UniPacket(Packet):
@@ -141,23 +216,23 @@ class UniPacket(Packet):
         key: bytes,
         extra_data: bytes = b"",
     ) -> "UniPacket":
-        data = Packet().write_with_length(
-            struct.pack(">I", len(command_name) + 4),
-            command_name.encode(),
-            struct.pack(">I", len(session_id) + 4),
-            session_id,
-            struct.pack(">I", len(extra_data) + 4),
-            extra_data,
-            offset=4,
+        data = b"".join(
+            (
+                _uni_head(command_name, bytes(session_id), bytes(extra_data)),
+                struct.pack(">I", len(body) + 4),
+                body,
+            )
         )
-        data.write_with_length(body, offset=4)
-        return cls().write_with_length(
-            struct.pack(">IBIB", 0xB, body_type, seq, 0),
-            struct.pack(">I", len(str(uin)) + 4),
-            str(uin).encode(),
-            qqtea_encrypt(bytes(data), key),
-            offset=4,
+        uin_string = _uin_string(uin)
+        encrypted = qqtea_encrypt(data, key)
+        offset = 14 + len(uin_string)
+        packet = cls(offset + len(encrypted))
+        struct.pack_into(
+            ">IIBIB", packet, 0, len(packet), 0xB, body_type, seq, 0
         )
+        packet[14:offset] = uin_string
+        packet[offset:] = encrypted
+        return packet
 
 
 @dataclass
@@ -173,22 +248,18 @@ class IncomingPacket:
     @classmethod
     def parse(
         cls,
-        data: Union[bytes, bytearray],
+        data: Union[bytes, bytearray, memoryview],
         key: bytes,
         d2key: bytes,
         session_key: bytes,
     ) -> "IncomingPacket":
-        if not isinstance(data, Packet):
-            data = Packet(data)
-
-        packet_type, encrypt_type, flag3, uin, payload = (
-            data.start()
-            .uint32()
-            .uint8()
-            .uint8()
-            .string(4, 4)
-            .remain()
-            .execute()
+        """Parse incoming frame body (without the 4-byte frame length).
+
+        ``data`` may be a :obj:`memoryview` pointing into the receive buffer.
+        Only the encrypted payload is copied once for decryption.
+        """
+        packet_type, encrypt_type, flag3, uin_string, body = _FRAME_HEAD.unpack(
+            data
         )
 
         if packet_type not in [0xA, 0xB]:
@@ -199,16 +270,17 @@ class IncomingPacket:
             raise ValueError(f"Invalid flag3. Expected 0, got {flag3}.")
 
         try:
-            uin = int(uin)
+            uin = int(uin_string)
         except ValueError:
             uin = 0
 
+        payload: Union[bytes, bytearray, memoryview]
         if encrypt_type == 0:
-            pass
+            payload = body
         elif encrypt_type == 1:
-            payload = Packet(qqtea_decrypt(bytes(payload), d2key))
+            payload = qqtea_decrypt(bytes(body), d2key)
         elif encrypt_type == 2:
-            payload = Packet(qqtea_decrypt(bytes(payload), bytes(16)))
+            payload = qqtea_decrypt(bytes(body), bytes(16))
         else:
             raise ValueError(
                 f"Invalid encrypt type. Expected 0 / 1 / 2, got {encrypt_type}."
@@ -224,15 +296,12 @@ class IncomingPacket:
     @classmethod
     def parse_sso_frame(
         cls,
-        sso_frame: Union[bytes, bytearray],
+        sso_frame: Union[bytes, bytearray, memoryview],
         encrypt_type: int,
         key: bytes,
         session_key: bytes,
         **kwargs,
     ) -> "IncomingPacket":
-        if not isinstance(sso_frame, Packet):
-            sso_frame = Packet(sso_frame)
-
         # read head
         (
             head_length,
@@ -242,20 +311,10 @@ class IncomingPacket:
             command_name,
             session_id,
             compress_type,
-        ) = (
-            sso_frame.start()
-            .uint32()
-            .uint32()
-            .int32()
-            .bytes_with_length(4, 4)
-            .string(4, 4)
-            .bytes_with_length(4, 4)
-            .int32()
-            .execute()
-        )
+        ) = _SSO_HEAD.unpack(sso_frame)
 
         # read data
-        data = sso_frame.start().offset(head_length).remain().execute()[0]
+        data = memoryview(sso_frame)[head_length:]
 
         if not data:
             return cls(
@@ -268,7 +327,7 @@ class IncomingPacket:
                 **kwargs,
             )
 
-        compressed_data = data.start().bytes_with_length(4, 4).execute()[0]
+        compressed_data = _SSO_BODY.unpack(data)[0]
         decompressed_data: bytes
         if compress_type == 0:
             decompressed_data = compressed_data
@@ -276,7 +335,7 @@ class IncomingPacket:
             decompressed_data = zlib.decompress(compressed_data)
         elif compress_type == 8:
             # remain data
-            decompressed_data = data[4:]
+            decompressed_data = bytes(data[4:])
         else:
             raise ValueError(f"Unknown compression type, got {compress_type}.")
 
@@ -315,18 +374,7 @@ class IncomingPacket:
         Returns:
             bytes: Decode data.
         """
-        if not isinstance(data, Packet):
-            data = Packet(data)
-
-        flag, encrypt_type, body = (
-            data.start()
-            .uint8()
-            .offset(12)
-            .uint16()
-            .offset(1)
-            .remain()
-            .execute()
-        )
+        flag, encrypt_type, body = _OICQ_HEAD.unpack(data)
 
         if flag != 2:
             raise ValueError(
@@ -0,0 +1,152 @@
+"""Client Session.
+
+This module is used to save login session of an account to an encrypted file,
+so the account can go online again without password login.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import os
+import json
+import time
+import base64
+import hashlib
+import secrets
+from typing import Any, Dict, Optional
+from dataclasses import field, asdict, dataclass
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from cai.storage import Storage
+
+from .models import SigInfo
+
+_VERSION = 1
+
+
+@dataclass
+class Session:
+    """Login session of an account.
+
+    Attributes:
+        uin (int): QQ number.
+        siginfo (SigInfo): Tickets and keys got from login.
+        saved_at (float): Unix timestamp the session is saved.
+    """
+
+    uin: int
+    siginfo: SigInfo
+    ksid: bytes = bytes()
+    pwd_flag: bool = False
+    rollback_sig: bytes = bytes()
+    time_diff: int = 0
+    ip_address: bytes = bytes()
+    t104: bytes = bytes()
+    t150: bytes = bytes()
+    t174: bytes = bytes()
+    t402: bytes = bytes()
+    t528: bytes = bytes()
+    t530: bytes = bytes()
+    nick: Optional[str] = None
+    age: Optional[int] = None
+    gender: Optional[int] = None
+    saved_at: float = field(default_factory=time.time)
+
+
+def _encode(obj: Any) -> Any:
+    if isinstance(obj, bytes):
+        return {"__bytes__": base64.b64encode(obj).decode()}
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+class SessionStore:
+    """Encrypted session file of an account.
+
+    The file is encrypted with AES-GCM. The key is derived from the account,
+    password md5 and device guid, so the session is dropped when any of them
+    changes.
+
+    Args:
+        uin (int): QQ number.
+        password_md5 (bytes): MD5 of the password.
+        guid (bytes): Device guid.
+        path (Optional[str], optional): Session file path. Defaults to
+            ``session-{uin}.bin`` under :attr:`Storage.app_dir`.
+    """
+
+    def __init__(
+        self,
+        uin: int,
+        password_md5: bytes,
+        guid: bytes,
+        path: Optional[str] = None,
+    ):
+        self.uin = uin
+        self.path = path or os.path.join(Storage.app_dir, f"session-{uin}.bin")
+        self._aad = uin.to_bytes(8, "big")
+        self._aes = AESGCM(
+            hashlib.sha256(self._aad + password_md5 + guid).digest()
+        )
+
+    def load(self) -> Optional[Session]:
+        """Load saved session.
+
+        Returns:
+            Optional[Session]: Saved session. None if not saved or the file
+            cannot be decrypted. The file is removed if it cannot be parsed,
+            e.g. saved by an older version.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        if len(data) < 13 or data[0] != _VERSION:
+            return None
+        try:
+            plain = self._aes.decrypt(data[1:13], data[13:], self._aad)
+        except InvalidTag:
+            return None
+        try:
+            kvs = json.loads(plain, object_hook=_decode)
+            siginfo = SigInfo(**kvs.pop("siginfo"))
+            return Session(siginfo=siginfo, **kvs)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            self.clear()
+            return None
+
+    def save(self, session: Session) -> None:
+        """Replace saved session.
+
+        Args:
+            session (Session): Session to save.
+        """
+        plain = json.dumps(asdict(session), default=_encode).encode()
+        nonce = secrets.token_bytes(12)
+        data = (
+            bytes([_VERSION])
+            + nonce
+            + self._aes.encrypt(nonce, plain, self._aad)
+        )
+        # write then rename, never leave a broken file behind
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Remove saved session."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
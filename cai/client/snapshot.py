@@ -0,0 +1,271 @@
+"""Client Snapshot.
+
+This module is used to save friend, group and group member lists to disk, so
+they can be served right after login.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import os
+import zlib
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import fields
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Type,
+    Tuple,
+    Callable,
+    Iterable,
+    Optional,
+)
+
+from cai.storage import Storage
+
+from .models import Group, Friend, FriendGroup, GroupMember
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+def _columns(cls: Type[Any], exclude: Tuple[str, ...] = ()) -> Tuple[str, ...]:
+    # public fields are the leading positional arguments of the model
+    return tuple(
+        f.name
+        for f in fields(cls)
+        if not f.name.startswith("_") and f.name not in exclude
+    )
+
+
+def _converters(
+    cls: Type[Any], exclude: Tuple[str, ...] = ()
+) -> Tuple[Optional[Callable], ...]:
+    # sqlite returns bool as int
+    return tuple(
+        bool if f.type is bool else None
+        for f in fields(cls)
+        if not f.name.startswith("_") and f.name not in exclude
+    )
+
+
+# contact info is never written to disk
+_MEMBER_PRIVATE = ("phone", "email")
+
+_FRIEND = _columns(Friend)
+_FRIEND_GROUP = _columns(FriendGroup)
+_GROUP = _columns(Group)
+_MEMBER = _columns(GroupMember, _MEMBER_PRIVATE)
+
+_TABLES: Dict[str, Tuple[str, ...]] = {
+    "friend": _FRIEND,
+    "friend_group": _FRIEND_GROUP,
+    "troop": _GROUP,
+    "member": ("group_code",) + _MEMBER,
+}
+# tables are recreated when model fields change
+_SCHEMA_VERSION = zlib.crc32(repr(sorted(_TABLES.items())).encode()) >> 1
+
+
+def _convert(
+    row: Tuple[Any, ...], converters: Tuple[Optional[Callable], ...]
+) -> List[Any]:
+    return [
+        value if convert is None else convert(value)
+        for convert, value in zip(converters, row)
+    ]
+
+
+class SnapshotStore:
+    """SQLite snapshot of friend, group and group member lists of an account.
+
+    All methods are blocking and are supposed to be run in an executor. Each
+    call opens its own connection, so calls from different threads are safe.
+    Tables are created once under a lock. Writes should be run in
+    :attr:`writer`, so they are applied one by one in submission order.
+
+    The file is not encrypted, member ``phone`` and ``email`` are not saved
+    and are empty in loaded members.
+
+    Args:
+        uin (int): QQ number.
+        path (Optional[str], optional): Database file path. Defaults to
+            :attr:`Storage.snapshot_file`.
+    """
+
+    def __init__(self, uin: int, path: Optional[str] = None):
+        self.uin = uin
+        self.path = path or Storage.snapshot_file.format(uin=uin)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def writer(self) -> ThreadPoolExecutor:
+        """:obj:`ThreadPoolExecutor`: Single thread executor for writes."""
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(
+                1, thread_name_prefix=f"snapshot-{self.uin}"
+            )
+        return self._writer
+
+    def close(self) -> None:
+        """Stop the writer after queued writes are done."""
+        if self._writer is not None:
+            self._writer.shutdown(wait=False)
+            self._writer = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if self._schema_ready:
+            return conn
+        with self._schema_lock:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != _SCHEMA_VERSION:
+                with conn:
+                    for table, columns in _TABLES.items():
+                        conn.execute(f"DROP TABLE IF EXISTS {table}")
+                        conn.execute(
+                            f"CREATE TABLE {table} ({', '.join(columns)})"
+                        )
+                    conn.execute(
+                        "CREATE INDEX member_group ON member (group_code)"
+                    )
+                    conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._schema_ready = True
+        return conn
+
+    @staticmethod
+    def _replace(
+        conn: sqlite3.Connection,
+        table: str,
+        rows: Iterable[Tuple[Any, ...]],
+        where: str = "",
+        params: Tuple[Any, ...] = (),
+    ) -> None:
+        columns = _TABLES[table]
+        conn.execute(f"DELETE FROM {table} {where}", params)
+        conn.executemany(
+            f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})",
+            rows,
+        )
+
+    def load(
+        self, client: "Client"
+    ) -> Tuple[List[Friend], List[FriendGroup], List[Group]]:
+        """Load friend, friend group and group lists.
+
+        Args:
+            client (Client): Client the models belong to.
+
+        Returns:
+            Tuple[List[Friend], List[FriendGroup], List[Group]]: Friend list,
+            friend group list and group list. Empty if not saved.
+        """
+        friend_conv = _converters(Friend)
+        friend_group_conv = _converters(FriendGroup)
+        group_conv = _converters(Group)
+        with closing(self._connect()) as conn:
+            friends = [
+                Friend(*_convert(row, friend_conv), client)
+                for row in conn.execute("SELECT * FROM friend")
+            ]
+            friend_groups = [
+                FriendGroup(*_convert(row, friend_group_conv), client)
+                for row in conn.execute("SELECT * FROM friend_group")
+            ]
+            groups = [
+                Group(*_convert(row, group_conv), client)
+                for row in conn.execute("SELECT * FROM troop")
+            ]
+        return friends, friend_groups, groups
+
+    def load_members(
+        self, groups: Iterable[Group]
+    ) -> Dict[int, List[GroupMember]]:
+        """Load member lists of the groups.
+
+        Args:
+            groups (Iterable[Group]): Groups the members belong to.
+
+        Returns:
+            Dict[int, List[GroupMember]]: Member lists by group code. Groups
+            without saved members are missing.
+        """
+        conv = _converters(GroupMember, _MEMBER_PRIVATE)
+        private = dict.fromkeys(_MEMBER_PRIVATE, "")
+        group_index = {group.group_code: group for group in groups}
+        members: Dict[int, List[GroupMember]] = {}
+        with closing(self._connect()) as conn:
+            for row in conn.execute("SELECT * FROM member ORDER BY rowid"):
+                group = group_index.get(row[0])
+                if not group:
+                    continue
+                member = GroupMember(
+                    **dict(zip(_MEMBER, _convert(row[1:], conv))),
+                    **private,
+                    _client=group._client,
+                    _group=group,
+                )
+                members.setdefault(row[0], []).append(member)
+        return members
+
+    def save_friend_list(
+        self, friends: List[Friend], friend_groups: List[FriendGroup]
+    ) -> None:
+        """Replace saved friend and friend group lists."""
+        with closing(self._connect()) as conn, conn:
+            self._replace(
+                conn,
+                "friend",
+                (tuple(getattr(f, name) for name in _FRIEND) for f in friends),
+            )
+            self._replace(
+                conn,
+                "friend_group",
+                (
+                    tuple(getattr(g, name) for name in _FRIEND_GROUP)
+                    for g in friend_groups
+                ),
+            )
+
+    def save_group_list(self, groups: List[Group]) -> None:
+        """Replace saved group list and drop members of groups left."""
+        with closing(self._connect()) as conn, conn:
+            self._replace(
+                conn,
+                "troop",
+                (tuple(getattr(g, name) for name in _GROUP) for g in groups),
+            )
+            conn.execute(
+                "DELETE FROM member WHERE group_code NOT IN "
+                "(SELECT group_code FROM troop)"
+            )
+
+    def save_members(self, group: Group, members: List[GroupMember]) -> None:
+        """Replace saved member list of the group."""
+        with closing(self._connect()) as conn, conn:
+            self._replace(
+                conn,
+                "member",
+                (
+                    (group.group_code,)
+                    + tuple(getattr(m, name) for name in _MEMBER)
+                    for m in members
+                ),
+                "WHERE group_code = ?",
+                (group.group_code,),
+            )
+
+    def clear(self) -> None:
+        """Remove the database file."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._schema_ready = False
@@ -7,6 +7,8 @@ This module is used to get server list and choose the best one.
 .. _LICENSE:
     https://github.com/cscs181/CAI/blob/master/LICENSE
 """
+import math
+import time
 import asyncio
 import http.client
 from io import BytesIO
@@ -15,6 +17,7 @@ from typing import List, Tuple, Union, Iterable, Optional, Container
 from jce import types
 from rtea import qqtea_decrypt, qqtea_encrypt
 
+from cai.log import logger
 from cai.connection import connect
 from cai.settings.device import get_device
 from cai.exceptions import SsoServerException
@@ -22,10 +25,15 @@ from cai.settings.protocol import get_protocol
 from cai.utils.jce import RequestPacketVersion3
 from cai.connection.utils import tcp_latency_test
 
+from .catalog import ServerRecord, ServerCatalog
 from .jce import SsoServer, SsoServerRequest, SsoServerResponse
 
+SERVER_LIST_TTL: float = 86400.0
+"""Seconds before the server list is requested again."""
+
 _cached_server: Optional["SsoServer"] = None
-_cached_servers: List["SsoServer"] = []
+_catalog: Optional[ServerCatalog] = None
+_refresh_task: Optional["asyncio.Task[None]"] = None
 
 
 class _FakeSocket:
@@ -148,6 +156,63 @@ async def quality_test(
     return success_servers
 
 
+async def _refresh_catalog(
+    catalog: ServerCatalog, fetch: bool, exclude: Container[str] = ()
+) -> None:
+    if fetch:
+        sso_list = await get_sso_list()
+        catalog.add([*sso_list.socket_v4_mobile, *sso_list.socket_v4_wifi])
+    servers = catalog.ranked(exclude)
+    latencies = {
+        (server.host, server.port): latency
+        for server, latency in await quality_test(servers, math.inf)
+    }
+    for server in servers:
+        catalog.record_latency(
+            server.host,
+            server.port,
+            latencies.get((server.host, server.port), math.inf),
+        )
+    _save_catalog(catalog)
+
+
+async def _background_refresh() -> None:
+    catalog = get_server_catalog()
+    try:
+        await _refresh_catalog(
+            catalog, time.time() - catalog.fetched_at > SERVER_LIST_TTL
+        )
+    except Exception as e:
+        logger.warning(f"Failed to refresh sso server list: {e!r}")
+
+
+def _schedule_refresh() -> None:
+    global _refresh_task
+    if _refresh_task and not _refresh_task.done():
+        return
+    _refresh_task = asyncio.create_task(_background_refresh())
+
+
+def _save_catalog(catalog: ServerCatalog) -> None:
+    try:
+        catalog.save()
+    except OSError as e:
+        logger.warning(f"Failed to save sso server list: {e!r}")
+
+
+def get_server_catalog() -> ServerCatalog:
+    """Get the sso server catalogue loaded from disk.
+
+    Returns:
+        :obj:`.ServerCatalog`: Known servers with latency history.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = ServerCatalog()
+        _catalog.load()
+    return _catalog
+
+
 async def get_sso_server(
     cache: bool = True,
     cache_server_list: bool = True,
@@ -155,6 +220,11 @@ async def get_sso_server(
 ) -> SsoServer:
     """Get the best sso server
 
+    With ``cache``, the best server not excluded in the catalogue is
+    returned at once if latency of any server is known, and all servers are
+    tested again in background. The server list is requested again after
+    :data:`SERVER_LIST_TTL` seconds.
+
     Args:
         cache (bool, optional): Using cache server or not. Defaults to True.
         cache_server_list (bool, optional): Using cache server list or not. Defaults to True.
@@ -162,23 +232,85 @@ async def get_sso_server(
 
     Returns:
         :obj:`.SsoServer`: The best server with smallest latency.
+
+    Raises:
+        SsoServerException: No server is available.
     """
     global _cached_server
-    if cache and _cached_server:
+    exclude_server = exclude or ()
+    if cache and _cached_server and _cached_server.host not in exclude_server:
         return _cached_server
 
-    if cache_server_list and _cached_servers:
-        servers = _cached_servers
-    else:
-        sso_list = await get_sso_list()
-        servers = [*sso_list.socket_v4_mobile, *sso_list.socket_v4_wifi]
-        _cached_servers.clear()
-        _cached_servers.extend(servers)
+    catalog = get_server_catalog()
+    if cache and catalog.tested:
+        servers = catalog.ranked(exclude_server)
+        if servers:
+            _cached_server = servers[0]
+            _schedule_refresh()
+            return _cached_server
 
-    exclude_server = exclude or []
-    success_servers = await quality_test(
-        server for server in servers if server.host not in exclude_server
+    await _refresh_catalog(
+        catalog, not (cache_server_list and len(catalog)), exclude_server
     )
-    success_servers.sort(key=lambda x: x[1])
-    _cached_server = success_servers[0][0]
+    servers = catalog.ranked(exclude_server)
+    record = servers and catalog.get(servers[0].host, servers[0].port)
+    if not record or record.failures:
+        raise SsoServerException("No available sso server")
+    _cached_server = servers[0]
     return _cached_server
+
+
+async def get_sso_servers(refresh: bool = False) -> List[SsoServer]:
+    """Get servers ranked by latency.
+
+    Servers are ranked by failures in a row and then by smoothed latency,
+    see :class:`.ServerCatalog`.
+
+    Args:
+        refresh (bool, optional): Test latency of cached server list again.
+            Defaults to False.
+
+    Returns:
+        List[:obj:`.SsoServer`]: Servers from the best to the worst.
+    """
+    catalog = get_server_catalog()
+    if refresh or not catalog.tested:
+        await get_sso_server(cache=False)
+    return catalog.ranked()
+
+
+def add_sso_servers(servers: Iterable[SsoServer], source: str = "push") -> int:
+    """Add servers to the catalogue.
+
+    New servers are tested in background.
+
+    Args:
+        servers (Iterable[:obj:`.SsoServer`]): Listed servers.
+        source (str, optional): Where the servers come from.
+            Defaults to ``push``.
+
+    Returns:
+        int: Number of new servers.
+    """
+    catalog = get_server_catalog()
+    added = catalog.add(servers, source)
+    _save_catalog(catalog)
+    if added:
+        _schedule_refresh()
+    return added
+
+
+def demote_sso_server(host: str) -> None:
+    """Record a failed connection to the given host.
+
+    Servers of the host are moved after servers without failures.
+
+    Args:
+        host (str): Host of the failed server.
+    """
+    global _cached_server
+    catalog = get_server_catalog()
+    catalog.record_failure(host)
+    _save_catalog(catalog)
+    if _cached_server and _cached_server.host == host:
+        _cached_server = None
@@ -0,0 +1,227 @@
+"""SSO Server Catalogue.
+
+This module is used to save known sso servers and their latency history to
+disk, so the best server can be chosen without testing all of them.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import os
+import json
+import math
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Tuple, Iterable, Optional, Container
+
+from cai.storage import Storage
+
+from .jce import SsoServer
+
+_VERSION = 1
+
+
+@dataclass
+class ServerRecord:
+    """Known sso server.
+
+    Attributes:
+        host (str): Server host.
+        port (int): Server port.
+        protocol (int): Server protocol, see :attr:`.SsoServer.protocol`.
+        city (str): Server city.
+        country (str): Server country.
+        source (str): ``http`` for the server list request, ``push`` for
+            ``ConfigPushSvc.PushReq``.
+        latency (Optional[float]): Smoothed tcp latency in milliseconds.
+        failures (int): Failed tests or connections in a row.
+        seen_at (float): Last time the server was listed.
+        tested_at (float): Last time the server was tested.
+    """
+
+    host: str
+    port: int
+    protocol: int = 0
+    city: str = ""
+    country: str = ""
+    source: str = "http"
+    latency: Optional[float] = None
+    failures: int = 0
+    seen_at: float = 0.0
+    tested_at: float = 0.0
+
+    def to_server(self) -> SsoServer:
+        return SsoServer(
+            host=self.host,
+            port=self.port,
+            protocol=bytes([self.protocol]),
+            city=self.city,
+            country=self.country,
+        )
+
+
+class ServerCatalog:
+    """Sso servers collected from all sources with latency history.
+
+    Servers are ranked by failures in a row, then by smoothed latency.
+    Servers not listed by any source for ``max_age`` seconds are dropped.
+    :meth:`load` and :meth:`save` are blocking, the file is small enough to
+    be handled in the event loop.
+
+    Args:
+        path (Optional[str], optional): Catalogue file path. Defaults to
+            :attr:`Storage.sso_server_file`.
+        alpha (float, optional): Weight of a new latency sample.
+            Defaults to 0.25.
+        max_age (float, optional): Seconds before an unlisted server is
+            dropped. Defaults to 7 days.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        alpha: float = 0.25,
+        max_age: float = 7 * 86400,
+    ):
+        self.path = path or Storage.sso_server_file
+        self.alpha = alpha
+        self.max_age = max_age
+        self.fetched_at: float = 0.0
+        self._records: Dict[Tuple[str, int], ServerRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(list(self._records.values()))
+
+    def get(self, host: str, port: int) -> Optional[ServerRecord]:
+        return self._records.get((host, port))
+
+    @property
+    def tested(self) -> bool:
+        """:obj:`bool`: Any server has known latency."""
+        return any(
+            record.latency is not None for record in self._records.values()
+        )
+
+    def load(self) -> bool:
+        """Load the catalogue from disk.
+
+        Returns:
+            bool: False if there is no usable file.
+        """
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != _VERSION:
+                return False
+            records = [ServerRecord(**record) for record in data["servers"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self.fetched_at = data.get("fetched_at", 0.0)
+        self._records = {(r.host, r.port): r for r in records}
+        return True
+
+    def save(self) -> None:
+        """Save the catalogue to disk, dropping stale servers."""
+        deadline = time.time() - self.max_age
+        self._records = {
+            key: record
+            for key, record in self._records.items()
+            if record.seen_at >= deadline
+        }
+        data = {
+            "version": _VERSION,
+            "fetched_at": self.fetched_at,
+            "servers": [asdict(record) for record in self._records.values()],
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, servers: Iterable[SsoServer], source: str = "http") -> int:
+        """Add listed servers or mark known ones as seen.
+
+        Args:
+            servers (Iterable[SsoServer]): Listed servers.
+            source (str, optional): Where the servers come from.
+                Defaults to ``http``.
+
+        Returns:
+            int: Number of new servers.
+        """
+        now = time.time()
+        if source == "http":
+            self.fetched_at = now
+        added = 0
+        for server in servers:
+            key = (str(server.host), int(server.port))
+            record = self._records.get(key)
+            if not record:
+                record = ServerRecord(
+                    *key,
+                    protocol=server.protocol[0] if server.protocol else 0,
+                    city=server.city,
+                    country=server.country,
+                    source=source,
+                )
+                self._records[key] = record
+                added += 1
+            record.seen_at = now
+        return added
+
+    def record_latency(self, host: str, port: int, latency: float) -> None:
+        """Record a tcp latency test result.
+
+        Args:
+            host (str): Server host.
+            port (int): Server port.
+            latency (float): Latency in milliseconds, ``inf`` if failed.
+        """
+        record = self._records.get((host, port))
+        if not record:
+            return
+        record.tested_at = time.time()
+        if math.isinf(latency):
+            record.failures += 1
+            return
+        record.failures = 0
+        record.latency = (
+            latency
+            if record.latency is None
+            else (1 - self.alpha) * record.latency + self.alpha * latency
+        )
+
+    def record_failure(self, host: str, port: Optional[int] = None) -> None:
+        """Record a failed connection to the server.
+
+        Args:
+            host (str): Server host.
+            port (Optional[int], optional): Server port. All servers of the
+                host if not given. Defaults to None.
+        """
+        for record in self._records.values():
+            if record.host == host and port in (None, record.port):
+                record.failures += 1
+
+    def ranked(self, exclude: Container[str] = ()) -> List[SsoServer]:
+        """Get servers from the best to the worst.
+
+        Args:
+            exclude (Container[str], optional): Hosts to be excluded.
+
+        Returns:
+            List[SsoServer]: Ranked servers.
+        """
+        records = sorted(
+            (r for r in self._records.values() if r.host not in exclude),
+            key=lambda r: (
+                r.failures,
+                math.inf if r.latency is None else r.latency,
+            ),
+        )
+        return [record.to_server() for record in records]
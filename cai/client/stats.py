@@ -0,0 +1,101 @@
+"""Client Resource Accounting.
+
+This module is used to count resources used by one client.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+from typing import Optional
+from dataclasses import dataclass
+
+from cai.utils.batch import BatchStats
+from cai.utils.dedup import DedupStats
+from cai.utils.future import InFlightStats
+from cai.connection.writer import WriteStats
+from cai.utils.dispatcher import DispatchStats
+from cai.client.message_service.fragment import FragmentStats
+
+
+@dataclass
+class ClientStats:
+    """Resource usage of one client.
+
+    Times are seconds the event loop spent running code of this client, see
+    :class:`~cai.utils.coroutine.CPUTimer`. Frames decoded in the
+    ``decode_executor`` are not counted in ``parse_time``.
+
+    Attributes:
+        uin (int): Client account.
+        frames_in (int): Number of received frames.
+        bytes_in (int): Number of received bytes.
+        frames_out (int): Number of sent packets.
+        bytes_out (int): Number of sent bytes.
+        parse_time (float): CPU time in :meth:`IncomingPacket.parse`.
+        handler_time (float): CPU time in packet handlers.
+        listener_time (float): CPU time in event listeners.
+        events_dispatched (int): Number of dispatched events.
+        heartbeats_sent (int): Number of sent heartbeats.
+        heartbeats_skipped (int): Number of heartbeats skipped because
+            packets were received recently.
+        heartbeats_missed (int): Number of heartbeats without response.
+        heartbeat_rtt (Optional[float]): Smoothed heartbeat round trip time.
+        listener_calls (int): Number of listener calls matched by filters.
+        connection_losses (int): Number of detected connection losses.
+        reconnect_attempts (int): Number of servers tried to recover.
+        reconnects (int): Number of recovered connection losses.
+        recovery_time (float): Total seconds from losses to recovery.
+        last_recovery_time (Optional[float]): Seconds the last recovery took.
+        pending_futures (int): Number of requests waiting for response.
+        cached_friends (int): Number of cached friends.
+        cached_groups (int): Number of cached groups.
+        cached_group_members (int): Number of cached group members.
+        cached_messages (int): Number of messages remembered for
+            deduplication.
+        dispatch (Optional[DispatchStats]): Dispatcher counters.
+        in_flight (Optional[InFlightStats]): Request table counters.
+        write (Optional[WriteStats]): Outbound queue counters of the
+            current connection.
+        fragments (Optional[FragmentStats]): Long message fragment counters.
+        dedup (Optional[DedupStats]): Message deduplication counters.
+        delete_batch (Optional[BatchStats]): Read message acknowledgement
+            batching counters.
+    """
+
+    uin: int
+    frames_in: int = 0
+    bytes_in: int = 0
+    frames_out: int = 0
+    bytes_out: int = 0
+    parse_time: float = 0.0
+    handler_time: float = 0.0
+    listener_time: float = 0.0
+    events_dispatched: int = 0
+    heartbeats_sent: int = 0
+    heartbeats_skipped: int = 0
+    heartbeats_missed: int = 0
+    heartbeat_rtt: Optional[float] = None
+    listener_calls: int = 0
+    connection_losses: int = 0
+    reconnect_attempts: int = 0
+    reconnects: int = 0
+    recovery_time: float = 0.0
+    last_recovery_time: Optional[float] = None
+    pending_futures: int = 0
+    cached_friends: int = 0
+    cached_groups: int = 0
+    cached_group_members: int = 0
+    cached_messages: int = 0
+    dispatch: Optional[DispatchStats] = None
+    in_flight: Optional[InFlightStats] = None
+    write: Optional[WriteStats] = None
+    fragments: Optional[FragmentStats] = None
+    dedup: Optional[DedupStats] = None
+    delete_batch: Optional[BatchStats] = None
+
+    @property
+    def cpu_time(self) -> float:
+        """:obj:`float`: Total time the event loop spent on this client."""
+        return self.parse_time + self.handler_time + self.listener_time
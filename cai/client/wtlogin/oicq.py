@@ -12,11 +12,13 @@ import struct
 from dataclasses import dataclass
 from typing import Any, Dict, Union, Optional
 
-from cai.utils.binary import Packet
 from cai.client.command import Command
+from cai.utils.binary import Packet, PacketSchema
 
 from .tlv import TlvDecoder
 
+_RESPONSE_HEAD = PacketSchema().uint16().uint8().offset(2).remain()
+
 
 class OICQRequest(Packet):
     """Build OICQ Request Packet
@@ -85,11 +87,7 @@ class OICQResponse(Command):
         if ret_code != 0 or not data:
             return OICQResponse(uin, seq, ret_code, command_name)
 
-        data_ = Packet(data)
-
-        sub_command, status, _tlv_bytes = (
-            data_.start().uint16().uint8().offset(2).remain().execute()
-        )
+        sub_command, status, _tlv_bytes = _RESPONSE_HEAD.unpack(data)
 
         _tlv_map = TlvDecoder.decode(_tlv_bytes)
 
@@ -15,6 +15,9 @@ from typing import Any, Type, Union, Optional
 from cai.utils.binary import Packet
 from cai.utils.coroutine import ContextManager
 
+from .writer import WriteQueue, WriteStats
+from .protocol import FrameHandler, FrameProtocol
+
 
 class Connection:
     def __init__(
@@ -23,14 +26,19 @@ class Connection:
         port: int,
         ssl: bool = False,
         timeout: Optional[float] = None,
+        flush_delay: float = 0.0,
+        write_high_water: int = 256 * 1024,
     ) -> None:
         self._host = host
         self._port = port
         self._ssl = ssl
         self.timeout = timeout
+        self.flush_delay = flush_delay
+        self.write_high_water = write_high_water
 
-        self._reader: Optional[asyncio.StreamReader] = None
-        self._writer: Optional[asyncio.StreamWriter] = None
+        self._protocol: Optional[FrameProtocol] = None
+        self._transport: Optional[asyncio.Transport] = None
+        self._queue: Optional[WriteQueue] = None
 
     @property
     def host(self) -> str:
@@ -45,20 +53,25 @@ class Connection:
         return self._ssl
 
     @property
-    def writer(self) -> asyncio.StreamWriter:
-        if not self._writer:
+    def writer(self) -> asyncio.Transport:
+        if not self._transport:
             raise RuntimeError("Connection closed!")
-        return self._writer
+        return self._transport
 
     @property
-    def reader(self) -> asyncio.StreamReader:
-        if not self._reader:
+    def reader(self) -> FrameProtocol:
+        if not self._protocol:
             raise RuntimeError("Connection closed!")
-        return self._reader
+        return self._protocol
 
     @property
     def closed(self) -> bool:
-        return self._writer is None
+        return self._transport is None
+
+    @property
+    def write_stats(self) -> Optional[WriteStats]:
+        """Counters of the outbound queue, ``None`` if not connected."""
+        return self._queue.stats if self._queue is not None else None
 
     async def __aenter__(self):
         await self._connect()
@@ -74,26 +87,40 @@ class Connection:
         return
 
     async def _connect(self):
+        loop = asyncio.get_event_loop()
         try:
-            self._reader, self._writer = await asyncio.wait_for(
-                asyncio.open_connection(self._host, self._port, ssl=self._ssl),
+            self._transport, self._protocol = await asyncio.wait_for(
+                loop.create_connection(
+                    FrameProtocol, self._host, self._port, ssl=self._ssl
+                ),
                 self.timeout,
             )
+            self._queue = WriteQueue(
+                self._transport,
+                self._protocol,
+                self.flush_delay,
+                self.write_high_water,
+            )
         except Exception as e:
-            if self._writer:
-                self._writer.transport.close()
-            self._reader = None
-            self._writer = None
+            if self._transport:
+                self._transport.close()
+            self._transport = None
+            self._protocol = None
             raise ConnectionError(
                 f"Open connection to {self._host}:{self._port} failed"
             ) from e
 
     async def close(self):
-        if self._writer:
-            self._writer.close()
-            await self._writer.wait_closed()
-        self._writer = None
-        self._reader = None
+        if self._queue is not None:
+            # queued frames are written before the transport closes
+            self._queue.flush()
+            self._queue.close()
+        if self._transport:
+            self._transport.close()
+            await self.reader.wait_closed()
+        self._transport = None
+        self._protocol = None
+        self._queue = None
 
     async def reconnect(self) -> None:
         await self.close()
@@ -129,22 +156,89 @@ class Connection:
             ) from e
         return data
 
-    def write(self, data: Union[bytes, Packet]):
-        self.writer.write(data)  # type: ignore
+    async def read_frames(self, handler: FrameHandler) -> None:
+        """Pass every length-prefixed frame to the handler until disconnect.
+
+        The handler receives a :obj:`memoryview` of the frame body (without the
+        4-byte length) pointing into the receive buffer. The view is only valid
+        until the handler returns.
+
+        Args:
+            handler (Callable[[memoryview], Any]): Frame handler.
+
+        Raises:
+            ConnectionAbortedError: Connection lost.
+        """
+        protocol = self.reader
+        protocol.set_frame_handler(handler)
+        try:
+            await protocol.wait_lost()
+        except (ValueError, IOError, OSError) as e:
+            await self.close()
+            raise ConnectionAbortedError(
+                f"Lost connection to {self._host}:{self._port}"
+            ) from e
+        finally:
+            protocol.set_frame_handler(None)
+        await self.close()
+        raise ConnectionAbortedError(
+            f"Lost connection to {self._host}:{self._port}"
+        )
+
+    def pause_reading(self):
+        """Stop reading from the socket until :meth:`resume_reading`."""
+        if self._transport and not self._transport.is_closing():
+            self._transport.pause_reading()
+
+    def resume_reading(self):
+        if self._transport and not self._transport.is_closing():
+            self._transport.resume_reading()
+
+    @property
+    def queue(self) -> WriteQueue:
+        if self._queue is None:
+            raise RuntimeError("Connection closed!")
+        return self._queue
+
+    def write(self, data: Union[bytes, Packet], urgent: bool = False):
+        """Queue data to write without waiting for backpressure."""
+        self.queue.put(data, urgent)
 
     def write_eof(self):
         if self.writer.can_write_eof():
+            self.queue.flush()
             self.writer.write_eof()
 
-    async def awrite(self, data: Union[bytes, Packet]):
-        self.writer.write(data)  # type: ignore
-        await self.writer.drain()
+    async def awrite(self, data: Union[bytes, Packet], urgent: bool = False):
+        """Queue data to write.
+
+        Frames queued in the same flush window are coalesced into one write.
+        Waits if too many bytes are buffered, unless ``urgent``.
+
+        Args:
+            data (Union[bytes, Packet]): Data to write.
+            urgent (bool, optional): Write before other queued data and
+                never wait. Defaults to False.
+        """
+        await self.queue.write(data, urgent)
 
 
 def connect(
-    host: str, port: int, ssl: bool = False, timeout: Optional[float] = None
+    host: str,
+    port: int,
+    ssl: bool = False,
+    timeout: Optional[float] = None,
+    flush_delay: float = 0.0,
+    write_high_water: int = 256 * 1024,
 ) -> ContextManager[Any, Any, Connection]:
-    coro = _connect(host, port, ssl=ssl, timeout=timeout)
+    coro = _connect(
+        host,
+        port,
+        ssl=ssl,
+        timeout=timeout,
+        flush_delay=flush_delay,
+        write_high_water=write_high_water,
+    )
     return ContextManager(coro)
 
 
@@ -0,0 +1,292 @@
+"""Buffered Stream Protocol
+
+This module is used to read data from transport into a reusable buffer
+without intermediate copies.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import struct
+import asyncio
+from typing import Any, Callable, Optional
+
+FrameHandler = Callable[[memoryview], Any]
+
+_length = struct.Struct(">I")
+_MIN_READ_SIZE = 4096
+
+
+class FrameProtocol(asyncio.BufferedProtocol):
+    """Buffered protocol reading into a growable receive buffer.
+
+    Incoming data is written by the transport directly into an internal
+    :obj:`bytearray`. Data can be consumed in two ways:
+
+    * Frame mode: once :meth:`set_frame_handler` is called, every complete
+      4-byte length-prefixed frame (length includes the prefix itself) is
+      passed to the handler as a :obj:`memoryview` of the frame body.
+      The view points into the receive buffer and is released as soon as the
+      handler returns, so it must be consumed synchronously.
+    * Stream mode: :meth:`readexactly`, :meth:`readline` and :meth:`read`
+      behave like the :class:`asyncio.StreamReader` methods of the same name.
+
+    Args:
+        buffer_size (int, optional): Initial receive buffer size.
+            Defaults to 64 KiB.
+    """
+
+    def __init__(self, buffer_size: int = 65536):
+        self._buffer = bytearray(buffer_size)
+        self._start: int = 0
+        self._end: int = 0
+        self._need: int = 0
+
+        self._transport: Optional[asyncio.Transport] = None
+        self._frame_handler: Optional[FrameHandler] = None
+        self._eof: bool = False
+        self._exception: Optional[BaseException] = None
+        self._waiter: Optional["asyncio.Future[None]"] = None
+        self._paused: bool = False
+        self._drain_waiter: Optional["asyncio.Future[None]"] = None
+        self._closed: Optional["asyncio.Future[None]"] = None
+
+    @property
+    def transport(self) -> Optional[asyncio.Transport]:
+        return self._transport
+
+    @property
+    def buffered(self) -> int:
+        """:obj:`int`: Number of bytes received but not consumed yet."""
+        return self._end - self._start
+
+    @property
+    def writing_paused(self) -> bool:
+        """:obj:`bool`: Transport write buffer is over its high-water mark."""
+        return self._paused
+
+    @property
+    def at_eof(self) -> bool:
+        return self._eof and self._start == self._end
+
+    # transport callbacks
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport  # type: ignore
+        self._closed = asyncio.get_event_loop().create_future()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._eof = True
+        if exc is not None:
+            self._exception = exc
+        self._wakeup()
+
+        if self._paused:
+            self._paused = False
+            self._wakeup_drain(exc)
+
+        if self._closed and not self._closed.done():
+            self._closed.set_result(None)
+        self._transport = None
+
+    def eof_received(self) -> bool:
+        self._eof = True
+        self._wakeup()
+        return False
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        self._wakeup_drain(None)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        free = len(self._buffer) - self._end
+        need = max(sizehint, self._need - self.buffered, _MIN_READ_SIZE)
+        if free < need:
+            self._reserve(need)
+        return memoryview(self._buffer)[self._end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._end += nbytes
+        if self._frame_handler:
+            self._process_frames()
+        self._wakeup()
+
+    # buffer management
+    def _reserve(self, size: int) -> None:
+        """Make sure ``size`` bytes are free at the end of the buffer.
+
+        The buffer is never resized in place because the transport may still
+        hold an exported view of it. Unread data is moved to the front or into
+        a larger buffer instead.
+        """
+        data_size = self.buffered
+        if data_size + size <= len(self._buffer):
+            if data_size:
+                self._buffer[:data_size] = self._buffer[self._start : self._end]
+        else:
+            capacity = len(self._buffer) * 2
+            while capacity < data_size + size:
+                capacity *= 2
+            buffer = bytearray(capacity)
+            buffer[:data_size] = self._buffer[self._start : self._end]
+            self._buffer = buffer
+        self._start = 0
+        self._end = data_size
+
+    def _consume(self, size: int) -> None:
+        self._start += size
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    # frame mode
+    def set_frame_handler(self, handler: Optional[FrameHandler]) -> None:
+        """Set frame handler and process frames already buffered.
+
+        Args:
+            handler (Optional[Callable[[memoryview], Any]]): Frame handler.
+                ``None`` to switch back to stream mode.
+        """
+        self._frame_handler = handler
+        if handler:
+            self._process_frames()
+
+    def _process_frames(self) -> None:
+        while self._frame_handler and self.buffered >= 4:
+            length = _length.unpack_from(self._buffer, self._start)[0]
+            if length < 4:
+                self._abort(ValueError(f"Invalid frame length {length}"))
+                return
+            if self.buffered < length:
+                self._need = length
+                return
+
+            self._need = 0
+            start = self._start + 4
+            end = self._start + length
+            self._consume(length)
+            with memoryview(self._buffer) as view:
+                with view[start:end] as frame:
+                    self._frame_handler(frame)
+
+    def _abort(self, exc: BaseException) -> None:
+        self._exception = exc
+        self._start = self._end = 0
+        if self._transport:
+            self._transport.abort()
+        self._wakeup()
+
+    # stream mode
+    def _wakeup(self) -> None:
+        waiter = self._waiter
+        if waiter:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _wakeup_drain(self, exc: Optional[BaseException]) -> None:
+        waiter = self._drain_waiter
+        if waiter:
+            self._drain_waiter = None
+            if waiter.done():
+                return
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
+
+    async def _wait_for_data(self) -> None:
+        if self._exception:
+            raise self._exception
+        if self._eof:
+            return
+        if self._waiter:
+            raise RuntimeError("Another coroutine is already waiting for data")
+        self._waiter = asyncio.get_event_loop().create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+        if self._exception:
+            raise self._exception
+
+    async def readexactly(self, n: int) -> bytes:
+        """Read exactly ``n`` bytes.
+
+        Raises:
+            asyncio.IncompleteReadError: EOF reached before ``n`` bytes read.
+        """
+        while self.buffered < n:
+            if self._eof:
+                partial = bytes(self._buffer[self._start : self._end])
+                self._consume(self.buffered)
+                raise asyncio.IncompleteReadError(partial, n)
+            self._need = n
+            await self._wait_for_data()
+        self._need = 0
+        data = bytes(self._buffer[self._start : self._start + n])
+        self._consume(n)
+        return data
+
+    async def readline(self) -> bytes:
+        """Read one line ending with ``\\n``, or all data before EOF."""
+        while True:
+            index = self._buffer.find(b"\n", self._start, self._end)
+            if index >= 0:
+                size = index + 1 - self._start
+                break
+            if self._eof:
+                size = self.buffered
+                break
+            await self._wait_for_data()
+        data = bytes(self._buffer[self._start : self._start + size])
+        self._consume(size)
+        return data
+
+    async def read(self, n: int = -1) -> bytes:
+        """Read up to ``n`` bytes. Read until EOF if ``n`` is ``-1``."""
+        if n < 0:
+            while not self._eof:
+                await self._wait_for_data()
+            size = self.buffered
+        else:
+            if not self.buffered and not self._eof:
+                await self._wait_for_data()
+            size = min(n, self.buffered)
+        data = bytes(self._buffer[self._start : self._start + size])
+        self._consume(size)
+        return data
+
+    # writing
+    async def drain(self) -> None:
+        """Wait until the transport write buffer is flushed enough."""
+        if self._exception:
+            raise self._exception
+        if self._transport is None or self._transport.is_closing():
+            # yield to let connection_lost run
+            await asyncio.sleep(0)
+            raise ConnectionResetError("Connection lost")
+        if not self._paused:
+            return
+        if not self._drain_waiter:
+            self._drain_waiter = asyncio.get_event_loop().create_future()
+        await asyncio.shield(self._drain_waiter)
+
+    async def wait_lost(self) -> None:
+        """Wait until the connection is lost.
+
+        Raises:
+            Exception: The reason why the connection is lost.
+        """
+        if self._closed:
+            await asyncio.shield(self._closed)
+        if self._exception:
+            raise self._exception
+
+    async def wait_closed(self) -> None:
+        """Wait until the connection is closed, ignoring errors."""
+        if self._closed:
+            await asyncio.shield(self._closed)
@@ -0,0 +1,226 @@
+"""Outbound Frame Queue
+
+This module is used to coalesce outbound frames into gathered writes.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Deque, Union, Optional
+
+from cai.utils.binary import Packet
+
+from .protocol import FrameProtocol
+
+
+@dataclass
+class WriteStats:
+    """Outbound queue counters snapshot.
+
+    Attributes:
+        queued (int): Number of frames waiting in queue.
+        queued_bytes (int): Size of frames waiting in queue.
+        frames (int): Number of written frames.
+        bytes (int): Number of written bytes.
+        writes (int): Number of gathered writes to the transport.
+        urgent_frames (int): Number of frames written in the urgent lane.
+        waits (int): Number of times a writer waited for backpressure.
+    """
+
+    queued: int
+    queued_bytes: int
+    frames: int
+    bytes: int
+    writes: int
+    urgent_frames: int
+    waits: int
+
+
+class WriteQueue:
+    """Outbound frame queue of a transport.
+
+    Frames queued in the same flush window are written with one
+    :meth:`asyncio.WriteTransport.writelines` call. Urgent frames are
+    written before normal ones and keep being written while the transport
+    is paused, normal frames wait in queue until it resumes. Normal writers
+    wait when queued and transport buffered bytes exceed ``high_water``.
+
+    Args:
+        transport (asyncio.Transport): Connected transport.
+        protocol (FrameProtocol): Protocol of the transport.
+        flush_delay (float, optional): Seconds to collect frames before a
+            write. ``0`` flushes at the next loop iteration. Defaults to 0.
+        high_water (int, optional): Buffered bytes before normal writers
+            wait. Defaults to 256 KiB.
+    """
+
+    def __init__(
+        self,
+        transport: asyncio.Transport,
+        protocol: FrameProtocol,
+        flush_delay: float = 0.0,
+        high_water: int = 256 * 1024,
+    ):
+        self._transport = transport
+        self._protocol = protocol
+        self.flush_delay = flush_delay
+        self.high_water = high_water
+        self._loop = asyncio.get_event_loop()
+
+        self._urgent: Deque[Union[bytes, Packet]] = deque()
+        self._normal: Deque[Union[bytes, Packet]] = deque()
+        self._size: int = 0
+        self._handle: Optional[asyncio.Handle] = None
+        self._resuming: Optional["asyncio.Task[None]"] = None
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._exception: Optional[BaseException] = None
+
+        self._frames: int = 0
+        self._bytes: int = 0
+        self._writes: int = 0
+        self._urgent_frames: int = 0
+        self._waits: int = 0
+
+    def __len__(self) -> int:
+        return len(self._urgent) + len(self._normal)
+
+    @property
+    def stats(self) -> WriteStats:
+        return WriteStats(
+            len(self),
+            self._size,
+            self._frames,
+            self._bytes,
+            self._writes,
+            self._urgent_frames,
+            self._waits,
+        )
+
+    @property
+    def buffered(self) -> int:
+        """:obj:`int`: Bytes queued here and in the transport buffer."""
+        return self._size + self._transport.get_write_buffer_size()
+
+    def put(self, data: Union[bytes, Packet], urgent: bool = False) -> None:
+        """Queue a frame without waiting.
+
+        Args:
+            data (Union[bytes, Packet]): Encoded frame.
+            urgent (bool, optional): Write before normal frames.
+                Defaults to False.
+        """
+        if self._exception:
+            raise self._exception
+        if self._transport.is_closing():
+            raise ConnectionResetError("Connection lost")
+        (self._urgent if urgent else self._normal).append(data)
+        self._size += len(data)
+        if self._handle is None:
+            if urgent or not self.flush_delay:
+                self._handle = self._loop.call_soon(self.flush)
+            else:
+                self._handle = self._loop.call_later(
+                    self.flush_delay, self.flush
+                )
+        elif urgent and isinstance(self._handle, asyncio.TimerHandle):
+            # urgent frame does not wait for the flush window
+            self._handle.cancel()
+            self._handle = self._loop.call_soon(self.flush)
+
+    async def write(
+        self, data: Union[bytes, Packet], urgent: bool = False
+    ) -> None:
+        """Queue a frame and wait if the buffer is full.
+
+        Args:
+            data (Union[bytes, Packet]): Encoded frame.
+            urgent (bool, optional): Write before normal frames and never
+                wait. Defaults to False.
+        """
+        self.put(data, urgent)
+        if urgent or self.buffered <= self.high_water:
+            return
+
+        self._waits += 1
+        waiter = self._loop.create_future()
+        self._waiters.append(waiter)
+        await waiter
+
+    def _take(self, frames: Deque[Union[bytes, Packet]]) -> List[bytes]:
+        taken = list(frames)
+        frames.clear()
+        self._size -= sum(map(len, taken))
+        return taken  # type: ignore
+
+    def flush(self) -> None:
+        """Write queued frames to the transport now."""
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        if self._exception or self._transport.is_closing():
+            return
+
+        frames: List[bytes] = []
+        if self._urgent:
+            self._urgent_frames += len(self._urgent)
+            frames = self._take(self._urgent)
+        if self._normal and not self._protocol.writing_paused:
+            frames.extend(self._take(self._normal))
+        if frames:
+            self._transport.writelines(frames)
+            self._writes += 1
+            self._frames += len(frames)
+            self._bytes += sum(map(len, frames))
+
+        self._wakeup()
+        if (
+            (self._normal or self._waiters)
+            and self._protocol.writing_paused
+            and not self._resuming
+        ):
+            self._resuming = self._loop.create_task(self._wait_resume())
+
+    async def _wait_resume(self) -> None:
+        try:
+            await self._protocol.drain()
+        except Exception as e:
+            self._resuming = None
+            self.close(e)
+            return
+        self._resuming = None
+        self.flush()
+
+    def _wakeup(self) -> None:
+        # transport accepting data means it is drained enough
+        writable = not self._normal and not self._protocol.writing_paused
+        while self._waiters and (writable or self.buffered <= self.high_water):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def close(self, exc: Optional[BaseException] = None) -> None:
+        """Drop queued frames and fail waiting writers.
+
+        Args:
+            exc (Optional[BaseException], optional): Exception raised in
+                waiting and later writers. Defaults to ConnectionResetError.
+        """
+        self._exception = exc or ConnectionResetError("Connection closed")
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        if self._resuming:
+            self._resuming.cancel()
+            self._resuming = None
+        self._urgent.clear()
+        self._normal.clear()
+        self._size = 0
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(self._exception)
@@ -0,0 +1,379 @@
+"""Multi-process Account Runner
+
+This module is used to run accounts in multiple worker processes.
+
+Accounts in the config file are sharded across worker processes by uin. Each
+worker runs its own event loop, logs in with :func:`cai.api.login` and
+forwards events to the supervisor process through a pipe. Crashed workers are
+restarted automatically.
+
+Example:
+    Config file ``accounts.json``::
+
+        {
+            "workers": 4,
+            "accounts": [
+                {"uin": 10001, "password": "password"},
+                {"uin": 10002, "password_md5": "5f4dcc3b5aa765d61d8327deb882cf99"}
+            ]
+        }
+
+    Run the supervisor::
+
+        python -m cai.runner accounts.json
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import os
+import copy
+import json
+import time
+import pickle
+import signal
+import asyncio
+import argparse
+import multiprocessing
+from hashlib import md5
+from dataclasses import field, dataclass
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Set, Dict, List, Tuple, Callable, Optional, Awaitable
+
+from cai.log import logger
+from cai.client import Event, Client
+
+ST = Callable[[int, Event], Awaitable[None]]
+
+# worker running longer than this is considered healthy
+_STABLE_UPTIME = 60.0
+
+
+@dataclass
+class Account:
+    uin: int
+    password_md5: bytes
+
+
+@dataclass
+class RunnerConfig:
+    """Runner config.
+
+    Attributes:
+        accounts (List[Account]): Accounts to run.
+        workers (int): Number of worker processes.
+        restart_delay (float): Seconds to wait before restarting a crashed
+            worker. Doubled each time the worker crashes again within a
+            minute, up to ``max_restart_delay``.
+        max_restart_delay (float): Max restart delay.
+        stop_timeout (float): Seconds to wait for workers to close their
+            clients before killing them.
+    """
+
+    accounts: List[Account]
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    restart_delay: float = 5.0
+    max_restart_delay: float = 300.0
+    stop_timeout: float = 10.0
+
+
+def load_config(path: str) -> RunnerConfig:
+    """Load runner config from a json file.
+
+    Each account needs ``uin`` and either ``password`` or hex
+    ``password_md5``.
+
+    Args:
+        path (str): Config file path.
+
+    Raises:
+        ValueError: Invalid account config.
+
+    Returns:
+        RunnerConfig: Runner config.
+    """
+    with open(path, "r") as f:
+        data: Dict[str, Any] = json.load(f)
+
+    accounts: List[Account] = []
+    for account in data.pop("accounts", []):
+        if "password_md5" in account:
+            password_md5 = bytes.fromhex(account["password_md5"])
+        elif "password" in account:
+            password_md5 = md5(account["password"].encode()).digest()
+        else:
+            raise ValueError(f"Password needed for account {account['uin']}")
+        accounts.append(Account(int(account["uin"]), password_md5))
+    return RunnerConfig(accounts, **data)
+
+
+def shard_accounts(
+    accounts: List[Account], workers: int
+) -> List[List[Account]]:
+    """Split accounts into worker shards by uin.
+
+    An account always goes to the same worker as long as the number of
+    workers is unchanged.
+
+    Args:
+        accounts (List[Account]): Accounts to split.
+        workers (int): Number of workers.
+
+    Returns:
+        List[List[Account]]: Accounts of each worker.
+    """
+    shards: List[List[Account]] = [[] for _ in range(workers)]
+    for account in accounts:
+        shards[account.uin % workers].append(account)
+    return shards
+
+
+def _pack_event(uin: int, event: Event) -> bytes:
+    # raw protobuf message is only useful inside the worker
+    if hasattr(event, "_msg"):
+        event = copy.copy(event)
+        event._msg = None  # type: ignore
+    return pickle.dumps((uin, event), pickle.HIGHEST_PROTOCOL)
+
+
+def _worker_main(index: int, accounts: List[Account], conn: Connection):
+    try:
+        asyncio.run(_run_worker(index, accounts, conn))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _run_worker(index: int, accounts: List[Account], conn: Connection):
+    from cai import api
+
+    loop = asyncio.get_running_loop()
+    stopped = loop.create_future()
+
+    def _stop():
+        if not stopped.done():
+            stopped.set_result(None)
+
+    def _read_parent():
+        # supervisor never sends data, readable means it exited
+        try:
+            conn.recv_bytes()
+        except (EOFError, OSError):
+            loop.remove_reader(conn.fileno())
+            _stop()
+
+    loop.add_reader(conn.fileno(), _read_parent)
+    loop.add_signal_handler(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # pipe writes block while the supervisor is busy, a single thread keeps
+    # them off the loop and in order
+    sender = ThreadPoolExecutor(1, thread_name_prefix=f"cai-worker-{index}")
+
+    async def forward(client: Client, event: Event):
+        data = _pack_event(client.uin, event)
+        try:
+            await loop.run_in_executor(sender, conn.send_bytes, data)
+        except (BrokenPipeError, OSError):
+            _stop()
+
+    for account in accounts:
+        try:
+            client = await api.login(account.uin, account.password_md5)
+        except Exception:
+            logger.exception(f"Worker {index}: Login {account.uin} failed")
+            continue
+        client.add_event_listener(forward)
+        logger.info(f"Worker {index}: Account {account.uin} online")
+
+    await stopped
+    await api.close_all()
+    sender.shutdown(wait=False)
+
+
+class Supervisor:
+    """Run accounts in worker processes and receive their events.
+
+    Args:
+        config (RunnerConfig): Runner config.
+    """
+
+    def __init__(self, config: RunnerConfig):
+        self.config = config
+        self._shards = shard_accounts(config.accounts, config.workers)
+        self._listeners: Set[ST] = set()
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: Dict[int, multiprocessing.process.BaseProcess] = {}
+        self._conns: Dict[int, Connection] = {}
+        self._started_at: Dict[int, float] = {}
+        self._delays: Dict[int, float] = {}
+        self._stopped: Optional["asyncio.Future[None]"] = None
+
+    def add_event_listener(self, listener: ST) -> None:
+        """Add event listener for events of all accounts.
+
+        Args:
+            listener (Callable[[int, Event], Awaitable[None]]): Event
+                listener called with account uin and event.
+        """
+        self._listeners.add(listener)
+
+    @property
+    def workers(self) -> List[Tuple[int, Optional[int]]]:
+        """:obj:`list`: Index and pid of each worker."""
+        return [
+            (index, process.pid)
+            for index, process in sorted(self._processes.items())
+        ]
+
+    def _start_worker(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        # worker sends events and sees EOF when the supervisor exits
+        conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self._shards[index], child_conn),
+            name=f"cai-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        self._processes[index] = process
+        self._conns[index] = conn
+        self._started_at[index] = time.monotonic()
+        loop.add_reader(conn.fileno(), self._read_events, index)
+        loop.add_reader(process.sentinel, self._on_exit, index)
+        logger.info(
+            f"Worker {index} started (pid {process.pid}) "
+            f"with {len(self._shards[index])} accounts"
+        )
+
+    def _read_events(self, index: int) -> None:
+        conn = self._conns[index]
+        try:
+            while conn.poll():
+                uin, event = pickle.loads(conn.recv_bytes())
+                for listener in self._listeners:
+                    asyncio.create_task(
+                        self._run_listener(listener, uin, event)
+                    )
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+
+    async def _run_listener(self, listener: ST, uin: int, event: Event):
+        try:
+            await listener(uin, event)
+        except Exception as e:
+            logger.exception(e)
+
+    def _cleanup_worker(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        process = self._processes.pop(index)
+        loop.remove_reader(process.sentinel)
+        conn = self._conns.pop(index)
+        loop.remove_reader(conn.fileno())
+        conn.close()
+        process.join(0)
+
+    def _on_exit(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        loop.remove_reader(self._processes[index].sentinel)
+        asyncio.create_task(self._reap(index))
+
+    async def _reap(self, index: int) -> None:
+        process = self._processes[index]
+        # sentinel is ready right before the process is reaped
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, process.join)
+        if self._processes.get(index) is not process:
+            # already cleaned up by shutdown
+            return
+        exitcode = process.exitcode
+        self._cleanup_worker(index)
+        if self._stopped is None or self._stopped.done():
+            return
+
+        uptime = time.monotonic() - self._started_at[index]
+        delay = self._delays.get(index, self.config.restart_delay)
+        if uptime > _STABLE_UPTIME:
+            delay = self.config.restart_delay
+        self._delays[index] = min(delay * 2, self.config.max_restart_delay)
+        logger.error(
+            f"Worker {index} exited with code {exitcode}, "
+            f"restarting in {delay:.1f}s"
+        )
+        asyncio.get_running_loop().call_later(delay, self._restart, index)
+
+    def _restart(self, index: int) -> None:
+        if self._stopped and not self._stopped.done():
+            self._start_worker(index)
+
+    async def run(self) -> None:
+        """Start workers and forward events until :meth:`stop` is called.
+
+        All workers are stopped before returning.
+        """
+        self._stopped = asyncio.get_running_loop().create_future()
+        for index, shard in enumerate(self._shards):
+            if shard:
+                self._start_worker(index)
+        try:
+            await self._stopped
+        finally:
+            await self._shutdown()
+
+    def stop(self) -> None:
+        """Ask :meth:`run` to stop all workers and return."""
+        if self._stopped and not self._stopped.done():
+            self._stopped.set_result(None)
+
+    async def _shutdown(self) -> None:
+        # workers close their clients on SIGTERM
+        processes = list(self._processes.items())
+        for _, process in processes:
+            process.terminate()
+        deadline = time.monotonic() + self.config.stop_timeout
+        for index, process in processes:
+            while process.is_alive() and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+            if process.is_alive():
+                process.kill()
+            if index in self._processes:
+                self._cleanup_worker(index)
+
+
+async def _log_event(uin: int, event: Event) -> None:
+    logger.info(f"{uin}: {event!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m cai.runner",
+        description="Run accounts in multiple worker processes.",
+    )
+    parser.add_argument("config", help="path to the json config file")
+    parser.add_argument(
+        "-w", "--workers", type=int, help="override number of workers"
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.workers:
+        config.workers = args.workers
+
+    async def run():
+        supervisor = Supervisor(config)
+        supervisor.add_event_listener(_log_event)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, supervisor.stop)
+        await supervisor.run()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
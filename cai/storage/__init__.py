@@ -44,6 +44,12 @@ class Storage:
     protocol_env_name: str = f"{app_name}_PROTOCOL"
     protocol_file: str = os.path.join(app_dir, "protocol")
 
+    # cai.client.sso_server
+    sso_server_file: str = os.path.join(cache_dir, "sso_servers.json")
+
+    # cai.client.snapshot, formatted with uin
+    snapshot_file: str = os.path.join(cache_dir, "snapshot-{uin}.db")
+
     @classmethod
     def clear_cache(cls):
         # FIXME: delete used dir only
@@ -0,0 +1,141 @@
+"""Batch Tools
+
+This module is used to build batch tools.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Set,
+    List,
+    Generic,
+    TypeVar,
+    Callable,
+    Iterable,
+    Optional,
+    Awaitable,
+)
+
+from cai.log import logger
+
+T = TypeVar("T")
+
+
+@dataclass
+class BatchStats:
+    """Batcher counters snapshot.
+
+    Attributes:
+        pending (int): Number of items waiting for flush.
+        items (int): Number of flushed items.
+        batches (int): Number of flushed batches.
+        failed (int): Number of batches failed to flush.
+    """
+
+    pending: int
+    items: int
+    batches: int
+    failed: int
+
+
+class Batcher(Generic[T]):
+    """Collect items and flush them in batches.
+
+    Items are flushed when ``max_items`` are collected, or ``delay`` seconds
+    after the first item of a batch is added. Batches are passed to
+    ``flush`` in order, errors are logged and the batch is dropped.
+
+    Example:
+        >>> batcher = Batcher(send_items, max_items=100, delay=1.0)
+        >>> batcher.add(items)
+        >>> await batcher.flush()
+
+    Args:
+        flush (Callable[[List[T]], Awaitable[Any]]): Coroutine function
+            sending a batch.
+        max_items (int, optional): Max number of items in a batch.
+            Defaults to 100.
+        delay (float, optional): Max seconds an item waits for its batch.
+            Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[T]], Awaitable[Any]],
+        max_items: int = 100,
+        delay: float = 1.0,
+    ):
+        self._flush = flush
+        self.max_items = max_items
+        self.delay = delay
+        self._items: List[T] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._flushed_items: int = 0
+        self._batches: int = 0
+        self._failed: int = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def stats(self) -> BatchStats:
+        return BatchStats(
+            len(self._items), self._flushed_items, self._batches, self._failed
+        )
+
+    def add(self, items: Iterable[T]) -> None:
+        """Add items to the batch. Must be called in a running event loop.
+
+        Args:
+            items (Iterable[T]): Items to flush later.
+        """
+        self._items.extend(items)
+        if len(self._items) >= self.max_items:
+            self._schedule()
+        elif self._items and not self._timer:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.delay, self._schedule
+            )
+
+    def _schedule(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """Flush all collected items now."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if not self._lock:
+            self._lock = asyncio.Lock()
+
+        # keep batches in order
+        async with self._lock:
+            while self._items:
+                batch = self._items[: self.max_items]
+                del self._items[: self.max_items]
+                self._batches += 1
+                self._flushed_items += len(batch)
+                try:
+                    await self._flush(batch)
+                except Exception as e:
+                    self._failed += 1
+                    logger.exception(e)
+
+    def cancel(self) -> None:
+        """Drop collected items and cancel scheduled flushes."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._items.clear()
+        for task in self._tasks:
+            task.cancel()
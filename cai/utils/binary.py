@@ -9,8 +9,10 @@ This module is used to build Binary tools.
     https://github.com/cscs181/CAI/blob/master/LICENSE
 """
 import struct
+from functools import lru_cache
 from typing import (
     Any,
+    Dict,
     List,
     Type,
     Tuple,
@@ -287,3 +289,184 @@ class Packet(BasePacket):
                 self.unpack_from(query, self._offset),
             )
         )
+
+
+@lru_cache(maxsize=None)
+def _get_struct(format: str) -> struct.Struct:
+    return struct.Struct(format)
+
+
+_HEAD_FORMATS: Dict[int, str] = {1: ">B", 2: ">H", 4: ">I", 8: ">Q"}
+
+_FIXED = 0
+_BYTES = 1
+_STRING = 2
+_REMAIN = 3
+
+
+class PacketSchema:
+    """Compiled packet query.
+
+    Same query API as :class:`Packet`, but declared once (usually at module
+    level) and executed on any :obj:`bytes`-like data with :meth:`unpack`.
+    Consecutive fixed-size fields are merged into one interned
+    :class:`struct.Struct` and variable-length fields are resolved in a single
+    pass, so no format string is built or measured at runtime.
+
+    ``NewType`` filters are identity functions at runtime and are skipped.
+    :meth:`remain` returns a zero-copy :obj:`memoryview` of the input.
+
+    Example:
+        >>> schema = PacketSchema().int8().uint16().bytes(4)
+        >>> schema.unpack(bytes.fromhex("01000233000000"))
+        (1, 2, b'3\x00\x00\x00')
+    """
+
+    __slots__ = ("_fields", "_plan", "_struct")
+
+    def __init__(self):
+        self._fields: List[Tuple[Any, ...]] = []
+        self._plan: Optional[List[Tuple[Any, ...]]] = None
+        self._struct: Optional[struct.Struct] = None
+
+    def _add(self, *field: Any) -> "PacketSchema":
+        if self._fields and self._fields[-1][0] == _REMAIN:
+            raise ValueError("Cannot add fields after `remain()`.")
+        self._fields.append(field)
+        self._plan = None
+        self._struct = None
+        return self
+
+    def _add_with_length(
+        self, type: int, head_bytes: int, offset: int, encoding: str = ""
+    ) -> "PacketSchema":
+        if head_bytes not in _HEAD_FORMATS:
+            raise ValueError(
+                f"Invalid head bytes. Expected 1 / 2 / 4 / 8, got {head_bytes}."
+            )
+        return self._add(
+            type, _get_struct(_HEAD_FORMATS[head_bytes]), offset, encoding
+        )
+
+    def compile(self) -> "PacketSchema":
+        """Compile fields into an execution plan.
+
+        Called automatically on first :meth:`unpack`.
+
+        Returns:
+            :obj:`.PacketSchema`: Current schema
+        """
+        plan: List[Tuple[Any, ...]] = []
+        format = ""
+        for field in self._fields:
+            if field[0] == _FIXED:
+                format += field[1]
+                continue
+            if format:
+                plan.append((_FIXED, _get_struct(">" + format)))
+                format = ""
+            plan.append(field)
+        if format:
+            plan.append((_FIXED, _get_struct(">" + format)))
+
+        self._plan = plan
+        if len(plan) == 1 and plan[0][0] == _FIXED:
+            self._struct = plan[0][1]
+        return self
+
+    def unpack(
+        self, data: Union[bytes, bytearray, memoryview], offset: int = 0
+    ) -> Tuple[Any, ...]:
+        """Unpack data with the compiled plan.
+
+        Args:
+            data (Union[bytes, bytearray, memoryview]): Data to unpack.
+            offset (int, optional): Data offset. Defaults to 0.
+
+        Raises:
+            struct.error: Data is shorter than expected.
+
+        Returns:
+            Tuple[Any, ...]: Unpacked data.
+        """
+        if self._plan is None:
+            self.compile()
+        if self._struct is not None:
+            return self._struct.unpack_from(data, offset)
+
+        result: List[Any] = []
+        position = offset
+        for field in self._plan:  # type: ignore
+            type = field[0]
+            if type == _FIXED:
+                result.extend(field[1].unpack_from(data, position))
+                position += field[1].size
+            elif type == _REMAIN:
+                result.append(memoryview(data)[position:])
+                position = len(data)
+            else:
+                head: struct.Struct = field[1]
+                length = head.unpack_from(data, position)[0] - field[2]
+                position += head.size
+                end = position + length
+                if length < 0 or end > len(data):
+                    raise struct.error(
+                        f"unpack requires a buffer of {end} bytes"
+                    )
+                if type == _BYTES:
+                    result.append(bytes(data[position:end]))
+                else:
+                    result.append(str(data[position:end], field[3]))
+                position = end
+        return tuple(result)
+
+    def bool(self):
+        return self._add(_FIXED, "?")
+
+    def int8(self):
+        return self._add(_FIXED, "b")
+
+    def uint8(self):
+        return self._add(_FIXED, "B")
+
+    def int16(self):
+        return self._add(_FIXED, "h")
+
+    def uint16(self):
+        return self._add(_FIXED, "H")
+
+    def int32(self):
+        return self._add(_FIXED, "i")
+
+    def uint32(self):
+        return self._add(_FIXED, "I")
+
+    def int64(self):
+        return self._add(_FIXED, "q")
+
+    def uint64(self):
+        return self._add(_FIXED, "Q")
+
+    def float(self):
+        return self._add(_FIXED, "f")
+
+    def double(self):
+        return self._add(_FIXED, "d")
+
+    def byte(self):
+        return self._add(_FIXED, "c")
+
+    def bytes(self, length: int):
+        return self._add(_FIXED, f"{length}s")
+
+    def bytes_with_length(self, head_bytes: int, offset: int = 0):
+        return self._add_with_length(_BYTES, head_bytes, offset)
+
+    def string(self, head_bytes: int, offset: int = 0, encoding: str = "utf-8"):
+        return self._add_with_length(_STRING, head_bytes, offset, encoding)
+
+    def offset(self, offset: int):
+        return self._add(_FIXED, f"{offset}x")
+
+    def remain(self):
+        return self._add(_REMAIN)
@@ -107,3 +107,72 @@ class Packet(BasePacket, Generic[Unpack[Ts]]):
     ) -> Packet[Unpack[Ts], Packet[()]]: ...
     def _exec_cache(self: Packet[Unpack[Ts]]) -> Packet[Unpack[Ts]]: ...
     def execute(self: Packet[Unpack[Ts]]) -> Tuple[Unpack[Ts]]: ...
+
+class PacketSchema(Generic[Unpack[Ts]]):
+    _fields: List[Tuple[Any, ...]] = ...
+    _plan: Optional[List[Tuple[Any, ...]]] = ...
+    _struct: Optional[Any] = ...
+    def __new__(cls) -> PacketSchema[()]: ...
+    def __init__(self) -> None: ...
+    def bool(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], BOOL]: ...
+    def int8(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], INT8]: ...
+    def uint8(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], UINT8]: ...
+    def int16(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], INT16]: ...
+    def uint16(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], UINT16]: ...
+    def int32(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], INT32]: ...
+    def uint32(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], UINT32]: ...
+    def int64(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], INT64]: ...
+    def uint64(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], UINT64]: ...
+    def float(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], FLOAT]: ...
+    def double(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], DOUBLE]: ...
+    def byte(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], BYTE]: ...
+    def bytes(
+        self: PacketSchema[Unpack[Ts]], length: int
+    ) -> PacketSchema[Unpack[Ts], BYTES]: ...
+    def bytes_with_length(
+        self: PacketSchema[Unpack[Ts]], head_bytes: int, offset: int = ...
+    ) -> PacketSchema[Unpack[Ts], BYTES]: ...
+    def string(
+        self: PacketSchema[Unpack[Ts]],
+        head_bytes: int,
+        offset: int = ...,
+        encoding: str = ...,
+    ) -> PacketSchema[Unpack[Ts], STRING]: ...
+    def offset(
+        self: PacketSchema[Unpack[Ts]], offset: int
+    ) -> PacketSchema[Unpack[Ts]]: ...
+    def remain(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts], memoryview]: ...
+    def compile(
+        self: PacketSchema[Unpack[Ts]],
+    ) -> PacketSchema[Unpack[Ts]]: ...
+    def unpack(
+        self: PacketSchema[Unpack[Ts]],
+        data: Union[bytes, bytearray, memoryview],
+        offset: int = ...,
+    ) -> Tuple[Unpack[Ts]]: ...
@@ -8,15 +8,28 @@ This module is used to build coroutine related tools.
 .. _LICENSE:
     https://github.com/cscs181/CAI/blob/master/LICENSE
 """
+import time
+import asyncio
 from types import TracebackType
 from collections.abc import Coroutine
-from typing import AsyncContextManager
 from typing import Coroutine as CoroutineGeneric
-from typing import Type, Generic, TypeVar, Optional
+from typing import Generator, AsyncContextManager
+from typing import (
+    Any,
+    List,
+    Type,
+    Generic,
+    TypeVar,
+    Callable,
+    Iterable,
+    Optional,
+    Awaitable,
+)
 
 TY = TypeVar("TY")
 TS = TypeVar("TS")
 TR = TypeVar("TR", bound=AsyncContextManager)
+TI = TypeVar("TI")
 
 
 class ContextManager(Coroutine, Generic[TY, TS, TR]):
@@ -62,3 +75,120 @@ class ContextManager(Coroutine, Generic[TY, TS, TR]):
     ):
         await self._obj.__aexit__(exc_type, exc_value, traceback)  # type: ignore
         self._obj = None
+
+
+class CPUTimer(Generic[TY]):
+    """Awaitable wrapper measuring CPU time spent in an awaitable.
+
+    Each step between two suspensions is timed with
+    :func:`time.perf_counter`, so time waiting for IO or other tasks is
+    excluded. Steps never block the event loop, which makes this a cheap
+    approximation of CPU time. The total is passed to ``callback`` when the
+    awaitable finishes, even with an exception.
+
+    Example:
+        >>> await CPUTimer(handler(client, packet), print)
+    """
+
+    __slots__ = ("_awaitable", "_callback")
+
+    def __init__(
+        self, awaitable: Awaitable[TY], callback: Callable[[float], Any]
+    ):
+        self._awaitable = awaitable
+        self._callback = callback
+
+    def __await__(self) -> Generator[Any, Any, TY]:
+        iterator = self._awaitable.__await__()
+        clock = time.perf_counter
+        spent = 0.0
+        value: Any = None
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                start = clock()
+                try:
+                    if error is None:
+                        yielded = iterator.send(value)
+                    else:
+                        yielded = iterator.throw(error)
+                except StopIteration as e:
+                    return e.value
+                finally:
+                    spent += clock() - start
+                try:
+                    value, error = (yield yielded), None
+                except BaseException as e:
+                    value, error = None, e
+        finally:
+            self._callback(spent)
+
+
+class RateLimiter:
+    """Token bucket limiting how often an action happens.
+
+    Waiters reserve tokens in call order, so they are released evenly at
+    ``rate`` per second after the initial ``burst``.
+
+    Args:
+        rate (float): Actions per second.
+        burst (int, optional): Actions allowed at once. Defaults to 1.
+    """
+
+    __slots__ = ("rate", "burst", "_tokens", "_updated")
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens: float = burst
+        self._updated: float = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Wait until the action is allowed."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+async def bounded_map(
+    func: Callable[[TI], Awaitable[TY]], items: Iterable[TI], limit: int
+) -> List[TY]:
+    """Await ``func`` on each item with bounded concurrency.
+
+    At most ``limit`` awaitables run at the same time. Coroutines are created
+    only when they are about to run. If one of them raises, the others are
+    cancelled and the exception is propagated.
+
+    Args:
+        func (Callable[[TI], Awaitable[TY]]): Coroutine function.
+        items (Iterable[TI]): Arguments passed to ``func``.
+        limit (int): Max number of running awaitables.
+
+    Returns:
+        List[TY]: Results in the order of ``items``.
+    """
+    pending = list(enumerate(items))
+    results: List[Any] = [None] * len(pending)
+    iterator = iter(pending)
+
+    async def worker():
+        for index, item in iterator:
+            results[index] = await func(item)
+
+    workers = [
+        asyncio.create_task(worker()) for _ in range(min(limit, len(pending)))
+    ]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        if workers:
+            await asyncio.wait(workers)
+        raise
+    return results
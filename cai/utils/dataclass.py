@@ -10,6 +10,7 @@ This module is used to build dataclass related tools.
 """
 import copy
 import json
+from functools import lru_cache
 from typing_extensions import get_args, get_origin
 from dataclasses import MISSING, fields, is_dataclass
 from typing import (
@@ -22,12 +23,19 @@ from typing import (
     Union,
     Mapping,
     TypeVar,
+    Callable,
+    Optional,
     Collection,
 )
 
 T = TypeVar("T", bound="JsonableDataclass")
 JSON = Union[Dict[str, "JSON"], List["JSON"], str, int, float, bool, None]
 
+# deepcopy of these types returns the object itself
+_ATOMIC_TYPES = frozenset(
+    {type(None), bool, int, float, complex, str, bytes, type, range}
+)
+
 
 def _asdict(obj: Any) -> Any:
     if is_dataclass(obj):
@@ -48,6 +56,9 @@ def _asdict(obj: Any) -> Any:
         return copy.deepcopy(obj)
 
 
+_NONE = type(None)
+
+
 def _convert_type(type_, value):
     if (
         type_ is None
@@ -82,54 +93,150 @@ def _fromdict(cls, kvs):
             else:
                 value = _fromdict(field_type, field_value)
             init_kwargs[field.name] = value
+        elif field_origin is Union:
+            value = field_value
+            # None is kept for Optional instead of converted by other types
+            types = () if value is None and _NONE in field_args else field_args
+            for type_ in types:
+                try:
+                    value = _convert_type(type_, field_value)
+                    break
+                except Exception:
+                    continue
+            init_kwargs[field.name] = value
         elif field_origin and issubclass(field_origin, Mapping):
             k_type, v_type = field_args or (Any, Any)
             init_kwargs[field.name] = field_origin(
-                zip(
-                    [
-                        (
-                            _convert_type(k_type, key),
-                            _convert_type(v_type, value),
-                        )
-                        for key, value in field_value.items()
-                    ]
+                (
+                    _convert_type(k_type, key),
+                    _convert_type(v_type, value),
                 )
+                for key, value in field_value.items()
             )  # type: ignore
         elif field_origin and issubclass(field_origin, Collection):
             type_ = field_args[0] or Any
             init_kwargs[field.name] = field_origin(
                 _convert_type(type_, value) for value in field_value
             )  # type: ignore
-        elif field_origin is Union:
-            value = field_value
-            for type_ in field_args:
-                try:
-                    value = _convert_type(type_, field_value)
-                    break
-                except Exception:
-                    continue
-            init_kwargs[field.name] = value
         else:
             init_kwargs[field.name] = field_value
 
     return cls(**init_kwargs)
 
 
+def _field_converter(type_: Any) -> Optional[Callable[[Any], Any]]:
+    # same conversion as _fromdict, decided once per field
+    origin = get_origin(type_)
+    args = get_args(type_)
+    if is_dataclass(type_):
+        if issubclass(type_, JsonableDataclass):
+            build = type_.from_dict
+        else:
+            build = lambda value: _fromdict(type_, value)
+        return lambda value: value if is_dataclass(value) else build(value)
+    elif origin is Union:
+
+        optional = _NONE in args
+
+        def convert_union(value):
+            # None is kept for Optional instead of converted by other types
+            if value is None and optional:
+                return None
+            for arg in args:
+                try:
+                    return _convert_type(arg, value)
+                except Exception:
+                    continue
+            return value
+
+        return convert_union
+    elif origin and issubclass(origin, Mapping):
+        k_type, v_type = args or (Any, Any)
+        return lambda value: origin(
+            (_convert_type(k_type, k), _convert_type(v_type, v))
+            for k, v in value.items()
+        )
+    elif origin and issubclass(origin, Collection):
+        item_type = args[0] if args else Any
+        return lambda value: origin(_convert_type(item_type, v) for v in value)
+    return None
+
+
+def _asdict_value(value: Any) -> Any:
+    if isinstance(value, JsonableDataclass):
+        return value.to_dict()
+    return _asdict(value)
+
+
+@lru_cache(maxsize=None)
+def _compile(
+    cls: type,
+) -> Tuple[
+    Callable[[Dict[str, Any]], Any],
+    Callable[[Any], Dict[str, JSON]],
+    Callable[[Any], Dict[str, JSON]],
+]:
+    """Generate ``from_dict``, ``to_dict`` and json ``to_dict`` of a class.
+
+    Field types are inspected once here instead of for every instance, like
+    :mod:`dataclasses` generates ``__init__``.
+    """
+    namespace: Dict[str, Any] = {
+        "cls": cls,
+        "atomic": _ATOMIC_TYPES,
+        "asdict": _asdict_value,
+    }
+
+    from_lines = ["def from_dict(kvs):", "  init = {}"]
+    for index, f in enumerate(fields(cls)):
+        if not f.init:
+            continue
+        convert = _field_converter(f.type)
+        value = "kvs[%r]" % f.name
+        if convert:
+            namespace[f"convert_{index}"] = convert
+            value = f"convert_{index}({value})"
+        from_lines.append(f"  if {f.name!r} in kvs: init[{f.name!r}] = {value}")
+    from_lines.append("  return cls(**init)")
+
+    def to_lines(name: str, only_json: bool) -> List[str]:
+        lines = [f"def {name}(obj):", "  kvs = {}"]
+        for f in fields(cls):
+            if only_json and f.name not in cls.__json_fields__:
+                continue
+            lines.append(f"  value = obj.{f.name}")
+            lines.append(
+                f"  kvs[{f.name!r}] = value if type(value) in atomic "
+                "else asdict(value)"
+            )
+        lines.append("  return kvs")
+        return lines
+
+    source = "\n".join(
+        from_lines + to_lines("to_dict", False) + to_lines("to_json_dict", True)
+    )
+    exec(source, namespace)
+    return (
+        namespace["from_dict"],
+        namespace["to_dict"],
+        namespace["to_json_dict"],
+    )
+
+
 class JsonableDataclass:
+    __slots__ = ()
     __json_fields__: Tuple[str, ...] = ()
 
     def __init__(self, **kwargs) -> None:
         pass
 
     def to_dict(self, only_json: bool = False) -> Dict[str, JSON]:
-        kvs: Dict[str, JSON] = _asdict(self)
-        if only_json:
-            return {k: v for k, v in kvs.items() if k in self.__json_fields__}
-        return kvs
+        _, to_dict, to_json_dict = _compile(type(self))
+        return to_json_dict(self) if only_json else to_dict(self)
 
     @classmethod
     def from_dict(cls: Type[T], kvs: Dict[str, Any]) -> T:
-        return _fromdict(cls, kvs)
+        return _compile(cls)[0](kvs)
 
     def to_json(
         self,
@@ -144,7 +251,7 @@ class JsonableDataclass:
         separators=None,
         default=None,
         sort_keys=False,
-        **kw
+        **kw,
     ) -> str:
         return json.dumps(
             self.to_dict(only_json),
@@ -157,7 +264,7 @@ class JsonableDataclass:
             separators=separators,
             default=default,
             sort_keys=sort_keys,
-            **kw
+            **kw,
         )
 
     @classmethod
@@ -171,7 +278,7 @@ class JsonableDataclass:
         parse_int=None,
         parse_constant=None,
         object_pairs_hook=None,
-        **kw
+        **kw,
     ) -> T:
         return __dataclass__.from_dict(
             json.loads(
@@ -182,7 +289,7 @@ class JsonableDataclass:
                 parse_int=parse_int,
                 parse_constant=parse_constant,
                 object_pairs_hook=object_pairs_hook,
-                **kw
+                **kw,
             )
         )  # type: ignore
 
@@ -200,7 +307,7 @@ class JsonableDataclass:
         separators=None,
         default=None,
         sort_keys=False,
-        **kw
+        **kw,
     ) -> None:
         return json.dump(
             self.to_dict(only_json),
@@ -214,7 +321,7 @@ class JsonableDataclass:
             separators=separators,
             default=default,
             sort_keys=sort_keys,
-            **kw
+            **kw,
         )
 
     @classmethod
@@ -228,7 +335,7 @@ class JsonableDataclass:
         parse_int=None,
         parse_constant=None,
         object_pairs_hook=None,
-        **kw
+        **kw,
     ) -> T:
         return __dataclass__.from_dict(
             json.load(
@@ -239,6 +346,6 @@ class JsonableDataclass:
                 parse_int=parse_int,
                 parse_constant=parse_constant,
                 object_pairs_hook=object_pairs_hook,
-                **kw
+                **kw,
             )
         )  # type: ignore
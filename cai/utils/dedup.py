@@ -0,0 +1,151 @@
+"""Deduplication Tools
+
+This module is used to build deduplication tools.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Deque, Hashable, Optional
+
+
+@dataclass
+class DedupStats:
+    """Dedup index counters snapshot.
+
+    Attributes:
+        size (int): Number of remembered keys.
+        capacity (int): Max number of remembered keys.
+        hits (int): Number of duplicated keys found.
+        misses (int): Number of new keys.
+        expired (int): Number of keys forgotten after ``ttl``.
+        evicted (int): Number of keys forgotten to keep under ``capacity``.
+    """
+
+    size: int
+    capacity: int
+    hits: int
+    misses: int
+    expired: int
+    evicted: int
+
+
+class DedupIndex:
+    """Remember keys seen recently.
+
+    Keys expire on a time wheel of ``slots`` buckets, each holding keys
+    added in ``ttl / slots`` seconds, so expiring costs nothing until a
+    whole bucket is dropped. Keys live between ``ttl`` and
+    ``ttl * (1 + 1 / slots)`` seconds. When ``capacity`` is reached, the
+    oldest keys are forgotten first.
+
+    Example:
+        >>> index = DedupIndex(ttl=60)
+        >>> index.seen(1)
+        False
+        >>> index.seen(1)
+        True
+
+    Args:
+        ttl (float, optional): Seconds to remember a key. Defaults to 3600.
+        capacity (int, optional): Max number of keys. Defaults to 65536.
+        slots (int, optional): Number of time wheel buckets. Defaults to 60.
+    """
+
+    def __init__(
+        self, ttl: float = 3600.0, capacity: int = 65536, slots: int = 60
+    ):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._width: float = ttl / slots
+        # oldest first, a bucket is a dict for ordered eviction
+        self._buckets: Deque[Dict[Hashable, None]] = deque(
+            {} for _ in range(slots)
+        )
+        self._keys: Dict[Hashable, Dict[Hashable, None]] = {}
+        self._tick: int = self._now_tick()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._expired: int = 0
+        self._evicted: int = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._advance()
+        return key in self._keys
+
+    @property
+    def stats(self) -> DedupStats:
+        return DedupStats(
+            len(self._keys),
+            self.capacity,
+            self._hits,
+            self._misses,
+            self._expired,
+            self._evicted,
+        )
+
+    def _now_tick(self, now: Optional[float] = None) -> int:
+        return int((time.monotonic() if now is None else now) / self._width)
+
+    def _advance(self, now: Optional[float] = None) -> None:
+        tick = self._now_tick(now)
+        steps = min(tick - self._tick, len(self._buckets))
+        if steps <= 0:
+            return
+        self._tick = tick
+        for _ in range(steps):
+            bucket = self._buckets.popleft()
+            for key in bucket:
+                del self._keys[key]
+            self._expired += len(bucket)
+            bucket.clear()
+            self._buckets.append(bucket)
+
+    def seen(self, key: Hashable) -> bool:
+        """Check a key and remember it.
+
+        Args:
+            key (Hashable): Key to check.
+
+        Returns:
+            bool: ``True`` if the key was seen in ``ttl`` seconds.
+        """
+        self._advance()
+        if key in self._keys:
+            self._hits += 1
+            return True
+
+        self._misses += 1
+        bucket = self._buckets[-1]
+        bucket[key] = None
+        self._keys[key] = bucket
+        if len(self._keys) > self.capacity:
+            self._evict()
+        return False
+
+    def _evict(self) -> None:
+        for bucket in self._buckets:
+            if bucket:
+                key = next(iter(bucket))
+                del bucket[key]
+                del self._keys[key]
+                self._evicted += 1
+                return
+
+    def discard(self, key: Hashable) -> None:
+        bucket = self._keys.pop(key, None)
+        if bucket is not None:
+            del bucket[key]
+
+    def clear(self) -> None:
+        for bucket in self._buckets:
+            bucket.clear()
+        self._keys.clear()
@@ -0,0 +1,203 @@
+"""Job Dispatcher
+
+This module is used to run jobs with bounded concurrency and queue size.
+
+:Copyright: Copyright (C) 2021-2021  cscs181
+:License: AGPL-3.0 or later. See `LICENSE`_ for detail.
+
+.. _LICENSE:
+    https://github.com/cscs181/CAI/blob/master/LICENSE
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, List, Deque, Tuple, Callable, Optional, Awaitable
+
+from cai.log import logger
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+Job = Tuple[Callable[..., Awaitable[Any]], Tuple[Any, ...]]
+
+
+@dataclass
+class DispatchStats:
+    """Dispatcher counters snapshot.
+
+    Attributes:
+        queue_size (int): Total number of queued jobs.
+        queue_sizes (Tuple[int, ...]): Queued jobs of each priority.
+        max_queue_size (int): Max queue size ever reached.
+        workers (int): Number of worker coroutines.
+        running (int): Number of jobs being run.
+        submitted (int): Number of accepted jobs.
+        processed (int): Number of finished jobs.
+        failed (int): Number of jobs raised an exception.
+        dropped (int): Number of jobs rejected or evicted.
+    """
+
+    queue_size: int
+    queue_sizes: Tuple[int, ...]
+    max_queue_size: int
+    workers: int
+    running: int
+    submitted: int
+    processed: int
+    failed: int
+    dropped: int
+
+
+class Dispatcher:
+    """Priority job dispatcher with a fixed pool of worker coroutines.
+
+    Jobs are kept in one FIFO queue per priority level (``0`` is the
+    highest) and run by ``workers`` coroutines, so the number of running
+    jobs never exceeds the pool size. When the queue is full, the oldest job
+    of a lower priority is evicted to make room for the new one. If there is
+    no such job, the new job is dropped.
+
+    Workers are started lazily on first :meth:`submit` and stopped by
+    :meth:`close`. A closed dispatcher can be used again.
+
+    Args:
+        workers (int, optional): Number of worker coroutines. Defaults to 8.
+        maxsize (int, optional): Max number of queued jobs. Defaults to 4096.
+        levels (int, optional): Number of priority levels. Defaults to 3.
+    """
+
+    def __init__(self, workers: int = 8, maxsize: int = 4096, levels: int = 3):
+        if workers < 1:
+            raise ValueError("Dispatcher needs at least one worker")
+        self._worker_num: int = workers
+        self._maxsize: int = maxsize
+        self._queues: List[Deque[Job]] = [deque() for _ in range(levels)]
+        self._size: int = 0
+        self._workers: List["asyncio.Task[None]"] = []
+        self._event: Optional[asyncio.Event] = None
+
+        self._max_size: int = 0
+        self._running: int = 0
+        self._submitted: int = 0
+        self._processed: int = 0
+        self._failed: int = 0
+        self._dropped: int = 0
+
+    @property
+    def qsize(self) -> int:
+        return self._size
+
+    @property
+    def stats(self) -> DispatchStats:
+        return DispatchStats(
+            queue_size=self._size,
+            queue_sizes=tuple(map(len, self._queues)),
+            max_queue_size=self._max_size,
+            workers=len(self._workers),
+            running=self._running,
+            submitted=self._submitted,
+            processed=self._processed,
+            failed=self._failed,
+            dropped=self._dropped,
+        )
+
+    def _start(self) -> None:
+        event = asyncio.Event()
+        self._event = event
+        self._workers = [
+            asyncio.create_task(self._worker(event))
+            for _ in range(self._worker_num)
+        ]
+
+    def submit(
+        self,
+        priority: int,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+    ) -> bool:
+        """Queue a job. Must be called in a running event loop.
+
+        The coroutine is not created until the job runs, so dropped jobs
+        leave no pending coroutine behind.
+
+        Args:
+            priority (int): Priority level, ``0`` is the highest.
+            func (Callable[..., Awaitable[Any]]): Coroutine function.
+            *args (Any): Arguments passed to ``func``.
+
+        Returns:
+            bool: ``False`` if the job is dropped because the queue is full.
+        """
+        if not self._workers:
+            self._start()
+
+        priority = min(max(priority, 0), len(self._queues) - 1)
+        if self._size >= self._maxsize and not self._evict(priority):
+            self._dropped += 1
+            return False
+
+        self._queues[priority].append((func, args))
+        self._size += 1
+        self._submitted += 1
+        if self._size > self._max_size:
+            self._max_size = self._size
+        self._event.set()  # type: ignore
+        return True
+
+    def _evict(self, priority: int) -> bool:
+        for queue in reversed(self._queues[priority + 1 :]):
+            if queue:
+                queue.popleft()
+                self._size -= 1
+                self._dropped += 1
+                return True
+        return False
+
+    def _pop(self) -> Optional[Job]:
+        for queue in self._queues:
+            if queue:
+                self._size -= 1
+                return queue.popleft()
+        return None
+
+    async def _worker(self, event: asyncio.Event) -> None:
+        # exit when the dispatcher is closed or restarted
+        while self._event is event:
+            job = self._pop()
+            if job is None:
+                event.clear()
+                await event.wait()
+                continue
+
+            func, args = job
+            self._running += 1
+            try:
+                await func(*args)
+            except Exception as e:
+                self._failed += 1
+                logger.exception(e)
+            finally:
+                self._running -= 1
+                self._processed += 1
+
+    async def close(self) -> None:
+        """Stop all workers and drop queued jobs.
+
+        Safe to call from a running job, whose worker exits after the job
+        finishes instead of being cancelled.
+        """
+        event, self._event = self._event, None
+        if event:
+            event.set()
+        current = asyncio.current_task()
+        workers = [worker for worker in self._workers if worker is not current]
+        self._workers = []
+        for worker in workers:
+            worker.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        for queue in self._queues:
+            self._dropped += len(queue)
+            queue.clear()
+        self._size = 0
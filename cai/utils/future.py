@@ -1,5 +1,7 @@
 import asyncio
-from typing import Any, Dict, Generic, TypeVar, Callable, Optional
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Generic, TypeVar, Callable, Optional
 
 KT = TypeVar("KT")
 VT = TypeVar("VT")
@@ -13,6 +15,9 @@ class FutureStore(Generic[KT, VT]):
     def __contains__(self, seq: KT) -> bool:
         return seq in self._futures
 
+    def __len__(self) -> int:
+        return len(self._futures)
+
     def store_seq(self, seq: KT) -> "asyncio.Future[VT]":
         if seq in self._futures:
             raise KeyError(f"Sequence {seq} already exists!")
@@ -67,3 +72,291 @@ class FutureStore(Generic[KT, VT]):
             return await asyncio.wait_for(future, timeout)
         finally:
             del self._futures[seq]
+
+
+class Timer:
+    """Timer scheduled on a :class:`TimerWheel`."""
+
+    __slots__ = ("deadline", "callback", "bucket", "wheel")
+
+    def __init__(
+        self,
+        deadline: int,
+        callback: Callable[[], Any],
+        bucket: Dict["Timer", None],
+        wheel: "TimerWheel",
+    ):
+        self.deadline = deadline
+        self.callback = callback
+        self.bucket = bucket
+        self.wheel = wheel
+
+    def cancel(self) -> None:
+        if self in self.bucket:
+            del self.bucket[self]
+            self.wheel._count -= 1
+
+
+class TimerWheel:
+    """Hashed timer wheel sharing one loop timer for many timeouts.
+
+    Timeouts are rounded up to ``resolution`` seconds and hashed into
+    ``slots`` buckets by their deadline tick. A single loop callback runs
+    each tick while any timer is pending, instead of one timer handle per
+    timeout.
+
+    Use :func:`get_timer_wheel` to get the wheel of the running loop.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): Event loop running the wheel.
+        resolution (float, optional): Seconds of a tick. Defaults to 0.1.
+        slots (int, optional): Number of buckets. Defaults to 512.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        resolution: float = 0.1,
+        slots: int = 512,
+    ):
+        self._loop = loop
+        self.resolution = resolution
+        self._buckets: List[Dict[Timer, None]] = [{} for _ in range(slots)]
+        self._tick: int = self._now_tick()
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._count: int = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _now_tick(self) -> int:
+        return int(self._loop.time() / self.resolution)
+
+    def call_later(self, delay: float, callback: Callable[[], Any]) -> Timer:
+        """Call ``callback`` after ``delay`` seconds.
+
+        Args:
+            delay (float): Seconds to wait, rounded up to a tick.
+            callback (Callable[[], Any]): Callback without arguments.
+
+        Returns:
+            Timer: Timer object with a ``cancel`` method.
+        """
+        if not self._handle:
+            # wheel was idle, skip ticks passed since then
+            self._tick = self._now_tick()
+        deadline = max(
+            self._tick + 1,
+            -int(-(self._loop.time() + delay) // self.resolution),
+        )
+        bucket = self._buckets[deadline % len(self._buckets)]
+        timer = Timer(deadline, callback, bucket, self)
+        bucket[timer] = None
+        self._count += 1
+        self._schedule()
+        return timer
+
+    def _schedule(self) -> None:
+        # keep exactly one pending tick
+        if self._handle:
+            return
+        self._handle = self._loop.call_at(
+            (self._tick + 1) * self.resolution, self._run
+        )
+
+    def _run(self) -> None:
+        now = self._now_tick()
+        slots = len(self._buckets)
+        # scan each bucket at most once if the loop was blocked for long
+        for tick in range(max(self._tick + 1, now - slots + 1), now + 1):
+            bucket = self._buckets[tick % slots]
+            expired = [timer for timer in bucket if timer.deadline <= now]
+            for timer in expired:
+                del bucket[timer]
+                self._count -= 1
+                try:
+                    timer.callback()
+                except Exception:
+                    self._loop.call_exception_handler(
+                        {"message": "Timer callback failed", "timer": timer}
+                    )
+        self._tick = max(self._tick, now)
+        # callbacks may add timers, the tick is rescheduled only once
+        self._handle = None
+        if self._count:
+            self._schedule()
+
+
+_wheels: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_timer_wheel() -> TimerWheel:
+    """Get the timer wheel of the running event loop.
+
+    Returns:
+        TimerWheel: Timer wheel shared by the loop.
+    """
+    loop = asyncio.get_running_loop()
+    wheel = _wheels.get(loop)
+    if wheel is None:
+        wheel = _wheels[loop] = TimerWheel(loop)
+    return wheel
+
+
+@dataclass
+class InFlightStats:
+    """In-flight request table counters snapshot.
+
+    Attributes:
+        pending (int): Number of requests waiting for response.
+        max_pending (int): Max number of pending requests ever reached.
+        completed (int): Number of requests got response.
+        timeouts (int): Number of requests timed out.
+        cancelled (int): Number of requests cancelled.
+    """
+
+    pending: int
+    max_pending: int
+    completed: int
+    timeouts: int
+    cancelled: int
+
+
+class InFlightTable(Generic[VT]):
+    """Futures of requests waiting for response, keyed by sequence.
+
+    Timeouts run on the :class:`TimerWheel` of the loop instead of
+    :func:`asyncio.wait_for`, and :meth:`next_seq` skips sequences still
+    waiting for response.
+    """
+
+    def __init__(self):
+        # Generic Future is supported since py3.9
+        self._futures: Dict[int, "asyncio.Future[VT]"] = {}
+        self._max_pending: int = 0
+        self._completed: int = 0
+        self._timeouts: int = 0
+        self._cancelled: int = 0
+
+    def __contains__(self, seq: int) -> bool:
+        return seq in self._futures
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    @property
+    def stats(self) -> InFlightStats:
+        return InFlightStats(
+            len(self._futures),
+            self._max_pending,
+            self._completed,
+            self._timeouts,
+            self._cancelled,
+        )
+
+    def next_seq(self, seq: int, modulo: int) -> int:
+        """Get the sequence after ``seq`` not waiting for response.
+
+        Args:
+            seq (int): Last sequence.
+            modulo (int): Sequences wrap around at this value.
+
+        Raises:
+            RuntimeError: All sequences are waiting for response.
+
+        Returns:
+            int: Next free sequence.
+        """
+        for _ in range(modulo):
+            seq = (seq + 1) % modulo
+            if seq not in self._futures:
+                return seq
+        raise RuntimeError("No free sequence!")
+
+    def store_seq(self, seq: int) -> "asyncio.Future[VT]":
+        """Register a request before sending it.
+
+        Raises:
+            KeyError: Sequence is waiting for response.
+        """
+        if seq in self._futures:
+            raise KeyError(f"Sequence {seq} already exists!")
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[seq] = future
+        if len(self._futures) > self._max_pending:
+            self._max_pending = len(self._futures)
+        return future
+
+    def store_result(self, seq: int, result: VT) -> bool:
+        future = self._futures.get(seq)
+        if future and not future.done():
+            future.set_result(result)
+            return True
+        return False
+
+    def discard(self, seq: int) -> None:
+        future = self._futures.pop(seq, None)
+        if future:
+            future.cancel()
+
+    def cancel_all(self, exc: Optional[BaseException] = None) -> int:
+        """Stop waiting for all pending requests.
+
+        Args:
+            exc (Optional[BaseException], optional): Exception raised in
+                waiters. Waiters are cancelled if ``None``.
+
+        Returns:
+            int: Number of stopped requests.
+        """
+        count = 0
+        for future in self._futures.values():
+            if future.done():
+                continue
+            if exc is None:
+                future.cancel()
+            else:
+                future.set_exception(exc)
+            count += 1
+        return count
+
+    def _timeout(self, future: "asyncio.Future[VT]") -> None:
+        if not future.done():
+            self._timeouts += 1
+            future.set_exception(asyncio.TimeoutError())
+
+    async def fetch(self, seq: int, timeout: Optional[float] = None) -> VT:
+        """Wait for the response of a request.
+
+        Args:
+            seq (int): Sequence of the request.
+            timeout (Optional[float], optional): Seconds to wait.
+                Defaults to None.
+
+        Raises:
+            asyncio.TimeoutError: No response in time.
+
+        Returns:
+            VT: Response.
+        """
+        future = self._futures.get(seq) or self.store_seq(seq)
+        timer = (
+            get_timer_wheel().call_later(timeout, lambda: self._timeout(future))
+            if timeout is not None
+            else None
+        )
+        try:
+            result = await future
+            self._completed += 1
+            return result
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            raise
+        finally:
+            if timer:
+                timer.cancel()
+            if self._futures.get(seq) is future:
+                del self._futures[seq]
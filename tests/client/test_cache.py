@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import unittest
+from typing import List, Union, Optional
+
+from cai.log import logger
+from cai.utils.binary import Packet
+from cai.utils.coroutine import RateLimiter
+from cai.client.cache import GroupMemberCache
+from cai.client.friendlist import TroopListSuccess
+from cai.client.friendlist.jce import StTroopNum, TroopListRespV2
+from cai.client import (
+    Group,
+    Client,
+    Friend,
+    Command,
+    FriendGroup,
+    GroupMember,
+    MemberPrefetch,
+)
+
+
+def make_group(client: Client, code: int) -> Group:
+    return Group(code, code, f"group {code}", "", 0, 0, 1, 0, 0, 200, client)
+
+
+def make_friend(client: Client, uin: int) -> Friend:
+    args = (0, 0, "", False, False, "", False, "", 0, 0, "", 0, 0)
+    return Friend(uin, *args, client)  # type: ignore
+
+
+def make_member(group: Group, uin: int) -> GroupMember:
+    args = (0, 0, "", "", "", "", "", "", 1, 0, 0, 0, False, False, "", 0, 0)
+    return GroupMember(uin, *args, group._client, group)  # type: ignore
+
+
+def troop_list_page(
+    codes: List[int], cookies: Optional[bytes] = None
+) -> TroopListSuccess:
+    return TroopListSuccess(
+        10000,
+        0,
+        0,
+        "friendlist.GetTroopListReqV2",
+        TroopListRespV2(
+            uin=10000,
+            troop_count=len(codes),
+            result=0,
+            cookies=cookies,
+            troop_list=[
+                StTroopNum(group_uin=code, group_code=code) for code in codes
+            ],
+        ),
+    )
+
+
+class TroopListClient(Client):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, snapshot=False, **kwargs)
+        self.pages = [troop_list_page([1, 2], b"page"), troop_list_page([3, 4])]
+
+    async def send_and_wait(
+        self,
+        seq: int,
+        command_name: str,
+        packet: Union[bytes, Packet],
+        timeout: Optional[float] = 10.0,
+    ) -> Command:
+        return self.pages.pop(0)
+
+
+class TestClientCache(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestClientCache | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing ClientCache...")
+        self.client = Client(10000, bytes(16))
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing ClientCache!")
+
+    async def test_friend_index(self):
+        self.log(logging.INFO, "test friend and friend group index")
+        friends = [make_friend(self.client, uin) for uin in range(1, 3001)]
+        groups = [FriendGroup(0, "default", 3000, 0, self.client)]
+        self.client._set_friend_list(friends, groups)
+
+        self.assertIs(await self.client.get_friend(2999), friends[2998])
+        self.assertIsNone(await self.client.get_friend(3001))
+        self.assertIs(await self.client.get_friend_group(0), groups[0])
+        self.assertIs(await friends[0].get_group(), groups[0])
+        self.assertIs(await self.client.get_friend_list(), friends)
+
+    async def test_group_index(self):
+        self.log(logging.INFO, "test group and group member index")
+
+        groups = [make_group(self.client, code) for code in range(1, 501)]
+        self.client._set_group_list(groups)
+        group = await self.client.get_group(groups[100].group_id)
+        self.assertIs(group, groups[100])
+        self.assertIsNone(await self.client.get_group(1))
+
+        members = [make_member(group, uin) for uin in range(1, 2001)]
+        group._set_members(members)
+        self.assertIs(
+            await self.client.get_group_member(group.group_id, 1500),
+            members[1499],
+        )
+        self.assertIs(await group.get_member(2000), members[1999])
+        self.assertIsNone(await group.get_member(2001))
+        self.assertIs(await group.get_members(), members)
+
+    async def test_group_list_refresh(self):
+        self.log(logging.INFO, "test members kept on group list refresh")
+        groups = [make_group(self.client, code) for code in range(1, 3)]
+        self.client._set_group_list(groups)
+        members = [make_member(groups[0], uin) for uin in range(1, 11)]
+        groups[0]._set_members(members)
+        await self.client.get_group_member_list(groups[0])
+
+        new_groups = [make_group(self.client, 1)]
+        self.client._set_group_list(new_groups)
+        self.assertIs(
+            await self.client.get_group_member_list(new_groups[0]), members
+        )
+        self.assertIs(members[0].group, new_groups[0])
+        self.assertEqual(self.client.stats.cached_group_members, 10)
+
+    async def test_group_list_pages(self):
+        self.log(logging.INFO, "test members kept on paged group list")
+        client = TroopListClient(10000, bytes(16))
+        client._siginfo.d2key = bytes(16)
+        groups = [make_group(client, code) for code in range(1, 5)]
+        client._set_group_list(groups)
+        for group in groups:
+            group._set_members([make_member(group, 1)])
+            await client.get_group_member_list(group)
+
+        await client._refresh_group_list()
+        self.assertEqual(
+            [g.group_code for g in client._group_list], [1, 2, 3, 4]
+        )
+        for group in client._group_list:
+            self.assertEqual(len(await group.get_members()), 1)
+        self.assertEqual(client.stats.cached_group_members, 4)
+
+
+class TestGroupMemberCache(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestGroupMemberCache | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing GroupMemberCache...")
+        self.client = Client(10000, bytes(16))
+        self.refreshed: List[int] = []
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing GroupMemberCache!")
+
+    async def refresh(self, group: Group):
+        self.refreshed.append(group.group_id)
+        await asyncio.sleep(0.01)
+        group._set_members(
+            [
+                make_member(group, uin)
+                for uin in range(1, group.max_group_member_num + 1)
+            ]
+        )
+
+    async def test_stale_while_revalidate(self):
+        self.log(logging.INFO, "test expired list served while refreshing")
+        cache = GroupMemberCache(self.refresh, ttl=60)
+        group = make_group(self.client, 1)
+
+        members, again = await asyncio.gather(
+            cache.get(group), cache.get(group)
+        )
+        self.assertIs(members, again)
+        self.assertEqual(len(members), 200)
+        self.assertEqual(self.refreshed, [group.group_id])
+        self.assertIs(await cache.get(group), members)
+        self.assertEqual((cache.misses, cache.hits), (2, 1))
+
+        cache.invalidate(group.group_id)
+        self.assertIs(await cache.get(group), members)
+        self.assertEqual(cache.stale_hits, 1)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(self.refreshed), 2)
+        self.assertIsNot(group._cached_member_list, members)
+
+    async def test_evict_least_recently_used(self):
+        self.log(logging.INFO, "test member count limit")
+        cache = GroupMemberCache(self.refresh, max_members=500)
+        groups = [make_group(self.client, code) for code in range(1, 4)]
+
+        await cache.get(groups[0])
+        await cache.get(groups[1])
+        await cache.get(groups[0])
+        await cache.get(groups[2])
+        self.assertEqual(cache.total_members, 400)
+        self.assertEqual(cache.evictions, 1)
+        self.assertNotIn(groups[1].group_id, cache)
+        self.assertEqual(groups[1]._cached_member_list, [])
+        self.assertIsNone(groups[1]._cached_member_index.get(1))
+        self.assertEqual(len(groups[0]._cached_member_list), 200)
+
+
+class PrefetchClient(Client):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, snapshot=False, **kwargs)
+        self.running = 0
+        self.peak = 0
+
+    async def _refresh_group_member_list(
+        self, group: Group, limiter: Optional[RateLimiter] = None
+    ):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            # two pages each
+            for _ in range(2):
+                if limiter:
+                    await limiter.acquire()
+                await asyncio.sleep(0.01)
+            if group.group_code == 3:
+                raise asyncio.TimeoutError
+            group._set_members([make_member(group, 1)])
+        finally:
+            self.running -= 1
+
+
+class TestPrefetch(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestPrefetch | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing prefetch_group_members...")
+        self.client = PrefetchClient(10000, bytes(16))
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing prefetch_group_members!")
+
+    async def test_prefetch(self):
+        self.log(logging.INFO, "test prefetch members of all groups")
+        groups = [make_group(self.client, code) for code in range(1, 11)]
+        self.client._set_group_list(groups)
+        await self.client.get_group_member_list(groups[0])
+
+        progress: List[MemberPrefetch] = []
+        results = await self.client.prefetch_group_members(
+            concurrency=3, rate=None, callback=progress.append
+        )
+        self.assertEqual(
+            [r.group_id for r in results], [g.group_id for g in groups[1:]]
+        )
+        self.assertEqual(self.client.peak, 3)
+        self.assertEqual([p.done for p in progress], list(range(1, 10)))
+        self.assertIsInstance(results[1].error, asyncio.TimeoutError)
+        self.assertEqual(results[2].members, 1)
+        self.assertGreater(results[2].latency, 0.015)
+        self.assertEqual(self.client._member_cache.total_members, 9)
+
+    async def test_rate_limit(self):
+        self.log(logging.INFO, "test member list request rate limit")
+        groups = [make_group(self.client, code) for code in (1, 2, 4, 5)]
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await self.client.prefetch_group_members(groups, concurrency=2, rate=50)
+        # 8 requests, 2 at once then 50 per second
+        self.assertGreater(loop.time() - start, 0.11)
+
+
+if __name__ == "__main__":
+    unittest.main()
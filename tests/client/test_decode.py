@@ -0,0 +1,105 @@
+import struct
+import asyncio
+import logging
+import unittest
+from typing import List
+from concurrent.futures import (
+    Future,
+    Executor,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+)
+
+from rtea import qqtea_encrypt
+
+from cai.log import logger
+from cai.client.packet import IncomingPacket
+
+KEY = bytes(range(16))
+
+
+def sso_frame(seq: int, command_name: str, body: bytes) -> bytes:
+    head = (
+        struct.pack(">IiI", seq, 0, 4)
+        + struct.pack(">I", len(command_name) + 4)
+        + command_name.encode()
+        + struct.pack(">I", 8)
+        + bytes(4)
+        + struct.pack(">i", 0)
+    )
+    return (
+        struct.pack(">I", len(head) + 4)
+        + head
+        + struct.pack(">I", len(body) + 4)
+        + body
+    )
+
+
+def frame(seq: int, encrypt_type: int) -> bytes:
+    data = sso_frame(seq, "OnlinePush.PbPushGroupMsg", b"body" * seq)
+    if encrypt_type == 1:
+        data = qqtea_encrypt(data, KEY)
+    return struct.pack(">IBBI", 0xB, encrypt_type, 0, 10) + b"123456" + data
+
+
+class CountExecutor(Executor):
+    def __init__(self, executor: Executor):
+        self.executor = executor
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        self.submitted += 1
+        return self.executor.submit(fn, *args, **kwargs)
+
+
+class TestDecodeExecutor(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestDecodeExecutor | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing DecodeExecutor...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing DecodeExecutor!")
+
+    async def _test_order(self, executor):
+        # other tests may reload cai modules, decode functions sent to the
+        # process pool must come from the loaded ones to be picklable
+        from cai.client import Client
+
+        executor = CountExecutor(executor)
+        client = Client(123456, bytes(16), decode_executor=executor)
+        client._siginfo.d2key = KEY
+        received: List[IncomingPacket] = []
+        client._dispatch_packet = received.append  # type: ignore
+
+        frames = [frame(seq, 1 if seq % 3 else 0) for seq in range(1, 31)]
+        for data in frames:
+            with memoryview(data) as view:
+                client._receive_frame(view)
+        while client._decode_task:
+            await asyncio.sleep(0.01)
+
+        # only d2key frames are decoded in executor
+        self.assertEqual(executor.submitted, 20)
+        self.assertEqual([p.seq for p in received], list(range(1, 31)))
+        for packet in received:
+            self.assertEqual(packet.uin, 123456)
+            self.assertEqual(packet.data, b"body" * packet.seq)
+
+    async def test_thread_pool(self):
+        self.log(logging.INFO, "test decode in thread pool")
+
+        with ThreadPoolExecutor(4) as executor:
+            await self._test_order(executor)
+
+    async def test_process_pool(self):
+        self.log(logging.INFO, "test decode in process pool")
+
+        with ProcessPoolExecutor(2) as executor:
+            await self._test_order(executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import unittest
+from types import SimpleNamespace
+from typing import List, Tuple, Union, Optional
+
+from cai.log import logger
+from cai.utils.binary import Packet
+from cai.client import Client, Command
+from cai.client.friendlist import FriendListFail
+
+TOTAL_FRIENDS = 1050
+TOTAL_GROUPS = 120
+
+
+def friend_info(uin: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        friend_uin=uin,
+        group_id=0,
+        face_id=0,
+        remark="",
+        is_mqq_online=False,
+        is_iphone_online=False,
+        show_name="",
+        is_remark=False,
+        nick=str(uin),
+        network_type=0,
+        vip_font=0,
+        term_description="",
+        sex=0,
+        battery_status=0,
+    )
+
+
+def group_info(group_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        group_id=group_id,
+        group_name=str(group_id),
+        friend_count=0,
+        online_friend_count=0,
+    )
+
+
+class PagedClient(Client):
+    def __init__(
+        self, *args, fail_at: int = -1, reject: bool = False, **kwargs
+    ):
+        super().__init__(*args, snapshot=False, **kwargs)
+        self._siginfo.d2key = bytes(16)
+        self.fail_at = fail_at
+        self.reject = reject
+        self.requests: List[Tuple[int, int, int, int]] = []
+        self.running = 0
+        self.peak = 0
+
+    async def _get_friend_list_page(
+        self,
+        friend_index: int,
+        friend_count: int,
+        group_index: int,
+        group_count: int,
+    ):
+        self.requests.append(
+            (friend_index, friend_count, group_index, group_count)
+        )
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if friend_index == self.fail_at:
+            self.fail_at = -1
+            if self.reject:
+                # FriendListFail response is converted by client
+                return await super()._get_friend_list_page(
+                    friend_index, friend_count, group_index, group_count
+                )
+            raise asyncio.TimeoutError
+
+        friends = range(
+            friend_index, min(friend_index + friend_count, TOTAL_FRIENDS)
+        )
+        groups = range(
+            group_index, min(group_index + group_count, TOTAL_GROUPS)
+        )
+        return SimpleNamespace(
+            response=SimpleNamespace(
+                friend_info=[friend_info(uin) for uin in friends],
+                group_info=[group_info(gid) for gid in groups],
+                total_friend_count=TOTAL_FRIENDS,
+                total_group_count=TOTAL_GROUPS,
+            )
+        )
+
+    async def send_and_wait(
+        self,
+        seq: int,
+        command_name: str,
+        packet: Union[bytes, Packet],
+        timeout: Optional[float] = 10.0,
+    ) -> Command:
+        return FriendListFail(self.uin, seq, 0, command_name, 1, "rejected")
+
+
+class TestFriendList(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestFriendList | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing FriendList...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing FriendList!")
+
+    async def test_concurrent_pages(self):
+        self.log(logging.INFO, "test friend list pages fetched concurrently")
+        client = PagedClient(10000, bytes(16), friend_list_window=3)
+        friends = await client.get_friend_list(cache=False)
+
+        self.assertEqual([f.uin for f in friends], list(range(TOTAL_FRIENDS)))
+        self.assertEqual(len(client._friend_group_list), TOTAL_GROUPS)
+        self.assertEqual(len(client.requests), 6)
+        self.assertEqual(client.requests[-1], (1000, 200, 500, 0))
+        self.assertEqual(client.peak, 3)
+
+    async def test_sequential_fallback(self):
+        self.log(logging.INFO, "test fallback to sequential pages")
+        client = PagedClient(10000, bytes(16), fail_at=400)
+        friends = await client.get_friend_list(cache=False)
+
+        self.assertEqual([f.uin for f in friends], list(range(TOTAL_FRIENDS)))
+        self.assertEqual(len(client._friend_group_list), TOTAL_GROUPS)
+        self.assertEqual(client.requests[-1], (1000, 200, 120, 0))
+
+    async def test_rejected_page_fallback(self):
+        self.log(logging.INFO, "test fallback when a page is rejected")
+        client = PagedClient(10000, bytes(16), fail_at=400, reject=True)
+        friends = await client.get_friend_list(cache=False)
+
+        self.assertEqual([f.uin for f in friends], list(range(TOTAL_FRIENDS)))
+        self.assertEqual(len(client._friend_group_list), TOTAL_GROUPS)
+        self.assertEqual(client.requests[-1], (1000, 200, 120, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import time
+import asyncio
+import logging
+import unittest
+from typing import Union, Optional
+
+from cai.log import logger
+from cai.utils.binary import Packet
+from cai.client import Client, Command
+from cai.client.heartbeat import Heartbeat
+from cai.utils.future import get_timer_wheel
+
+
+class HeartbeatClient(Client):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.alive = True
+        self.online = True
+
+    @property
+    def connected(self) -> bool:
+        return self.online
+
+    async def disconnect(self) -> None:
+        self.online = False
+
+    async def send_and_wait(
+        self,
+        seq: int,
+        command_name: str,
+        packet: Union[bytes, Packet],
+        timeout: Optional[float] = 10.0,
+    ) -> Command:
+        if not self.alive:
+            raise asyncio.TimeoutError
+        return Heartbeat(self.uin, seq, 0, command_name)
+
+
+class TestHeartbeat(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestHeartbeat | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing Heartbeat...")
+        self.client = HeartbeatClient(
+            10000,
+            bytes(16),
+            heartbeat_interval=0.2,
+            heartbeat_min_interval=0.1,
+            heartbeat_max_misses=2,
+        )
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing Heartbeat!")
+
+    async def test_adaptive(self):
+        self.log(logging.INFO, "test idle aware heartbeat")
+        client = self.client
+        task = asyncio.create_task(client.heartbeat())
+        # traffic keeps the connection alive without heartbeat
+        for _ in range(4):
+            client._last_receive_time = time.monotonic()
+            await asyncio.sleep(0.1)
+        stats = client.stats
+        self.assertEqual(stats.heartbeats_sent, 0)
+        self.assertGreater(stats.heartbeats_skipped, 0)
+        # skipped heartbeats keep the shared timer wheel idle
+        self.assertEqual(len(get_timer_wheel()), 0)
+        self.assertIsNone(get_timer_wheel()._handle)
+
+        await asyncio.sleep(0.5)
+        stats = client.stats
+        self.assertGreater(stats.heartbeats_sent, 0)
+        self.assertIsNotNone(stats.heartbeat_rtt)
+
+        # missed heartbeats are retried sooner and close the connection
+        client.alive = False
+        sent = stats.heartbeats_sent
+        await asyncio.wait_for(task, 2)
+        stats = client.stats
+        self.assertEqual(stats.heartbeats_missed, 2)
+        self.assertEqual(stats.heartbeats_sent, sent + 2)
+        self.assertFalse(client.online)
+        self.assertFalse(client._heartbeat_enabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import unittest
+from typing import List
+
+from cai.log import logger
+from cai.client.listener import ListenerRegistry
+from cai.client import Event, Client, GroupMessage, PrivateMessage
+
+
+def group_message(group_id: int, from_uin: int) -> GroupMessage:
+    return GroupMessage(None, 1, 0, group_id, "", 0, from_uin, "", [])
+
+
+def private_message(from_uin: int) -> PrivateMessage:
+    return PrivateMessage(None, 1, 0, False, from_uin, "", 10000, [])
+
+
+def matched_callbacks(registry: ListenerRegistry) -> List:
+    event = private_message(5)
+    return [listener.callback for listener in registry.match(event)]
+
+
+class TestListener(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestListener | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing Listener...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing Listener!")
+
+    def test_registry(self):
+        self.log(logging.INFO, "test listener filter index")
+        registry = ListenerRegistry()
+        all_events = lambda c, e: None
+        groups = lambda c, e: None
+        private = lambda c, e: None
+        sender = lambda c, e: None
+        registry.add(all_events)
+        registry.add(groups, "group_message", group_id=[1, 2])
+        registry.add(private, "private_message")
+        registry.add(sender, from_uin=5)
+
+        def matched(event: Event) -> List:
+            return [listener.callback for listener in registry.match(event)]
+
+        self.assertEqual(
+            matched(group_message(1, 5)), [all_events, groups, sender]
+        )
+        self.assertEqual(matched(group_message(3, 6)), [all_events])
+        self.assertEqual(
+            matched(private_message(5)), [all_events, private, sender]
+        )
+
+        registry.discard(groups)
+        self.assertNotIn(groups, registry)
+        self.assertEqual(matched(group_message(1, 6)), [all_events])
+        registry.add(all_events, group_id=2)
+        self.assertEqual(len(registry), 3)
+        self.assertEqual(matched(group_message(1, 6)), [])
+        self.assertEqual(matched(group_message(2, 6)), [all_events])
+
+    def test_set_compatible(self):
+        self.log(logging.INFO, "test registry used as a set of callbacks")
+        registry = ListenerRegistry()
+        first = lambda c, e: None
+        second = lambda c, e: None
+        registry.add(first)
+        registry |= {second}
+        self.assertEqual(registry, {first, second})
+        self.assertEqual(set(registry), {first, second})
+        self.assertEqual(registry | set(), {first, second})
+
+        registry.remove(first)
+        with self.assertRaises(KeyError):
+            registry.remove(first)
+        self.assertEqual(list(registry), [second])
+        self.assertEqual(matched_callbacks(registry), [second])
+        registry -= {second}
+        self.assertFalse(registry)
+
+    async def test_dispatch(self):
+        self.log(logging.INFO, "test dispatch to matched listeners")
+        client = Client(10000, bytes(16))
+        received: List[Event] = []
+        inline: List[Event] = []
+        done = asyncio.Event()
+
+        async def listener(client: Client, event: Event):
+            received.append(event)
+            done.set()
+
+        client.add_event_listener(listener, group_id=1)
+        client.add_event_listener(
+            lambda c, e: inline.append(e), "private_message", sync=True
+        )
+
+        client.dispatch_event(group_message(2, 5))
+        self.assertEqual(inline, [])
+        event = private_message(5)
+        client.dispatch_event(event)
+        self.assertEqual(inline, [event])
+
+        event = group_message(1, 5)
+        client.dispatch_event(event)
+        await asyncio.wait_for(done.wait(), 1)
+        self.assertEqual(received, [event])
+        self.assertEqual(client.stats.listener_calls, 2)
+        await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
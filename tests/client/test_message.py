@@ -0,0 +1,134 @@
+import pickle
+import logging
+import unittest
+from unittest import mock
+
+from cai.log import logger
+from cai.pb.msf.msg.comm import Msg
+from cai.client.message_service import decoders
+from cai.client.message_service.fragment import FragmentBuffer
+from cai.client.message_service.models import TextElement, LazyElements
+from cai.client.message_service.decoders import (
+    BuddyMessageDecoder,
+    TroopMessageDecoder,
+)
+
+
+def make_message(text: str, group: bool = False) -> Msg:
+    message = Msg()
+    message.head.from_uin = 10001
+    message.head.to_uin = 10002
+    message.head.seq = 1
+    message.head.time = 0
+    message.head.c2c_cmd = 11
+    if group:
+        message.head.group_info.group_code = 20001
+        message.head.group_info.group_name = b"group"
+        message.head.group_info.group_card = b"card"
+    message.content_head.auto_reply = 0
+    message.body.rich_text.elems.add().text.str = text.encode("utf-8")
+    return message
+
+
+def make_fragment(
+    text: str, index: int, total: int, div_seq: int = 1, from_uin: int = 10001
+) -> Msg:
+    message = make_message(text, True)
+    message.head.from_uin = from_uin
+    message.content_head.pkg_num = total
+    message.content_head.pkg_index = index
+    message.content_head.div_seq = div_seq
+    return message
+
+
+class TestMessageEvent(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestMessageEvent | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing MessageEvent...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing MessageEvent!")
+
+    def test_lazy_decode(self):
+        self.log(logging.INFO, "test message elements decoded on access")
+        with mock.patch.object(
+            decoders, "parse_elements", wraps=decoders.parse_elements
+        ) as parse:
+            event = BuddyMessageDecoder.decode(make_message("hello"))
+            assert event
+            self.assertEqual(event.from_uin, 10001)
+            self.assertIsInstance(event.__dict__["message"], LazyElements)
+            parse.assert_not_called()
+
+            self.assertEqual(event.message, [TextElement("hello")])
+            self.assertIs(event.message, event.message)
+            parse.assert_called_once()
+
+        event = TroopMessageDecoder.decode(make_message("hi", True))
+        assert event
+        self.assertEqual(event.group_id, 20001)
+        self.assertEqual(event.message, [TextElement("hi")])
+
+    def test_drop_raw(self):
+        self.log(logging.INFO, "test raw message dropped once decoded")
+        event = BuddyMessageDecoder.decode(make_message("hello"))
+        assert event
+        event.drop_raw_message()
+        self.assertIsNotNone(event._msg)
+        self.assertEqual(event.message, [TextElement("hello")])
+        self.assertIsNone(event._msg)
+
+        event = BuddyMessageDecoder.decode(make_message("hello"))
+        assert event
+        event.message
+        event.drop_raw_message()
+        self.assertIsNone(event._msg)
+
+    def test_pickle(self):
+        self.log(logging.INFO, "test pickle message event")
+        event = BuddyMessageDecoder.decode(make_message("hello"))
+        assert event
+        event._msg = None
+        result = pickle.loads(pickle.dumps(event))
+        self.assertEqual(result.message, [TextElement("hello")])
+        self.assertEqual(result.from_nick, event.from_nick)
+
+    def test_fragments(self):
+        self.log(logging.INFO, "test long message fragment reassembly")
+        decode = TroopMessageDecoder.decode
+        # fragments are never buffered across clients
+        with self.assertRaises(ValueError):
+            decode(make_fragment("a", 0, 2))
+
+        buffer = FragmentBuffer()
+        self.assertIsNone(decode(make_fragment("b", 1, 3), buffer))
+        # same div_seq from another sender is another message
+        self.assertIsNone(decode(make_fragment("x", 1, 2, 1, 5), buffer))
+        self.assertIsNone(decode(make_fragment("b", 1, 3), buffer))
+        self.assertIsNone(decode(make_fragment("c", 2, 3), buffer))
+        self.assertIsNone(decode(make_fragment("z", 5, 3), buffer))
+        event = decode(make_fragment("a", 0, 3), buffer)
+        assert event
+        self.assertEqual(
+            event.message,
+            [TextElement("a"), TextElement("b"), TextElement("c")],
+        )
+        stats = buffer.stats
+        self.assertEqual((stats.pending, stats.completed), (1, 1))
+        self.assertEqual((stats.duplicates, stats.invalid), (1, 1))
+
+        self.assertEqual(buffer.expire(float("inf")), 1)
+        self.assertEqual(buffer.stats.expired, 1)
+        self.assertEqual(buffer.stats.pending_bytes, 0)
+
+        buffer = FragmentBuffer(max_bytes=1)
+        self.assertIsNone(decode(make_fragment("a", 0, 2), buffer))
+        self.assertEqual(buffer.stats.evicted, 1)
+        self.assertEqual(len(buffer), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import copy
+import pickle
+import logging
+import unittest
+
+from cai.log import logger
+from cai.client import Group, Client, GroupMember
+from cai.client.friendlist.jce import StTroopNum, StTroopMemberInfo
+
+
+class TestModels(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestModels | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing Models...")
+        self.client = Client(10000, bytes(16))
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing Models!")
+
+    def test_from_struct(self):
+        self.log(logging.INFO, "test models built from jce structs")
+        troop = StTroopNum(
+            group_uin=1, group_code=2, group_name="group", member_num=3
+        )
+        group = Group.from_struct(troop, self.client)
+        self.assertEqual(
+            group.to_dict(True),
+            Group.from_dict({**troop.dict(), "_client": self.client}).to_dict(
+                True
+            ),
+        )
+
+        info = StTroopMemberInfo(
+            member_uin=5,
+            face_id=0,
+            age=18,
+            gender=1,
+            nick="nick",
+            status=bytes(1),
+            concerned=True,
+        )
+        member = GroupMember.from_struct(info, self.client, group)
+        self.assertEqual(member.nick, "nick")
+        self.assertIs(member.concerned, True)
+        self.assertIs(type(member.nick), str)
+        self.assertIs(type(member.member_uin), int)
+        self.assertIs(member.group, group)
+
+    def test_slots(self):
+        self.log(logging.INFO, "test slotted models")
+        group = Group(1, 2, "group", "", 0, 0, 3, 0, 0, 200, self.client)
+        self.assertFalse(hasattr(group, "__dict__"))
+        with self.assertRaises(AttributeError):
+            group.unknown = 1  # type: ignore
+
+        self.assertNotEqual(group, 1)
+        self.assertEqual(copy.copy(group), group)
+        group._set_members([])
+        self.assertEqual(group._cached_member_list, [])
+
+        group._client = None  # type: ignore
+        self.assertEqual(
+            pickle.loads(pickle.dumps(group)).to_dict(), group.to_dict()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import struct
+import logging
+import unittest
+
+from rtea import qqtea_decrypt
+
+from cai.log import logger
+from cai.utils.binary import Packet
+from cai.client.packet import UniPacket, CSsoBodyPacket, CSsoDataPacket
+
+KEY = bytes(range(16))
+
+
+def reference_sso_body(
+    seq, sub_app_id, command_name, imei, session_id, ksid, body
+):
+    packet = Packet().write_with_length(
+        struct.pack(">III", seq, sub_app_id, sub_app_id),
+        bytes([0x01] + [0x00] * 9 + [0x01, 0x00]),
+        struct.pack(">I", 4),
+        struct.pack(">I", len(command_name) + 4),
+        command_name.encode(),
+        struct.pack(">I", len(session_id) + 4),
+        session_id,
+        struct.pack(">I", len(imei) + 4),
+        imei.encode(),
+        struct.pack(">IH", 4, len(ksid) + 2),
+        ksid,
+        struct.pack(">I", 4),
+        offset=4,
+    )
+    return packet.write_with_length(body, offset=4)
+
+
+def reference_uni_plain(command_name, session_id, body):
+    data = Packet().write_with_length(
+        struct.pack(">I", len(command_name) + 4),
+        command_name.encode(),
+        struct.pack(">I", len(session_id) + 4),
+        session_id,
+        struct.pack(">I", 4),
+        offset=4,
+    )
+    return data.write_with_length(body, offset=4)
+
+
+class TestPacketBuild(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestPacketBuild | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing PacketBuild...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing PacketBuild!")
+
+    def test_sso_packet(self):
+        self.log(logging.INFO, "test sso body and data packet")
+
+        for seq in (1, 2):
+            args = (seq, 537066738, "wtlogin.login", "86" * 8, b"\x02" * 4)
+            body = Packet(b"body" * seq)
+            packet = CSsoBodyPacket.build(*args, b"ksid", body)
+            self.assertIsInstance(packet, CSsoBodyPacket)
+            self.assertEqual(packet, reference_sso_body(*args, b"ksid", body))
+
+            data = CSsoDataPacket.build(123456, 2, packet, key=KEY)
+            self.assertIsInstance(data, CSsoDataPacket)
+            prefix = b"\x00\x00\x00\x0a\x02\x00\x00\x00\x04\x00"
+            prefix += struct.pack(">I", 10) + b"123456"
+            self.assertEqual(struct.unpack_from(">I", data)[0], len(data))
+            self.assertEqual(data[4 : 4 + len(prefix)], prefix)
+            self.assertEqual(
+                qqtea_decrypt(bytes(data[4 + len(prefix) :]), KEY), packet
+            )
+
+    def test_uni_packet(self):
+        self.log(logging.INFO, "test uni packet")
+
+        for seq in (1, 0x7FFF):
+            body = b"\x0a\x02" * seq
+            packet = UniPacket.build(
+                123456, seq, "StatSvc.register", b"\x02" * 4, 1, body, KEY
+            )
+            self.assertIsInstance(packet, UniPacket)
+            length, _, body_type, seq_, _ = struct.unpack_from(">IIBIB", packet)
+            self.assertEqual((length, body_type, seq_), (len(packet), 1, seq))
+            self.assertEqual(packet[14:24], struct.pack(">I", 10) + b"123456")
+            self.assertEqual(
+                qqtea_decrypt(bytes(packet[24:]), KEY),
+                reference_uni_plain("StatSvc.register", b"\x02" * 4, body),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import asyncio
+import logging
+import tempfile
+import unittest
+from types import SimpleNamespace
+from typing import List, Tuple, Optional
+
+from cai.log import logger
+from cai.client.sso_server import SsoServer
+from cai.exceptions import RegisterException
+from cai.client.status_service import RegPushReason
+from cai.client import Client, OnlineStatus, sso_server
+
+
+class RecoverClient(Client):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.online = False
+        self.bad_hosts = {"10.0.0.2"}
+        self.connected_hosts: List[str] = []
+        self.registers: List[Tuple[OnlineStatus, RegPushReason]] = []
+        self.syncs: List[Tuple[int, Optional[bytes]]] = []
+        self.rejected = False
+        self.refreshed = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.online
+
+    async def connect(self, server: Optional[SsoServer] = None) -> None:
+        assert server
+        self.connected_hosts.append(server.host)
+        if server.host in self.bad_hosts:
+            raise ConnectionError("Connection refused")
+        self.online = True
+
+    async def _close_connection(self) -> None:
+        self.online = False
+
+    async def register(
+        self,
+        status: OnlineStatus = OnlineStatus.Online,
+        register_reason: RegPushReason = RegPushReason.AppRegister,
+    ):
+        self.registers.append((status, register_reason))
+        if self.rejected:
+            raise RegisterException(self.uin, 1, "session rejected")
+        self._supervised = True
+
+    async def refresh_siginfo(self):
+        self.refreshed += 1
+
+    async def _get_message(
+        self, request_type: int, *args, sync_cookie=None, **kwargs
+    ) -> None:
+        self.syncs.append((request_type, sync_cookie))
+
+
+class TestReconnect(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestReconnect | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing Reconnect...")
+        self.dir = tempfile.TemporaryDirectory()
+        self.catalog = sso_server._catalog
+        catalog = sso_server.ServerCatalog(
+            os.path.join(self.dir.name, "sso_servers.json")
+        )
+        catalog.add(
+            SsoServer(
+                host=f"10.0.0.{i}",
+                port=8080,
+                protocol=bytes(1),
+                city="",
+                country="",
+            )
+            for i in range(1, 4)
+        )
+        for i in range(1, 4):
+            catalog.record_latency(f"10.0.0.{i}", 8080, i * 10.0)
+        sso_server._catalog = catalog
+        self.client = RecoverClient(10000, bytes(16), reconnect_delay=0.01)
+
+    def tearDown(self):
+        sso_server._catalog = self.catalog
+        self.dir.cleanup()
+        self.log(logging.INFO, "End Testing Reconnect!")
+
+    async def test_recover(self):
+        self.log(logging.INFO, "test reconnect to next best server")
+        client = self.client
+        self.assertFalse(client._connection_lost("not registered"))
+
+        await client.register()
+        client._sync_cookie = b"cookie"
+        client._connection = SimpleNamespace(  # type: ignore
+            host="10.0.0.1", write_stats=None
+        )
+        self.assertTrue(client._connection_lost("test"))
+        # only one recovery at a time
+        self.assertTrue(client._connection_lost("test"))
+        await asyncio.wait_for(client._recover_task, 2)  # type: ignore
+
+        self.assertTrue(client.online)
+        self.assertEqual(client.connected_hosts, ["10.0.0.2", "10.0.0.3"])
+        self.assertEqual(
+            client.registers[-1],
+            (OnlineStatus.Online, RegPushReason.MsfByNetChange),
+        )
+        self.assertEqual(client.syncs, [(1, b"cookie")])
+        # failed server is the last choice
+        self.assertEqual(
+            [server.host for server in await sso_server.get_sso_servers()],
+            ["10.0.0.3", "10.0.0.1", "10.0.0.2"],
+        )
+
+        stats = client.stats
+        self.assertEqual(stats.connection_losses, 1)
+        self.assertEqual((stats.reconnect_attempts, stats.reconnects), (2, 1))
+        self.assertIsNotNone(stats.last_recovery_time)
+
+        await client.disconnect()
+        self.assertFalse(client._connection_lost("disconnected"))
+
+    async def test_rejected(self):
+        self.log(logging.INFO, "test recovery stops when register fails")
+        client = self.client
+        await client.register()
+        client.rejected = True
+        client._connection = SimpleNamespace(  # type: ignore
+            host="10.0.0.1", write_stats=None
+        )
+        self.assertTrue(client._connection_lost("test"))
+        await asyncio.wait_for(client._recover_task, 2)  # type: ignore
+
+        self.assertFalse(client.online)
+        self.assertFalse(client._supervised)
+        self.assertEqual(client.connected_hosts, ["10.0.0.2", "10.0.0.3"])
+        self.assertEqual(client.refreshed, 1)
+        # servers rejecting the session are not marked as failed
+        catalog = sso_server.get_server_catalog()
+        self.assertEqual(catalog.get("10.0.0.3", 8080).failures, 0)
+
+        stats = client.stats
+        self.assertEqual((stats.reconnect_attempts, stats.reconnects), (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
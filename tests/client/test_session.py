@@ -0,0 +1,161 @@
+import os
+import json
+import logging
+import secrets
+import tempfile
+import unittest
+
+from cai.log import logger
+from cai.client import Client
+from cai.client.models import SigInfo
+from cai.client.session import Session, SessionStore
+from cai.exceptions import LoginException, RegisterException
+
+
+class TestSessionStore(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestSessionStore | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing SessionStore...")
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "session.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+        self.log(logging.INFO, "End Testing SessionStore!")
+
+    def test_round_trip(self):
+        self.log(logging.INFO, "test save and load session")
+        store = SessionStore(10000, bytes(16), b"guid", self.path)
+        self.assertIsNone(store.load())
+
+        siginfo = SigInfo(d2=b"d2", d2key=bytes(range(16)), login_bitmap=1)
+        siginfo.s_key = b"skey"
+        siginfo.ps_key_map = {"qun.qq.com": b"pskey"}
+        session = Session(10000, siginfo, ksid=b"ksid", t104=b"\x00\xff")
+        store.save(session)
+        with open(self.path, "rb") as f:
+            self.assertNotIn(b"ksid", f.read())
+
+        loaded = store.load()
+        self.assertEqual(loaded, session)
+        self.assertEqual(loaded.siginfo.s_key, b"skey")  # type: ignore
+
+    def test_invalid_file(self):
+        self.log(logging.INFO, "test session of other password or broken")
+        store = SessionStore(10000, bytes(16), b"guid", self.path)
+        store.save(Session(10000, SigInfo()))
+
+        other = SessionStore(10000, bytes(range(16)), b"guid", self.path)
+        self.assertIsNone(other.load())
+
+        with open(self.path, "r+b") as f:
+            f.seek(20)
+            f.write(b"\x00\x01\x02")
+        self.assertIsNone(store.load())
+
+        store.clear()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_stale_schema(self):
+        self.log(logging.INFO, "test session saved by an older version")
+        store = SessionStore(10000, bytes(16), b"guid", self.path)
+        for plain in (
+            json.dumps({"uin": 10000, "siginfo": {"removed": 1}}),
+            json.dumps({"uin": 10000}),
+            "{broken",
+        ):
+            nonce = secrets.token_bytes(12)
+            with open(self.path, "wb") as f:
+                f.write(
+                    b"\x01"
+                    + nonce
+                    + store._aes.encrypt(nonce, plain.encode(), store._aad)
+                )
+            self.assertIsNone(store.load())
+            self.assertFalse(os.path.exists(self.path))
+
+
+class FastLoginClient(Client):
+    def __init__(self, path: str, *args, **kwargs):
+        super().__init__(*args, snapshot=False, **kwargs)
+        self.path = path
+
+        self.online = True
+        self.init_error: Exception = RegisterException(
+            self.uin, 1, "tickets expired"
+        )
+        self.reconnects = 0
+
+    def _get_session_store(self):
+        return SessionStore(self.uin, self._password_md5, b"guid", self.path)
+
+    @property
+    def connected(self) -> bool:
+        return self.online
+
+    async def reconnect(self, *args, **kwargs) -> None:
+        self.reconnects += 1
+        self.online = True
+
+    async def _init(self) -> None:
+        self._init_flag = True
+        if isinstance(self.init_error, ConnectionError):
+            self.online = False
+        raise self.init_error
+
+    async def refresh_siginfo(self):
+        raise LoginException(self.uin, 1, "refresh failed")
+
+
+class TestFastLogin(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestFastLogin | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing fast_login...")
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "session.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+        self.log(logging.INFO, "End Testing fast_login!")
+
+    async def test_fallback(self):
+        self.log(logging.INFO, "test state restored when session rejected")
+        client = FastLoginClient(self.path, 10000, bytes(16))
+        client._ksid = b"current"
+        siginfo = client._siginfo
+        store = client._get_session_store()
+        store.save(Session(10000, SigInfo(d2=b"saved"), ksid=b"saved"))
+
+        self.assertFalse(await client.fast_login())
+        self.assertIs(client._siginfo, siginfo)
+        self.assertEqual(client._ksid, b"current")
+        self.assertFalse(client._init_flag)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(client.reconnects, 0)
+
+    async def test_connection_dropped(self):
+        self.log(logging.INFO, "test fallback when server drops connection")
+        client = FastLoginClient(self.path, 10000, bytes(16))
+        client.init_error = ConnectionError("Connection reset by peer")
+        client._ksid = b"current"
+        siginfo = client._siginfo
+        store = client._get_session_store()
+        store.save(Session(10000, SigInfo(d2=b"saved"), ksid=b"saved"))
+
+        self.assertFalse(await client.fast_login())
+        self.assertIs(client._siginfo, siginfo)
+        self.assertEqual(client._ksid, b"current")
+        self.assertFalse(client._init_flag)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(client.reconnects, 1)
+        self.assertTrue(client.connected)
+
+
+if __name__ == "__main__":
+    unittest.main()
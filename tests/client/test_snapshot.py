@@ -0,0 +1,109 @@
+import os
+import logging
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from cai.log import logger
+from cai.client import Client
+from cai.client.snapshot import SnapshotStore
+
+from .test_cache import make_group, make_friend, make_member
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestSnapshotStore | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing SnapshotStore...")
+        self.dir = tempfile.TemporaryDirectory()
+        self.client = Client(10000, bytes(16))
+        self.store = SnapshotStore(
+            10000, os.path.join(self.dir.name, "snapshot.db")
+        )
+
+    def tearDown(self):
+        self.dir.cleanup()
+        self.log(logging.INFO, "End Testing SnapshotStore!")
+
+    def test_empty(self):
+        self.log(logging.INFO, "test load before save")
+        self.assertEqual(self.store.load(self.client), ([], [], []))
+
+    def test_round_trip(self):
+        self.log(logging.INFO, "test save and load lists")
+        friends = [make_friend(self.client, uin) for uin in range(1, 101)]
+        friends[0].is_remark = True
+        groups = [make_group(self.client, code) for code in range(1, 4)]
+        members = [make_member(groups[0], uin) for uin in range(1, 201)]
+        members[0].concerned = True
+        members[0].phone = "13800000000"
+        members[0].email = "member@example.com"
+
+        self.store.save_friend_list(friends, [])
+        self.store.save_group_list(groups)
+        self.store.save_members(groups[0], members)
+        self.store.save_members(groups[1], members[:10])
+
+        client = Client(10000, bytes(16))
+        loaded_friends, _, loaded_groups = self.store.load(client)
+        self.assertEqual(
+            [f.to_dict(True) for f in loaded_friends],
+            [f.to_dict(True) for f in friends],
+        )
+        self.assertIs(loaded_friends[0].is_remark, True)
+        self.assertIs(loaded_friends[0]._client, client)
+        self.assertEqual(
+            [g.to_dict(True) for g in loaded_groups],
+            [g.to_dict(True) for g in groups],
+        )
+
+        loaded = self.store.load_members(loaded_groups)
+        self.assertEqual(len(loaded[1]), 200)
+        self.assertIs(loaded[1][0].concerned, True)
+        self.assertIs(loaded[1][0].group, loaded_groups[0])
+        # contact info is not saved
+        self.assertEqual((loaded[1][0].phone, loaded[1][0].email), ("", ""))
+        with sqlite3.connect(self.store.path) as conn:
+            columns = [
+                row[1] for row in conn.execute("PRAGMA table_info(member)")
+            ]
+        self.assertNotIn("phone", columns)
+        members[0].phone = members[0].email = ""
+        self.assertEqual(loaded[1][0].to_dict(True), members[0].to_dict(True))
+
+        self.log(logging.INFO, "test members of left group dropped")
+        self.store.save_group_list(groups[:1])
+        self.assertEqual(
+            list(self.store.load_members(loaded_groups).keys()), [1]
+        )
+
+    def test_concurrent_saves(self):
+        self.log(logging.INFO, "test saves from many threads on a new file")
+        groups = [make_group(self.client, code) for code in range(1, 51)]
+        with ThreadPoolExecutor(8) as executor:
+            list(
+                executor.map(
+                    lambda g: self.store.save_members(
+                        g, [make_member(g, uin) for uin in range(1, 11)]
+                    ),
+                    groups,
+                )
+            )
+        self.assertEqual(len(self.store.load_members(groups)), 50)
+
+        # writes are applied in submission order
+        writer = self.store.writer
+        writer.submit(self.store.save_group_list, groups[:1])
+        writer.submit(
+            self.store.save_members, groups[1], [make_member(groups[1], 1)]
+        ).result()
+        self.assertEqual(sorted(self.store.load_members(groups).keys()), [1, 2])
+        self.store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import socket
+import asyncio
+import logging
+import tempfile
+import unittest
+from types import SimpleNamespace
+from typing import List, Optional
+
+from cai.log import logger
+from cai.client import Client, sso_server
+from cai.client.sso_server import SsoServer, ServerCatalog
+
+
+def make_server(host: str, port: int) -> SsoServer:
+    return SsoServer(
+        host=host, port=port, protocol=bytes(1), city="", country=""
+    )
+
+
+class ConnectClient(Client):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.servers: List[SsoServer] = []
+
+    async def connect(self, server: Optional[SsoServer] = None) -> None:
+        assert server
+        self.servers.append(server)
+        self._connection = SimpleNamespace(  # type: ignore
+            host=server.host, write_stats=None
+        )
+
+    async def disconnect(self) -> None:
+        pass
+
+
+class TestServerCatalog(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestServerCatalog | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing ServerCatalog...")
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "sso_servers.json")
+        self.catalog = sso_server._catalog
+        self.cached_server = sso_server._cached_server
+
+    def tearDown(self):
+        sso_server._catalog = self.catalog
+        sso_server._cached_server = self.cached_server
+        self.dir.cleanup()
+        self.log(logging.INFO, "End Testing ServerCatalog!")
+
+    def test_catalog(self):
+        self.log(logging.INFO, "test latency history and persistence")
+        catalog = ServerCatalog(self.path, alpha=0.5)
+        servers = [make_server(f"10.0.0.{i}", 8080) for i in range(1, 4)]
+        self.assertEqual(catalog.add(servers), 3)
+        self.assertEqual(catalog.add(servers[:1], "push"), 0)
+        self.assertFalse(catalog.tested)
+
+        catalog.record_latency("10.0.0.1", 8080, 100.0)
+        catalog.record_latency("10.0.0.1", 8080, 20.0)
+        catalog.record_latency("10.0.0.2", 8080, 50.0)
+        catalog.record_latency("10.0.0.3", 8080, float("inf"))
+        self.assertEqual(catalog.get("10.0.0.1", 8080).latency, 60.0)
+        self.assertEqual(
+            [server.host for server in catalog.ranked()],
+            ["10.0.0.2", "10.0.0.1", "10.0.0.3"],
+        )
+        catalog.record_failure("10.0.0.2")
+        self.assertEqual(
+            [server.host for server in catalog.ranked(["10.0.0.3"])],
+            ["10.0.0.1", "10.0.0.2"],
+        )
+
+        # unlisted servers are dropped on save
+        catalog.get("10.0.0.3", 8080).seen_at = 0.0
+        catalog.save()
+        loaded = ServerCatalog(self.path)
+        self.assertTrue(loaded.load())
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.fetched_at, catalog.fetched_at)
+        self.assertEqual(
+            loaded.get("10.0.0.2", 8080), catalog.get("10.0.0.2", 8080)
+        )
+        self.assertEqual(loaded.ranked()[0].host, "10.0.0.1")
+
+    async def test_instant_pick(self):
+        self.log(logging.INFO, "test server picked from catalogue")
+        server = await asyncio.start_server(
+            lambda r, w: w.close(), "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+        # closed port is refused at once
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            closed_port = sock.getsockname()[1]
+
+        catalog = ServerCatalog(self.path)
+        catalog.add(
+            [
+                make_server("127.0.0.1", closed_port),
+                make_server("127.0.0.1", port),
+            ]
+        )
+        catalog.record_latency("127.0.0.1", closed_port, 1.0)
+        catalog.record_latency("127.0.0.1", port, 2.0)
+        sso_server._catalog = catalog
+        sso_server._cached_server = None
+
+        async with server:
+            picked = await sso_server.get_sso_server()
+            self.assertEqual(picked.port, closed_port)
+            await asyncio.wait_for(sso_server._refresh_task, 5)  # type: ignore
+
+        self.assertEqual(catalog.get("127.0.0.1", closed_port).failures, 1)
+        self.assertEqual(catalog.ranked()[0].port, port)
+        self.assertTrue(os.path.exists(self.path))
+
+    async def test_change_server(self):
+        self.log(logging.INFO, "test reconnect picks servers from catalogue")
+        catalog = ServerCatalog(self.path)
+        catalog.add(make_server(f"10.0.0.{i}", 8080) for i in range(1, 4))
+        for i in range(1, 4):
+            catalog.record_latency(f"10.0.0.{i}", 8080, i * 10.0)
+        sso_server._catalog = catalog
+        sso_server._cached_server = None
+
+        tested_at = catalog.get("10.0.0.2", 8080).tested_at
+        client = ConnectClient(10000, bytes(16))
+        await client.reconnect()
+        await client.reconnect(change_server=True)
+        self.assertEqual(
+            [server.host for server in client.servers],
+            ["10.0.0.1", "10.0.0.2"],
+        )
+        # picked without waiting for latency tests
+        self.assertEqual(catalog.get("10.0.0.2", 8080).tested_at, tested_at)
+        task = sso_server._refresh_task
+        assert task
+        task.cancel()
+
+
+if __name__ == "__main__":
+    unittest.main()
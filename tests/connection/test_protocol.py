@@ -0,0 +1,83 @@
+import struct
+import asyncio
+import logging
+import unittest
+from typing import List
+
+from cai.log import logger
+from cai.connection import Connection, connect
+
+
+def frame(body: bytes) -> bytes:
+    return struct.pack(">I", len(body) + 4) + body
+
+
+class TestFrameProtocol(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestFrameProtocol | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing FrameProtocol...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing FrameProtocol!")
+
+    async def _serve(self, chunks: List[bytes]):
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ):
+            for chunk in chunks:
+                writer.write(chunk)
+                await writer.drain()
+                await asyncio.sleep(0.01)
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        return server, port
+
+    async def test_read_frames(self):
+        self.log(logging.INFO, "test read frames split across writes")
+
+        large = bytes(range(256)) * 1024
+        data = frame(b"first") + frame(large) + frame(b"") + frame(b"last")
+        chunks = [data[:3], data[3:20], data[20:70000], data[70000:]]
+        server, port = await self._serve(chunks)
+
+        received: List[bytes] = []
+        async with server:
+            conn = await connect("127.0.0.1", port, timeout=5.0)
+            with self.assertRaises(ConnectionAbortedError):
+                await conn.read_frames(
+                    lambda view: received.append(bytes(view))
+                )
+            self.assertTrue(conn.closed)
+
+        self.assertEqual(received, [b"first", large, b"", b"last"])
+
+    async def test_stream_read(self):
+        self.log(logging.INFO, "test stream mode reads")
+
+        server, port = await self._serve([b"line1\nli", b"ne2\n12345", b"rest"])
+        async with server:
+            async with connect("127.0.0.1", port, timeout=5.0) as conn:
+                self.assertIsInstance(conn, Connection)
+                self.assertEqual(await conn.read_line(), b"line1\n")
+                self.assertEqual(await conn.read_line(), b"line2\n")
+                self.assertEqual(await conn.read_bytes(5), b"12345")
+                self.assertEqual(await conn.read_all(), b"rest")
+
+    async def test_invalid_frame_length(self):
+        self.log(logging.INFO, "test invalid frame length")
+
+        server, port = await self._serve([struct.pack(">I", 2) + b"xx"])
+        async with server:
+            conn = await connect("127.0.0.1", port, timeout=5.0)
+            with self.assertRaises(ConnectionAbortedError):
+                await conn.read_frames(lambda view: None)
+            self.assertTrue(conn.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
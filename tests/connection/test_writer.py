@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import unittest
+
+from cai.log import logger
+from cai.connection import connect
+
+
+class TestWriteQueue(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestWriteQueue | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing WriteQueue...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing WriteQueue!")
+
+    async def _serve(self):
+        received = asyncio.get_running_loop().create_future()
+
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ):
+            received.set_result(await reader.read())
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        return server, port, received
+
+    async def test_coalesce(self):
+        self.log(logging.INFO, "test coalesced writes and urgent lane")
+        server, port, received = await self._serve()
+        async with server:
+            conn = await connect("127.0.0.1", port, timeout=5.0)
+            await asyncio.gather(
+                conn.awrite(b"a"), conn.awrite(b"b"), conn.awrite(b"c")
+            )
+            await asyncio.sleep(0)
+            conn.write(b"d")
+            conn.write(b"!", urgent=True)
+            conn.write_eof()
+
+            stats = conn.write_stats
+            assert stats
+            self.assertEqual((stats.frames, stats.writes), (5, 2))
+            self.assertEqual((stats.urgent_frames, stats.queued), (1, 0))
+            self.assertEqual(await asyncio.wait_for(received, 5), b"abc!d")
+            await conn.close()
+
+        with self.assertRaises(RuntimeError):
+            await conn.awrite(b"e")
+
+    async def test_backpressure(self):
+        self.log(logging.INFO, "test writers wait for buffered bytes")
+        server, port, received = await self._serve()
+        async with server:
+            conn = await connect(
+                "127.0.0.1", port, timeout=5.0, write_high_water=4
+            )
+            await conn.awrite(b"1234")
+            self.assertEqual(conn.write_stats.waits, 0)  # type: ignore
+            # released once queued frames are flushed
+            await conn.awrite(b"5678")
+            self.assertEqual(conn.write_stats.waits, 1)  # type: ignore
+            conn.write_eof()
+            self.assertEqual(await asyncio.wait_for(received, 5), b"12345678")
+            await conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
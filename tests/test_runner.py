@@ -0,0 +1,114 @@
+import json
+import time
+import pickle
+import asyncio
+import logging
+import tempfile
+import unittest
+from hashlib import md5
+
+from cai.log import logger
+from cai.client import PrivateMessage
+from cai.runner import (
+    Account,
+    Supervisor,
+    RunnerConfig,
+    _pack_event,
+    load_config,
+    shard_accounts,
+)
+
+
+class TestRunner(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestRunner | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing Runner...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing Runner!")
+
+    def test_config(self):
+        self.log(logging.INFO, "test load config and shard accounts")
+
+        config = {
+            "workers": 2,
+            "accounts": [
+                {"uin": 10001, "password": "password"},
+                {"uin": 10002, "password_md5": md5(b"pwd").hexdigest()},
+                {"uin": 10003, "password": "password"},
+            ],
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump(config, f)
+            f.flush()
+            result = load_config(f.name)
+
+        self.assertEqual(result.workers, 2)
+        self.assertEqual(
+            result.accounts[0], Account(10001, md5(b"password").digest())
+        )
+        self.assertEqual(result.accounts[1].password_md5, md5(b"pwd").digest())
+
+        shards = shard_accounts(result.accounts, result.workers)
+        self.assertEqual(
+            [[a.uin for a in s] for s in shards], [[10002], [10001, 10003]]
+        )
+
+    def test_pack_event(self):
+        self.log(logging.INFO, "test pack event without raw message")
+
+        event = PrivateMessage(
+            object(), 1, 0, False, 10001, "nick", 10002, []  # type: ignore
+        )
+        uin, result = pickle.loads(_pack_event(10002, event))
+        self.assertEqual(uin, 10002)
+        self.assertIsNone(result._msg)
+        self.assertEqual(result.from_nick, "nick")
+        self.assertIsNotNone(event._msg)
+
+
+class TestSupervisor(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestSupervisor | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing Supervisor...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing Supervisor!")
+
+    async def test_reap(self):
+        self.log(logging.INFO, "test exited worker reaped off the loop")
+        loop = asyncio.get_running_loop()
+        supervisor = Supervisor(RunnerConfig([], workers=1, restart_delay=60))
+        supervisor._stopped = loop.create_future()
+        context = supervisor._context
+        conn, child_conn = context.Pipe()
+        process = context.Process(target=time.sleep, args=(0.5,))
+        process.start()
+        child_conn.close()
+        supervisor._processes[0] = process
+        supervisor._conns[0] = conn
+        supervisor._started_at[0] = time.monotonic()
+        loop.add_reader(conn.fileno(), supervisor._read_events, 0)
+
+        # worker still running, reaping must not block the loop
+        start = time.monotonic()
+        supervisor._on_exit(0)
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertIn(0, supervisor._processes)
+
+        while 0 in supervisor._processes:
+            await asyncio.sleep(0.05)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(supervisor._delays[0], 120)
+        self.assertTrue(conn.closed)
+        supervisor.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
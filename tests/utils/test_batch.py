@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import unittest
+from typing import List
+
+from cai.log import logger
+from cai.utils.batch import Batcher
+
+
+class TestBatcher(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestBatcher | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing Batcher...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing Batcher!")
+
+    async def test_batch(self):
+        self.log(logging.INFO, "test flush by count, delay and manually")
+        batches: List[List[int]] = []
+
+        async def flush(items: List[int]):
+            batches.append(items)
+            if items == [-1]:
+                raise RuntimeError("flush failed")
+
+        batcher = Batcher(flush, max_items=3, delay=0.05)
+        batcher.add([1, 2])
+        batcher.add([3, 4])
+        await asyncio.sleep(0)
+        self.assertEqual(batches, [[1, 2, 3], [4]])
+
+        batcher.add([5])
+        self.assertEqual(len(batcher), 1)
+        await asyncio.sleep(0.1)
+        self.assertEqual(batches[-1], [5])
+
+        batcher.add([-1])
+        batcher.add([6])
+        await batcher.flush()
+        self.assertEqual(batches[-1], [-1, 6])
+
+        stats = batcher.stats
+        self.assertEqual((stats.pending, stats.items), (0, 7))
+        self.assertEqual((stats.batches, stats.failed), (4, 0))
+
+        batcher.add([-1])
+        await batcher.flush()
+        self.assertEqual(batcher.stats.failed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import struct
+import logging
+import unittest
+
+from cai.log import logger
+from cai.utils.binary import Packet, PacketSchema
+
+
+class TestPacketSchema(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestPacketSchema | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing PacketSchema...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing PacketSchema!")
+
+    def test_same_as_packet(self):
+        self.log(logging.INFO, "test schema result equals packet query")
+
+        data = (
+            struct.pack(">bHq", -1, 2, 3)
+            + struct.pack(">I", 9)
+            + b"hello"
+            + struct.pack(">H", 3)
+            + b"abc"
+            + b"\x00\x00"
+            + b"remain"
+        )
+        schema = (
+            PacketSchema()
+            .int8()
+            .uint16()
+            .int64()
+            .string(4, 4)
+            .bytes_with_length(2)
+            .offset(2)
+            .remain()
+        )
+        expected = (
+            Packet(data)
+            .start()
+            .int8()
+            .uint16()
+            .int64()
+            .string(4, 4)
+            .bytes_with_length(2)
+            .offset(2)
+            .remain()
+            .execute()
+        )
+        for value in (data, bytearray(data), memoryview(data)):
+            result = schema.unpack(value)
+            self.assertEqual(result[:-1], expected[:-1])
+            self.assertIsInstance(result[-1], memoryview)
+            self.assertEqual(bytes(result[-1]), bytes(expected[-1]))
+
+    def test_fixed_only(self):
+        self.log(logging.INFO, "test fixed size schema with offset")
+
+        schema = PacketSchema().uint8().offset(2).uint32()
+        data = b"\xff" + struct.pack(">BBBI", 1, 2, 3, 4)
+        self.assertEqual(schema.unpack(data, 1), (1, 4))
+
+    def test_truncated(self):
+        self.log(logging.INFO, "test truncated data")
+
+        schema = PacketSchema().bytes_with_length(4, 4)
+        with self.assertRaises(struct.error):
+            schema.unpack(struct.pack(">I", 10) + b"abc")
+        with self.assertRaises(ValueError):
+            PacketSchema().remain().uint8()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import time
+import asyncio
+import logging
+import unittest
+from typing import List
+
+from cai.log import logger
+from cai.utils.coroutine import CPUTimer, RateLimiter, bounded_map
+
+
+def busy(seconds: float):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+class TestCPUTimer(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestCPUTimer | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing CPUTimer...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing CPUTimer!")
+
+    async def test_cpu_time(self):
+        self.log(logging.INFO, "test cpu time excludes waiting")
+
+        spent: List[float] = []
+
+        async def job():
+            busy(0.02)
+            await asyncio.sleep(0.1)
+            busy(0.02)
+            return "done"
+
+        self.assertEqual(await CPUTimer(job(), spent.append), "done")
+        self.assertEqual(len(spent), 1)
+        self.assertGreaterEqual(spent[0], 0.04)
+        self.assertLess(spent[0], 0.09)
+
+    async def test_exception(self):
+        self.log(logging.INFO, "test exception and cancellation")
+
+        spent: List[float] = []
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("fail")
+
+        with self.assertRaises(ValueError):
+            await CPUTimer(fail(), spent.append)
+
+        async def wait():
+            await CPUTimer(asyncio.sleep(10), spent.append)
+
+        task = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(len(spent), 2)
+
+
+class TestBoundedMap(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestBoundedMap | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing bounded_map...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing bounded_map!")
+
+    async def test_order_and_limit(self):
+        self.log(logging.INFO, "test results order and concurrency")
+        running = 0
+        peak = 0
+
+        async def job(delay: float) -> float:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(delay)
+            running -= 1
+            return delay
+
+        delays = [0.03, 0.01, 0.02, 0.0, 0.01, 0.02]
+        self.assertEqual(await bounded_map(job, delays, 3), delays)
+        self.assertEqual(peak, 3)
+        self.assertEqual(await bounded_map(job, [], 3), [])
+
+    async def test_exception(self):
+        self.log(logging.INFO, "test others cancelled on exception")
+        started: List[int] = []
+
+        async def job(index: int) -> int:
+            started.append(index)
+            await asyncio.sleep(0.01 if index == 1 else 1)
+            if index == 1:
+                raise ValueError(index)
+            return index
+
+        with self.assertRaises(ValueError):
+            await bounded_map(job, range(10), 2)
+        self.assertEqual(started, [0, 1])
+
+    async def test_rate_limiter(self):
+        self.log(logging.INFO, "test rate limiter")
+        limiter = RateLimiter(100, burst=2)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(limiter.acquire() for _ in range(7)))
+        spent = loop.time() - start
+        self.assertGreaterEqual(spent, 0.045)
+        self.assertLess(spent, 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import logging
+import unittest
+from dataclasses import field, dataclass
+from typing import Dict, List, Tuple, Optional
+
+from cai.log import logger
+from cai.utils.dataclass import JsonableDataclass, _asdict, _fromdict
+
+
+@dataclass
+class Inner(JsonableDataclass):
+    __json_fields__ = ("value",)
+
+    value: int
+
+
+@dataclass
+class Outer(JsonableDataclass):
+    __json_fields__ = ("name", "inner", "tags", "scores", "extra")
+
+    name: str
+    inner: Inner
+    tags: List[str]
+    scores: Dict[str, int]
+    pair: Tuple[int, ...] = ()
+    extra: Optional[int] = None
+    _hidden: bytes = field(default=b"hidden")
+
+
+@dataclass
+class Note(JsonableDataclass):
+    text: Optional[str] = None
+
+
+class TestJsonableDataclass(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestJsonableDataclass | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing JsonableDataclass...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing JsonableDataclass!")
+
+    def test_from_dict(self):
+        self.log(logging.INFO, "test generated from_dict")
+        kvs = {
+            "name": "outer",
+            "inner": {"value": 1},
+            "tags": ["a", "b"],
+            "scores": {"a": 1},
+            "pair": [1, 2],
+            "extra": "3",
+            "unknown": 0,
+        }
+        obj = Outer.from_dict(kvs)
+        self.assertEqual(obj, _fromdict(Outer, kvs))
+        self.assertEqual(obj.inner, Inner(1))
+        self.assertEqual(obj.scores, {"a": 1})
+        self.assertEqual(obj.pair, (1, 2))
+        self.assertEqual(obj.extra, 3)
+        self.assertEqual(obj._hidden, b"hidden")
+
+        inner = Inner(2)
+        self.assertIs(Outer.from_dict({**kvs, "inner": inner}).inner, inner)
+
+    def test_optional(self):
+        self.log(logging.INFO, "test None kept for Optional fields")
+        self.assertIsNone(Note.from_dict({"text": None}).text)
+        self.assertIsNone(_fromdict(Note, {"text": None}).text)
+        self.assertEqual(Note.from_dict({"text": 1}).text, "1")
+
+    def test_to_dict(self):
+        self.log(logging.INFO, "test generated to_dict")
+        obj = Outer("outer", Inner(1), ["a"], {"a": 1}, (1,), None, b"x")
+        kvs = obj.to_dict()
+        self.assertEqual(kvs, _asdict(obj))
+        self.assertEqual(list(kvs), list(_asdict(obj)))
+        self.assertIsNot(kvs["tags"], obj.tags)
+        self.assertEqual(
+            obj.to_dict(True),
+            {
+                "name": "outer",
+                "inner": {"value": 1},
+                "tags": ["a"],
+                "scores": {"a": 1},
+                "extra": None,
+            },
+        )
+        self.assertEqual(
+            Outer.from_json(obj.to_json()).to_dict(True), obj.to_dict(True)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
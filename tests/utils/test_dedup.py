@@ -0,0 +1,60 @@
+import logging
+import unittest
+from unittest import mock
+
+from cai.log import logger
+from cai.pb.msf.msg.comm import Msg
+from cai.utils.dedup import DedupIndex
+from cai.client.message_service import get_message_key
+
+
+class TestDedupIndex(unittest.TestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestDedupIndex | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing DedupIndex...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing DedupIndex!")
+
+    def test_seen(self):
+        self.log(logging.INFO, "test dedup expiry and capacity")
+        with mock.patch("time.monotonic", return_value=1000.0) as clock:
+            index = DedupIndex(ttl=60, capacity=3, slots=6)
+            self.assertFalse(index.seen(1))
+            self.assertTrue(index.seen(1))
+
+            clock.return_value = 1030.0
+            self.assertFalse(index.seen(2))
+            clock.return_value = 1065.0
+            self.assertNotIn(1, index)
+            self.assertIn(2, index)
+
+            for key in (3, 4, 5):
+                self.assertFalse(index.seen(key))
+            self.assertNotIn(2, index)
+            self.assertEqual(len(index), 3)
+
+            stats = index.stats
+            self.assertEqual((stats.hits, stats.misses), (1, 5))
+            self.assertEqual((stats.expired, stats.evicted), (1, 1))
+
+    def test_message_key(self):
+        self.log(logging.INFO, "test packed message key")
+        message = Msg()
+        message.head.from_uin = 10001
+        message.head.seq = 2
+        message.head.time = 3
+        message.body.rich_text.attr.random = 4
+        key = get_message_key(message)
+        self.assertEqual(key, (10001 << 96) | (2 << 64) | (3 << 32) | 4)
+
+        message.head.seq = 3
+        message.head.time = 2
+        self.assertNotEqual(get_message_key(message), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
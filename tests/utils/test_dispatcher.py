@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import unittest
+from typing import List
+
+from cai.log import logger
+from cai.utils.dispatcher import (
+    PRIORITY_LOW,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    Dispatcher,
+)
+
+
+class TestDispatcher(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestDispatcher | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing Dispatcher...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing Dispatcher!")
+
+    async def test_priority_and_drop(self):
+        self.log(logging.INFO, "test priority order and eviction")
+
+        result: List[str] = []
+        gate = asyncio.Event()
+
+        async def job(name: str):
+            await gate.wait()
+            result.append(name)
+
+        dispatcher = Dispatcher(workers=1, maxsize=3)
+        self.assertTrue(dispatcher.submit(PRIORITY_NORMAL, job, "running"))
+        await asyncio.sleep(0)
+
+        self.assertTrue(dispatcher.submit(PRIORITY_LOW, job, "low1"))
+        self.assertTrue(dispatcher.submit(PRIORITY_LOW, job, "low2"))
+        self.assertTrue(dispatcher.submit(PRIORITY_NORMAL, job, "normal"))
+        # queue full: evict oldest low priority job
+        self.assertTrue(dispatcher.submit(PRIORITY_HIGH, job, "high"))
+        self.assertFalse(dispatcher.submit(PRIORITY_LOW, job, "low3"))
+
+        stats = dispatcher.stats
+        self.assertEqual(stats.queue_size, 3)
+        self.assertEqual(stats.queue_sizes, (1, 1, 1))
+        self.assertEqual(stats.dropped, 2)
+        self.assertEqual(stats.running, 1)
+
+        gate.set()
+        while dispatcher.qsize or dispatcher.stats.running:
+            await asyncio.sleep(0)
+        self.assertEqual(result, ["running", "high", "normal", "low2"])
+        self.assertEqual(dispatcher.stats.processed, 4)
+        await dispatcher.close()
+
+    async def test_bounded_concurrency(self):
+        self.log(logging.INFO, "test bounded concurrency and close")
+
+        running = 0
+        max_running = 0
+
+        async def job():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+
+        async def close_job():
+            await dispatcher.close()
+
+        dispatcher = Dispatcher(workers=4)
+        for _ in range(100):
+            dispatcher.submit(PRIORITY_NORMAL, job)
+        while dispatcher.qsize or dispatcher.stats.running:
+            await asyncio.sleep(0.001)
+        self.assertEqual(max_running, 4)
+
+        # close from a running job must not cancel itself
+        dispatcher.submit(PRIORITY_NORMAL, close_job)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        self.assertEqual(dispatcher.stats.workers, 0)
+        self.assertEqual(dispatcher.stats.failed, 0)
+        self.assertEqual(dispatcher.stats.processed, 101)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import unittest
+from typing import List
+
+from cai.log import logger
+from cai.utils.future import TimerWheel, InFlightTable
+
+
+class TestInFlightTable(unittest.IsolatedAsyncioTestCase):
+    def log(self, level: int, message: str, *args, exc_info=False, **kwargs):
+        message = "| TestInFlightTable | " + message
+        return logger.log(level, message, *args, exc_info=exc_info, **kwargs)
+
+    def setUp(self):
+        self.log(logging.INFO, "Start Testing InFlightTable...")
+
+    def tearDown(self):
+        self.log(logging.INFO, "End Testing InFlightTable!")
+
+    async def test_timer_wheel(self):
+        self.log(logging.INFO, "test timer wheel")
+        wheel = TimerWheel(asyncio.get_running_loop(), 0.01, 8)
+        fired: List[int] = []
+        wheel.call_later(0.02, lambda: fired.append(1))
+        # longer than a wheel round
+        wheel.call_later(0.12, lambda: fired.append(2))
+        wheel.call_later(0.02, lambda: fired.append(3)).cancel()
+        await asyncio.sleep(0.06)
+        self.assertEqual(fired, [1])
+        await asyncio.sleep(0.12)
+        self.assertEqual(fired, [1, 2])
+        self.assertEqual(len(wheel), 0)
+
+    async def test_timer_rearm(self):
+        self.log(logging.INFO, "test timer re-armed from its callback")
+        wheel = TimerWheel(asyncio.get_running_loop(), 0.01, 8)
+        ticks: List[float] = []
+        run = wheel._run
+
+        def count_run():
+            ticks.append(wheel._loop.time())
+            run()
+
+        wheel._run = count_run  # type: ignore
+        fired: List[int] = []
+
+        def rearm():
+            fired.append(1)
+            wheel.call_later(0.03, rearm)
+
+        wheel.call_later(0.03, rearm)
+        await asyncio.sleep(0.5)
+        # one tick per resolution, no extra chains from re-arming
+        self.assertGreater(len(fired), 5)
+        self.assertLessEqual(len(ticks), 52)
+        self.assertEqual(len(wheel), 1)
+
+    async def test_table(self):
+        self.log(logging.INFO, "test in-flight request table")
+        table: InFlightTable[str] = InFlightTable()
+        table.store_seq(2)
+        self.assertEqual(table.next_seq(1, 4), 3)
+        self.assertEqual(table.next_seq(3, 4), 0)
+        with self.assertRaises(KeyError):
+            table.store_seq(2)
+
+        task = asyncio.create_task(table.fetch(2, 1))
+        await asyncio.sleep(0)
+        self.assertTrue(table.store_result(2, "result"))
+        self.assertEqual(await task, "result")
+        self.assertNotIn(2, table)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await table.fetch(3, 0.05)
+
+        task = asyncio.create_task(table.fetch(4))
+        await asyncio.sleep(0)
+        self.assertEqual(table.cancel_all(ConnectionError()), 1)
+        with self.assertRaises(ConnectionError):
+            await task
+
+        stats = table.stats
+        self.assertEqual((stats.pending, stats.max_pending), (0, 1))
+        self.assertEqual((stats.completed, stats.timeouts), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()